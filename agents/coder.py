@@ -1,20 +1,30 @@
 """
 Agent Coder - Génère et modifie du code
 """
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from pathlib import Path
 import json
 from loguru import logger
 
 try:
     from ..core.context import Context, Task, TaskStatus, AgentType
+    from ..core.events import EventType, event_bus
+    from ..core.prompt_context import rank_by_relevance
+    from ..core.workspace import get_workspace_backend, file_cache
     from ..models.base import BaseModel
 except ImportError:
     from core.context import Context, Task, TaskStatus, AgentType
+    from core.events import EventType, event_bus
+    from core.prompt_context import rank_by_relevance
+    from core.workspace import get_workspace_backend, file_cache
     from models.base import BaseModel
 from .planner import BaseAgent
 
 
+# Nombre maximal de fichiers existants dont le contenu est proposé au modèle
+RELEVANT_FILES_LIMIT = 5
+
+
 class CoderAgent(BaseAgent):
     """Agent qui génère et modifie du code"""
     
@@ -24,16 +34,14 @@ class CoderAgent(BaseAgent):
     
     async def execute(self, task: Task, context: Context) -> str:
         """Exécute une tâche de codage"""
-        self._log_action("code_task", {"task_id": task.id, "description": task.description})
+        self._log_action("code_task", {"task_id": task.id, "description": task.description}, context)
         
         # Générer le code
         code_files = await self._generate_code(task.description, context)
         
-        # Écrire les fichiers
-        files_created = []
-        for file_path, content in code_files.items():
-            await self._write_file(file_path, content, context)
-            files_created.append(file_path)
+        # Écrire les fichiers (en une seule opération groupée)
+        await self._write_files(code_files, context)
+        files_created = list(code_files)
         
         result_message = f"{len(files_created)} fichier(s) créé(s/modifié(s)): {', '.join(files_created)}"
         self._add_message(context, "assistant", result_message)
@@ -42,12 +50,15 @@ class CoderAgent(BaseAgent):
     
     async def _generate_code(self, task_description: str, context: Context) -> Dict[str, str]:
         """Génère le code en utilisant le modèle d'IA"""
-        prompt = self._create_coding_prompt(task_description, context)
+        file_contents = await self._read_relevant_files(task_description, context)
+        prompt = self._create_coding_prompt(task_description, context, file_contents)
         
         response = await self.model.generate(
             prompt,
             temperature=0.3,
-            max_tokens=4000
+            max_tokens=4000,
+            cache_scope=self.agent_type.value,
+            use_cache=True
         )
         
         # Parser la réponse pour extraire les fichiers
@@ -55,10 +66,33 @@ class CoderAgent(BaseAgent):
         
         return code_files
     
-    def _create_coding_prompt(self, task_description: str, context: Context) -> str:
+    async def _read_relevant_files(self, task_description: str, context: Context) -> Dict[str, str]:
+        """Contenu des fichiers existants les plus liés à la tâche (lus à travers le cache)"""
+        candidates = rank_by_relevance(
+            task_description, context.files_created + context.files_modified, RELEVANT_FILES_LIMIT
+        )
+        if not candidates:
+            return {}
+        try:
+            return await file_cache.read_many(get_workspace_backend(context.project_path), candidates)
+        except Exception as e:
+            logger.warning(f"Lecture des fichiers existants impossible: {e}")
+            return {}
+    
+    def _create_coding_prompt(
+        self,
+        task_description: str,
+        context: Context,
+        file_contents: Optional[Dict[str, str]] = None
+    ) -> str:
         """Crée le prompt pour la génération de code"""
-        # Récupérer le contexte existant du projet
-        existing_files = context.files_created + context.files_modified
+        # Contexte existant du projet, classé par pertinence dans le budget du modèle
+        builder = self._prompt_context(task_description)
+        builder.add_context(context)
+        for file_path, content in (file_contents or {}).items():
+            builder.add("contents", f"# {file_path}\n{content}", weight=1.5, truncatable=True)
+        contents_section = builder.render("contents", separator="\n\n")
+        self._log_prompt_usage(builder)
         
         prompt = f"""Tu es un expert en développement logiciel. 
 Ta tâche est de générer ou modifier du code selon la demande.
@@ -70,7 +104,14 @@ Contexte du projet:
 - Nom: {context.project_name}
 - Description: {context.project_description}
 - Chemin: {context.project_path}
-- Fichiers existants: {', '.join(existing_files) if existing_files else 'Aucun'}
+- Fichiers existants: {builder.render("files", separator=", ")}
+- Travail déjà effectué:
+{builder.render("results", prefix="  - ")}
+- Échanges récents:
+{builder.render("messages", prefix="  - ")}
+
+Contenu des fichiers concernés:
+{contents_section}
 
 Génère le code nécessaire en suivant ces guidelines:
 1. Utilise les meilleures pratiques de programmation
@@ -124,6 +165,10 @@ IMPORTANT: Retourne UNIQUEMENT le JSON valide, sans autre texte."""
     
     async def _write_file(self, file_path: str, content: str, context: Context):
         """Écrit un fichier dans le projet"""
+        await self._write_files({file_path: content}, context)
+    
+    async def _write_files(self, files: Dict[str, str], context: Context):
+        """Écrit des fichiers dans le projet en une opération groupée"""
         # Vérification Auto-Accept
         if self.auto_accept_manager:
             try:
@@ -131,37 +176,41 @@ IMPORTANT: Retourne UNIQUEMENT le JSON valide, sans autre texte."""
             except ImportError:
                 from monitoring.auto_accept import ActionType
 
-            check = await self.auto_accept_manager.should_accept_action(
-                ActionType.FILE_WRITE,
-                {"file_path": file_path, "content": content[:50], "file_size": len(content)}
-            )
-            
-            if not check["accept"]:
-                msg = f"Action bloquée par Auto-Accept: {check['reason']}"
-                logger.warning(msg)
-                self._add_message(context, "system", msg)
-                return
+            accepted = {}
+            for file_path, content in files.items():
+                check = await self.auto_accept_manager.should_accept_action(
+                    ActionType.FILE_WRITE,
+                    {"file_path": file_path, "content": content[:50], "file_size": len(content)}
+                )
+                
+                if not check["accept"]:
+                    msg = f"Action bloquée par Auto-Accept: {check['reason']}"
+                    logger.warning(msg)
+                    self._add_message(context, "system", msg)
+                    continue
+                accepted[file_path] = content
+            files = accepted
+        
+        if not files:
+            return
 
+        # Backend sélectionné au démarrage: API Antigravity ou disque local
+        backend = get_workspace_backend(context.project_path)
         try:
-            try:
-                from ..core.api_client import AntigravityClient
-            except ImportError:
-                from core.api_client import AntigravityClient
-            
-            # Essayer d'utiliser l'API Antigravity
-            client = AntigravityClient()
-            success = await client.write_file(file_path, content)
-            
-            if success:
-                context.files_created.append(file_path)
-                logger.info(f"Fichier créé via API: {file_path}")
-            else:
-                # Fallback: écrire directement
-                self._write_file_locally(file_path, content, context)
-        
+            results = await backend.write_files(files)
         except Exception as e:
             logger.warning(f"Erreur avec l'API, écriture locale: {e}")
-            self._write_file_locally(file_path, content, context)
+            results = {}
+        
+        await file_cache.written(backend, {path: content for path, content in files.items() if results.get(path)})
+        for file_path, content in files.items():
+            if results.get(file_path):
+                context.record_file_created(file_path)
+                self._publish_file_written(file_path, len(content), backend.name, context)
+                logger.info(f"Fichier créé ({backend.name}): {file_path}")
+            elif backend.is_remote:
+                # Fallback: écrire directement
+                self._write_file_locally(file_path, content, context)
     
     def _write_file_locally(self, file_path: str, content: str, context: Context):
         """Écrit un fichier localement"""
@@ -175,5 +224,12 @@ IMPORTANT: Retourne UNIQUEMENT le JSON valide, sans autre texte."""
         with open(full_path, 'w', encoding='utf-8') as f:
             f.write(content)
         
-        context.files_created.append(file_path)
+        context.record_file_created(file_path)
+        self._publish_file_written(file_path, len(content), "local", context)
         logger.info(f"Fichier créé localement: {full_path}")
+    
+    def _publish_file_written(self, file_path: str, size: int, via: str, context: Context):
+        """Publie l'écriture d'un fichier sur le bus d'événements"""
+        event_bus.publish(
+            EventType.FILE_WRITTEN, context.run_id, agent=self.name, file_path=file_path, size=size, via=via
+        )
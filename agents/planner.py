@@ -1,15 +1,19 @@
 """
 Agent Planner - Planifie et décompose les tâches complexes
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from abc import ABC, abstractmethod
 from loguru import logger
 
 try:
     from ..core.context import Context, Task, TaskStatus, AgentType
+    from ..core.events import EventType, event_bus
+    from ..core.prompt_context import PromptContextBuilder, budget_for_model
     from ..models.base import BaseModel
 except ImportError:
     from core.context import Context, Task, TaskStatus, AgentType
+    from core.events import EventType, event_bus
+    from core.prompt_context import PromptContextBuilder, budget_for_model
     from models.base import BaseModel
 
 
@@ -31,14 +35,27 @@ class BaseAgent(ABC):
         """Exécute une tâche"""
         pass
     
-    def _log_action(self, action: str, details: Dict[str, Any]):
-        """Log une action"""
+    def _log_action(self, action: str, details: Dict[str, Any], context: Context):
+        """Log une action et la publie sur le bus d'événements"""
         logger.info(f"[{self.name}] {action}")
         context.add_action(action, details)
+        event_bus.publish(EventType.AGENT_ACTION, context.run_id, agent=self.name, action=action, details=details)
     
     def _add_message(self, context: Context, role: str, content: str):
         """Ajoute un message au contexte"""
         context.add_message(role, content, self.agent_type)
+    
+    def _prompt_context(self, query: str) -> PromptContextBuilder:
+        """Constructeur de contexte de prompt dans le budget de tokens du modèle de l'agent"""
+        return PromptContextBuilder(budget_for_model(getattr(self.model, "model_name", None)), query)
+    
+    def _log_prompt_usage(self, builder: PromptContextBuilder):
+        """Trace l'occupation du budget de contexte"""
+        stats = builder.get_statistics()
+        logger.debug(
+            f"[{self.name}] Contexte du prompt: {stats['used_tokens']}/{stats['budget_tokens']} tokens estimés, "
+            f"omis: {stats['omitted']}"
+        )
 
 
 class PlannerAgent(BaseAgent):
@@ -50,7 +67,7 @@ class PlannerAgent(BaseAgent):
     
     async def execute(self, task: Task, context: Context) -> str:
         """Exécute une tâche de planification"""
-        self._log_action("plan_task", {"task_id": task.id, "description": task.description})
+        self._log_action("plan_task", {"task_id": task.id, "description": task.description}, context)
         
         # Générer le plan
         plan = await self._generate_plan(task.description, context)
@@ -80,12 +97,17 @@ class PlannerAgent(BaseAgent):
     
     async def _generate_plan(self, task_description: str, context: Context) -> Dict[str, Any]:
         """Génère un plan en utilisant le modèle d'IA"""
-        prompt = self._create_planning_prompt(task_description, context)
+        prompt, project_context = self._create_planning_prompt(task_description, context)
         
+        # Réutilisation par similarité: même demande, contexte du projet quasi identique
+        # (le gabarit fixe du prompt dominerait sinon la signature)
         response = await self.model.generate(
             prompt,
             temperature=0.7,
-            max_tokens=2000
+            max_tokens=2000,
+            cache_scope=self.agent_type.value,
+            cache_similarity_key=task_description.strip(),
+            cache_similarity_text=project_context
         )
         
         # Parser la réponse pour extraire le plan
@@ -93,8 +115,19 @@ class PlannerAgent(BaseAgent):
         
         return plan
     
-    def _create_planning_prompt(self, task_description: str, context: Context) -> str:
-        """Crée le prompt pour la planification"""
+    def _create_planning_prompt(self, task_description: str, context: Context) -> Tuple[str, str]:
+        """Crée le prompt pour la planification et retourne aussi sa partie variable (contexte du projet)"""
+        builder = self._prompt_context(task_description)
+        builder.add_context(context)
+        self._log_prompt_usage(builder)
+        
+        project_context = f"""- Nom: {context.project_name}
+- Description: {context.project_description}
+- Chemin: {context.project_path}
+- Fichiers existants: {builder.render("files", separator=", ")}
+- Travail déjà effectué:
+{builder.render("results", prefix="  - ")}"""
+        
         prompt = f"""Tu es un expert en planification de développement logiciel. 
 Ta tâche est de décomposer la demande suivante en sous-tâches concrètes et réalisables.
 
@@ -102,9 +135,7 @@ Description de la tâche:
 {task_description}
 
 Contexte du projet:
-- Nom: {context.project_name}
-- Description: {context.project_description}
-- Chemin: {context.project_path}
+{project_context}
 
 Génère un plan structuré avec:
 1. Une liste de sous-tâches claires et spécifiques
@@ -132,7 +163,7 @@ Format de réponse attendu (JSON):
   ]
 }}"""
         
-        return prompt
+        return prompt, project_context
     
     def _parse_plan_response(self, response: str) -> Dict[str, Any]:
         """Parse la réponse du modèle pour extraire le plan"""
@@ -171,9 +202,28 @@ Format de réponse attendu (JSON):
             task = Task(
                 id=task_id,
                 description=st_data.get("description", ""),
-                dependencies=st_data.get("dependencies", []),
-                assigned_agent=AgentType(st_data.get("agent_type", "coder"))
+                dependencies=self._resolve_dependencies(st_data.get("dependencies", []), parent_id),
+                assigned_agent=AgentType(st_data.get("agent_type", "coder")),
+                priority=self._parse_priority(st_data.get("priority"))
             )
             subtasks.append(task)
         
         return subtasks
+    
+    def _parse_priority(self, priority: Any) -> int:
+        """Convertit la priorité du plan en entier (0 si absente ou invalide)"""
+        try:
+            return int(priority)
+        except (TypeError, ValueError):
+            return 0
+    
+    def _resolve_dependencies(self, dependencies: List[Any], parent_id: str) -> List[str]:
+        """Convertit les références du plan ("1", 2...) en IDs de sous-tâches"""
+        resolved = []
+        for dep in dependencies:
+            dep = str(dep).strip()
+            if dep.isdigit():
+                dep = f"{parent_id}_subtask_{dep}"
+            if dep:
+                resolved.append(dep)
+        return resolved
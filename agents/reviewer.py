@@ -1,15 +1,18 @@
 """
 Agent Reviewer - Revoit et valide le code généré
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from pathlib import Path
 import json
 from loguru import logger
 
 try:
     from ..core.context import Context, Task, TaskStatus, AgentType
+    from ..core.workspace import get_workspace_backend, file_cache
     from ..models.base import BaseModel
 except ImportError:
     from core.context import Context, Task, TaskStatus, AgentType
+    from core.workspace import get_workspace_backend, file_cache
     from models.base import BaseModel
 from .planner import BaseAgent
 
@@ -23,7 +26,7 @@ class ReviewerAgent(BaseAgent):
     
     async def execute(self, task: Task, context: Context) -> str:
         """Exécute une tâche de revue"""
-        self._log_action("review_task", {"task_id": task.id, "description": task.description})
+        self._log_action("review_task", {"task_id": task.id, "description": task.description}, context)
         
         # Revoir le code
         review_result = await self.review(context)
@@ -44,25 +47,32 @@ class ReviewerAgent(BaseAgent):
                 "suggestions": []
             }
         
-        # Revoir chaque fichier
+        return await self.review_files(all_files, context)
+    
+    async def review_files(self, file_paths: List[str], context: Context) -> Dict[str, Any]:
+        """Revoit une liste de fichiers"""
         all_issues = []
         all_suggestions = []
         
-        for file_path in all_files:
-            review = await self._review_file(file_path, context)
+        # Lecture groupée: un aller-retour réseau pour tous les fichiers
+        contents = await self._read_files_content(file_paths, context)
+        
+        for file_path in file_paths:
+            review = await self._review_file(file_path, context, contents.get(file_path, ""))
             all_issues.extend(review.get("issues", []))
             all_suggestions.extend(review.get("suggestions", []))
         
         return {
-            "summary": f"{len(all_files)} fichier(s) revoiué(s), {len(all_issues)} problème(s) identifié(s)",
+            "summary": f"{len(file_paths)} fichier(s) revoiué(s), {len(all_issues)} problème(s) identifié(s)",
             "issues": all_issues,
             "suggestions": all_suggestions
         }
     
-    async def _review_file(self, file_path: str, context: Context) -> Dict[str, Any]:
+    async def _review_file(self, file_path: str, context: Context, file_content: Optional[str] = None) -> Dict[str, Any]:
         """Revoit un fichier spécifique"""
-        # Lire le contenu du fichier
-        file_content = await self._read_file_content(file_path, context)
+        # Lire le contenu du fichier (s'il n'a pas été lu avec les autres)
+        if file_content is None:
+            file_content = await self._read_file_content(file_path, context)
         
         if not file_content:
             return {
@@ -76,7 +86,9 @@ class ReviewerAgent(BaseAgent):
         response = await self.model.generate(
             prompt,
             temperature=0.3,
-            max_tokens=2000
+            max_tokens=2000,
+            cache_scope=self.agent_type.value,
+            use_cache=True
         )
         
         # Parser la réponse
@@ -86,33 +98,43 @@ class ReviewerAgent(BaseAgent):
     
     async def _read_file_content(self, file_path: str, context: Context) -> str:
         """Lit le contenu d'un fichier"""
+        contents = await self._read_files_content([file_path], context)
+        return contents.get(file_path, "")
+    
+    async def _read_files_content(self, file_paths: List[str], context: Context) -> Dict[str, str]:
+        """Lit plusieurs fichiers (API Antigravity groupée, puis lecture locale pour les manquants)"""
+        # Backend sélectionné au démarrage: API Antigravity ou disque local
+        backend = get_workspace_backend(context.project_path)
         try:
+            # Cache validé: les fichiers inchangés depuis la dernière revue ne sont pas relus
+            contents = await file_cache.read_many(backend, file_paths)
+        except Exception as e:
+            logger.warning(f"Erreur avec l'API, lecture locale: {e}")
+            contents = {}
+        if not backend.is_remote:
+            return contents
+        
+        # Fallback: lire localement
+        project_path = Path(context.project_path)
+        for file_path in file_paths:
+            if file_path in contents:
+                continue
             try:
-                from ..core.api_client import AntigravityClient
-            except ImportError:
-                from core.api_client import AntigravityClient
-            from pathlib import Path
-            
-            # Essayer l'API Antigravity
-            client = AntigravityClient()
-            content = await client.read_file(file_path)
-            
-            if content:
-                return content
-            
-            # Fallback: lire localement
-            project_path = Path(context.project_path)
-            full_path = project_path / file_path
-            
-            with open(full_path, 'r', encoding='utf-8') as f:
-                return f.read()
+                with open(project_path / file_path, 'r', encoding='utf-8') as f:
+                    contents[file_path] = f.read()
+            except Exception as e:
+                logger.error(f"Erreur lors de la lecture du fichier {file_path}: {e}")
         
-        except Exception as e:
-            logger.error(f"Erreur lors de la lecture du fichier {file_path}: {e}")
-            return ""
+        return contents
     
     def _create_review_prompt(self, file_path: str, file_content: str, context: Context) -> str:
         """Crée le prompt pour la revue"""
+        # Le fichier revu passe en premier; le budget restant va aux résultats des tâches liées
+        builder = self._prompt_context(f"{file_path} {context.project_description}")
+        builder.add("file", file_content, weight=10.0, truncatable=True)
+        builder.add_context(context, files=False)
+        self._log_prompt_usage(builder)
+        
         prompt = f"""Tu es un expert en revue de code. 
 Ta tâche est d'analyser le code suivant et d'identifier les problèmes potentiels.
 
@@ -122,9 +144,12 @@ Description: {context.project_description}
 
 Contenu du fichier:
 ```
-{file_content[:3000]}  # Limite à 3000 caractères pour le prompt
+{builder.render("file", empty="")}
 ```
 
+Travail effectué sur le projet:
+{builder.render("results", prefix="- ")}
+
 Analyse le code et identifie:
 1. Les bugs potentiels
 2. Les problèmes de sécurité
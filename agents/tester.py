@@ -10,9 +10,11 @@ from loguru import logger
 
 try:
     from ..core.context import Context, Task, TaskStatus, AgentType
+    from ..core.deadline import remaining_time
     from ..models.base import BaseModel
 except ImportError:
     from core.context import Context, Task, TaskStatus, AgentType
+    from core.deadline import remaining_time
     from models.base import BaseModel
 from .planner import BaseAgent
 
@@ -26,7 +28,7 @@ class TesterAgent(BaseAgent):
     
     async def execute(self, task: Task, context: Context) -> str:
         """Exécute une tâche de test"""
-        self._log_action("test_task", {"task_id": task.id, "description": task.description})
+        self._log_action("test_task", {"task_id": task.id, "description": task.description}, context)
         
         # Exécuter les tests
         test_results = await self.test(context)
@@ -102,7 +104,9 @@ class TesterAgent(BaseAgent):
         response = await self.model.generate(
             prompt,
             temperature=0.3,
-            max_tokens=3000
+            max_tokens=3000,
+            cache_scope=self.agent_type.value,
+            use_cache=True
         )
         
         # Parser la réponse pour extraire les tests
@@ -121,13 +125,19 @@ class TesterAgent(BaseAgent):
     
     def _create_test_generation_prompt(self, context: Context) -> str:
         """Crée le prompt pour la génération de tests"""
+        builder = self._prompt_context(context.project_description)
+        builder.add_context(context)
+        self._log_prompt_usage(builder)
+        
         prompt = f"""Tu es un expert en tests logiciels. 
 Ta tâche est de générer des tests unitaires pour le projet.
 
 Projet:
 - Nom: {context.project_name}
 - Description: {context.project_description}
-- Fichiers créés/modifiés: {', '.join(context.files_created + context.files_modified)}
+- Fichiers créés/modifiés: {builder.render("files", separator=", ")}
+- Travail déjà effectué:
+{builder.render("results", prefix="  - ")}
 
 Génère des tests unitaires complets qui:
 1. Couvrent les fonctionnalités principales
@@ -215,7 +225,7 @@ IMPORTANT: Retourne UNIQUEMENT le JSON valide."""
                 cwd=project_path
             )
             
-            stdout, stderr = await process.communicate()
+            stdout, stderr = await self._communicate(process)
             
             # Parser les résultats
             output = stdout.decode('utf-8')
@@ -242,7 +252,7 @@ IMPORTANT: Retourne UNIQUEMENT le JSON valide."""
                 cwd=project_path
             )
             
-            stdout, stderr = await process.communicate()
+            stdout, stderr = await self._communicate(process)
             
             # Parser les résultats
             output = stdout.decode('utf-8')
@@ -258,6 +268,15 @@ IMPORTANT: Retourne UNIQUEMENT le JSON valide."""
                 "details": []
             }
     
+    async def _communicate(self, process) -> tuple:
+        """Attend la fin du processus dans la limite de l'échéance; le tue en cas d'annulation"""
+        try:
+            return await asyncio.wait_for(process.communicate(), timeout=remaining_time())
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            process.kill()
+            await process.wait()
+            raise
+    
     def _parse_test_output(self, output: str) -> Dict[str, Any]:
         """Parse la sortie des tests"""
         import re
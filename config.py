@@ -18,6 +18,17 @@ class Settings(BaseSettings):
     # API Antigravity
     antigravity_api_url: str = "http://localhost:8080"
     
+    # Client HTTP partagé (connexions persistantes vers l'API Antigravity)
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry: float = 30.0
+    http2: bool = False  # nécessite le paquet h2 (httpx[http2])
+    file_batch_concurrency: int = 8  # requêtes parallèles quand l'IDE n'a pas d'endpoint batch
+    retry_backoff_base: float = 0.5  # secondes, doublé à chaque tentative (avec jitter)
+    retry_backoff_max: float = 8.0
+    circuit_breaker_threshold: int = 5  # échecs consécutifs avant ouverture du disjoncteur
+    circuit_breaker_cooldown: float = 30.0  # secondes avant une nouvelle tentative
+    
     # Modèles par défaut
     default_model: str = "gemini-3-pro"
     coder_model: str = "claude-sonnet-4.5"
@@ -30,6 +41,55 @@ class Settings(BaseSettings):
     timeout: int = 300
     max_iterations: int = 10
     max_concurrent_tasks: int = 5
+    subtask_timeout: int = 900  # secondes par sous-tâche (0 = illimité)
+    run_timeout: int = 3600  # secondes par exécution complète (0 = illimité)
+    
+    # Pools de workers par type d'agent (bulkheads)
+    agent_pool_sizes: dict = {
+        "planner": 1, "coder": 3, "reviewer": 2, "tester": 2
+    }
+    agent_pool_queue_depths: dict = {
+        "planner": 2, "coder": 10, "reviewer": 5, "tester": 5
+    }
+    
+    # Checkpoints des exécutions (reprise après crash)
+    enable_checkpoints: bool = True
+    checkpoint_dir: Path = Path("./checkpoints")
+    
+    # Historiques des exécutions (messages, actions) bornés en mémoire
+    history_dir: Path = Path("./history")
+    history_max_in_memory: int = 500
+    history_segment_size: int = 5000
+    
+    # Cache du contenu des fichiers de l'espace de travail (validé par mtime/taille ou ETag)
+    file_cache_max_bytes: int = 67108864  # 64MB
+    
+    # Cache persistant des réponses des modèles (à température > 0, seuls les appels use_cache=True
+    # l'utilisent par défaut: coder, reviewer et tester)
+    model_cache_enabled: bool = True
+    model_cache_path: Path = Path("./cache/model_responses.sqlite3")
+    model_cache_max_bytes: int = 104857600  # 100MB
+    model_cache_ttl: int = 604800  # secondes par entrée (0 = sans expiration)
+    model_cache_sampled: bool = False  # mettre aussi en cache les appels à température > 0
+    # Réutilisation des réponses à des prompts quasi identiques (MinHash/LSH, nécessite numpy)
+    model_similarity_cache: bool = False
+    model_similarity_thresholds: dict = {"planner": 0.9}  # similarité minimale par type d'agent
+    
+    # Budget (en tokens estimés) du contexte injecté dans les prompts, par modèle
+    prompt_context_budgets: dict = {
+        "default": 1500, "gemini-3-pro": 3000, "claude-sonnet-4.5": 2000, "gpt-oss": 1000
+    }
+    
+    # Pipeline en streaming (revue et tests pendant la génération)
+    streaming_pipeline: bool = False
+    review_batch_size: int = 5
+    
+    # Mode coordinateur/workers sur un seul hôte (0 = exécution dans le processus courant)
+    worker_processes: int = 0
+    worker_queue_path: Path = Path("./workers/jobs.sqlite3")
+    worker_agent_types: list = ["coder"]
+    worker_agent_factory: str = ""  # "module:fonction" retournant {AgentType: agent}
+    worker_lease_seconds: int = 60
     
     # Logging
     log_level: str = "INFO"
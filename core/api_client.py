@@ -1,28 +1,184 @@
 """
 Client API pour l'IDE Antigravity de Google
 """
+import asyncio
+import random
+import time
 import httpx
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
 from pathlib import Path
 import json
 from loguru import logger
 
 try:
     from ..config import settings
+    from .deadline import timeout_for, remaining_time, detached_deadline
+    from .commands import CommandChunk, stream_subprocess
 except ImportError:
     # Fallback pour exécution hors package
     import sys
     import os
     sys.path.append(str(Path(__file__).parent.parent))
     from config import settings
+    from core.deadline import timeout_for, remaining_time, detached_deadline
+    from core.commands import CommandChunk, stream_subprocess
 
 
 
 class AntigravityAPIError(Exception):
     """Exception pour les erreurs de l'API Antigravity"""
+    
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class AntigravityUnavailableError(AntigravityAPIError):
+    """API considérée hors ligne: disjoncteur ouvert, appel court-circuité"""
     pass
 
 
+# Codes indiquant qu'un endpoint n'existe pas sur cette version de l'IDE
+_UNSUPPORTED_STATUS = (404, 405, 501)
+
+# Codes d'une indisponibilité passagère (nouvelle tentative possible)
+_RETRYABLE_STATUS = (502, 503, 504)
+
+# Méthodes rejouables sans effet de bord supplémentaire
+_IDEMPOTENT_METHODS = ("GET", "PUT", "DELETE")
+
+
+class CircuitBreaker:
+    """Disjoncteur: s'ouvre après des échecs consécutifs et laisse passer une sonde après le délai"""
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.short_circuited = 0
+        self._probing = False
+    
+    def allow(self) -> bool:
+        """Autorise un appel (une seule sonde à la fois quand le délai est écoulé)"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.short_circuited += 1
+        return False
+    
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info("API Antigravity de nouveau joignable: disjoncteur refermé")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+    
+    def release(self):
+        """Libère la sonde d'un appel interrompu sans résultat"""
+        self._probing = False
+    
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(
+                    f"API Antigravity injoignable ({self.failures} échec(s)): "
+                    f"appels court-circuités pendant {self.cooldown:.0f}s"
+                )
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retourne l'état du disjoncteur"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "short_circuited": self.short_circuited
+        }
+
+
+# Un disjoncteur par URL d'API, partagé par toutes les instances du client
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(api_url: str) -> CircuitBreaker:
+    """Disjoncteur associé à une URL d'API"""
+    breaker = _breakers.get(api_url)
+    if breaker is None:
+        breaker = CircuitBreaker(settings.circuit_breaker_threshold, settings.circuit_breaker_cooldown)
+        _breakers[api_url] = breaker
+    return breaker
+
+
+# Client HTTP partagé par tous les AntigravityClient (pool de connexions keep-alive)
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_default_client: Optional["AntigravityClient"] = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 demandé et le paquet h2 installé"""
+    if not settings.http2:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        logger.warning("HTTP/2 demandé mais le paquet h2 est absent: HTTP/1.1 utilisé")
+        return False
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Client HTTP partagé de la boucle courante (créé à la première utilisation)"""
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    # Les connexions d'un pool sont liées à la boucle qui les a ouvertes
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            timeout=settings.timeout,
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry
+            ),
+            http2=_http2_available()
+        )
+        _http_client_loop = loop
+    return _http_client
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    """Crée le client partagé au démarrage (hook de startup du serveur)"""
+    return get_http_client()
+
+
+async def close_http_client():
+    """Ferme le client partagé et ses connexions (hook de shutdown du serveur)"""
+    global _http_client, _http_client_loop
+    client, _http_client, _http_client_loop = _http_client, None, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def get_antigravity_client() -> "AntigravityClient":
+    """Client Antigravity par défaut partagé par les agents"""
+    global _default_client
+    if _default_client is None:
+        _default_client = AntigravityClient()
+    return _default_client
+
+
 class AntigravityClient:
     """Client pour interagir avec l'API Antigravity"""
     
@@ -34,6 +190,15 @@ class AntigravityClient:
         self.api_url = api_url or settings.antigravity_api_url
         self.api_key = api_key or settings.antigravity_api_key
         self.timeout = settings.timeout
+        # Support des endpoints batch et du flux terminal de l'IDE (None: pas encore déterminé)
+        self.batch_supported: Optional[bool] = None
+        self.stream_supported: Optional[bool] = None
+        self.breaker = get_circuit_breaker(self.api_url)
+        self.name = "api"
+        self.is_remote = True
+        # Lectures identiques en cours (single-flight)
+        self._in_flight: Dict[tuple, asyncio.Future] = {}
+        self.coalesced_requests = 0
         
         if not self.api_key:
             logger.info("Aucune clé API Antigravity fournie. Mode dégradé (local) actif.")
@@ -52,36 +217,151 @@ class AntigravityClient:
         self,
         method: str,
         endpoint: str,
-        data: Optional[Dict[str, Any]] = None
+        data: Optional[Dict[str, Any]] = None,
+        idempotent: Optional[bool] = None,
+        coalesce: Optional[bool] = None,
+        headers: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
-        """Effectue une requête à l'API Antigravity"""
+        """Effectue une requête à l'API Antigravity (nouvelles tentatives si l'appel est idempotent)"""
         url = f"{self.api_url}{endpoint}"
+        if method not in ("GET", "POST", "PUT", "DELETE"):
+            raise ValueError(f"Méthode HTTP non supportée: {method}")
+        if idempotent is None:
+            idempotent = method in _IDEMPOTENT_METHODS
+        if coalesce is None:
+            coalesce = method == "GET"
+        if not coalesce:
+            return await self._request_with_retry(method, url, data, idempotent, headers)
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        # Lecture identique déjà en vol: partager sa réponse plutôt que refaire l'aller-retour
+        key = (
+            method,
+            url,
+            json.dumps(data, sort_keys=True) if data is not None else None,
+            tuple(sorted(headers.items())) if headers else None
+        )
+        flight = self._in_flight.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(self._shared_request(method, url, data, idempotent, headers))
+            self._in_flight[key] = flight
+            flight.add_done_callback(lambda done: self._land(key, done))
+        else:
+            self.coalesced_requests += 1
+        
+        # shield: l'annulation d'un appelant (ou son échéance) n'interrompt pas la requête des autres
+        try:
+            result = await asyncio.wait_for(asyncio.shield(flight), timeout=remaining_time())
+        except asyncio.TimeoutError:
+            raise AntigravityAPIError(f"Délai dépassé en attendant la réponse: {method} {endpoint}")
+        return dict(result)
+    
+    async def _shared_request(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict[str, Any]],
+        idempotent: bool,
+        headers: Optional[Dict[str, str]]
+    ) -> Dict[str, Any]:
+        """Requête partagée: ni l'échéance ni le budget de tentatives du premier appelant ne s'imposent aux autres"""
+        with detached_deadline():
+            return await self._request_with_retry(method, url, data, idempotent, headers)
+    
+    def _land(self, key: tuple, flight: asyncio.Future):
+        """Retire une requête terminée de la table des requêtes en vol"""
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+        if not flight.cancelled():
+            # Marque l'erreur comme récupérée même si tous les appelants ont été annulés
+            flight.exception()
+    
+    async def _request_with_retry(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict[str, Any]],
+        idempotent: bool,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Envoie une requête à travers le disjoncteur, avec nouvelles tentatives si elle est idempotente"""
+        endpoint = url[len(self.api_url):]
+        retries = settings.max_retries if idempotent else 0
+        
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise AntigravityUnavailableError("API Antigravity indisponible (disjoncteur ouvert)")
+            try:
+                result = await self._send(method, url, data, headers)
+            except AntigravityAPIError as e:
+                transient = e.status_code is None or e.status_code in _RETRYABLE_STATUS
+                if not transient:
+                    # Le serveur a répondu: l'API est joignable
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                delay = self._backoff(attempt)
+                if attempt >= retries or delay is None or self.breaker.state == CircuitBreaker.OPEN:
+                    raise
+                attempt += 1
+                logger.debug(f"Nouvelle tentative {attempt}/{retries} dans {delay:.2f}s: {method} {endpoint}")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Annulation ou erreur inattendue: ne pas garder la sonde réservée indéfiniment
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return result
+    
+    def _backoff(self, attempt: int) -> Optional[float]:
+        """Délai exponentiel avec jitter complet (None si l'échéance en cours ne le permet pas)"""
+        delay = random.uniform(0, min(settings.retry_backoff_max, settings.retry_backoff_base * 2 ** attempt))
+        remaining = remaining_time()
+        if remaining is not None and remaining <= delay:
+            return None
+        return delay
+    
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Envoie une requête unique"""
+        # Client partagé: la connexion (TCP/TLS) est réutilisée d'un appel à l'autre
+        client = get_http_client()
+        try:
+            response = await client.request(
+                method,
+                url,
+                headers={**self._get_headers(), **(headers or {})},
+                json=data if method in ("POST", "PUT") else None,
+                timeout=timeout_for(self.timeout)
+            )
+            etag = response.headers.get("etag")
+            if response.status_code == 304:
+                return {"not_modified": True, "etag": etag}
+            response.raise_for_status()
             try:
-                if method == "GET":
-                    response = await client.get(url, headers=self._get_headers())
-                elif method == "POST":
-                    response = await client.post(url, headers=self._get_headers(), json=data)
-                elif method == "PUT":
-                    response = await client.put(url, headers=self._get_headers(), json=data)
-                elif method == "DELETE":
-                    response = await client.delete(url, headers=self._get_headers())
-                else:
-                    raise ValueError(f"Méthode HTTP non supportée: {method}")
-                
-                response.raise_for_status()
-                return response.json()
-            
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Erreur HTTP: {e.response.status_code} - {e.response.text}")
-                raise AntigravityAPIError(f"Erreur API: {e.response.status_code}")
-            except httpx.TimeoutException:
-                logger.error("Timeout lors de la requête API")
-                raise AntigravityAPIError("Timeout de la requête")
-            except httpx.RequestError as e:
-                logger.error(f"Erreur de requête: {e}")
-                raise AntigravityAPIError(f"Erreur de connexion: {e}")
+                result = response.json()
+            except ValueError:
+                logger.error(f"Réponse non JSON: {response.status_code} - {response.text[:200]}")
+                raise AntigravityAPIError("Réponse API invalide (JSON attendu)", response.status_code)
+            if etag and isinstance(result, dict):
+                result.setdefault("etag", etag)
+            return result
+        
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Erreur HTTP: {e.response.status_code} - {e.response.text}")
+            raise AntigravityAPIError(f"Erreur API: {e.response.status_code}", e.response.status_code)
+        except httpx.TimeoutException:
+            logger.error("Timeout lors de la requête API")
+            raise AntigravityAPIError("Timeout de la requête")
+        except httpx.RequestError as e:
+            logger.error(f"Erreur de requête: {e}")
+            raise AntigravityAPIError(f"Erreur de connexion: {e}")
     
     # Méthodes pour les fichiers
     
@@ -93,7 +373,7 @@ class AntigravityClient:
     async def write_file(self, file_path: str, content: str) -> bool:
         """Écrit du contenu dans un fichier"""
         data = {"path": file_path, "content": content}
-        result = await self._make_request("POST", "/files/write", data)
+        result = await self._make_request("POST", "/files/write", data, idempotent=True)
         return result.get("success", False)
     
     async def list_files(self, directory: str) -> List[str]:
@@ -106,6 +386,91 @@ class AntigravityClient:
         result = await self._make_request("DELETE", f"/files?path={file_path}")
         return result.get("success", False)
     
+    # Opérations groupées sur les fichiers
+    
+    async def read_file_if_changed(self, file_path: str, etag: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """Lecture conditionnelle: (None, etag) si le fichier n'a pas changé, sinon (contenu, nouvel ETag)"""
+        headers = {"If-None-Match": etag} if etag else None
+        result = await self._make_request("GET", f"/files/read?path={file_path}", headers=headers)
+        if result.get("not_modified"):
+            return None, etag
+        return result.get("content", ""), result.get("etag")
+    
+    async def read_files(self, file_paths: List[str]) -> Dict[str, str]:
+        """Lit plusieurs fichiers en une requête (ou en parallèle); les fichiers illisibles sont omis"""
+        outcomes = await self.read_files_if_changed({path: None for path in file_paths})
+        return {path: content for path, (content, _) in outcomes.items() if content}
+    
+    async def read_files_if_changed(
+        self,
+        etags: Dict[str, Optional[str]]
+    ) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """Lecture conditionnelle groupée: {chemin: (contenu ou None si inchangé, ETag)}; les fichiers illisibles sont omis"""
+        known = {path: etag for path, etag in etags.items() if etag}
+        payload = {"paths": list(etags)}
+        if known:
+            payload["etags"] = known
+        result = await self._batch("/files/batch/read", payload, coalesce=True)
+        if result is not None:
+            not_modified = set(result.get("not_modified", [])) & set(known)
+            files = result.get("files", {})
+            new_etags = result.get("etags", {})
+            outcomes = {path: (None, known[path]) for path in not_modified}
+            for path in etags:
+                if path not in outcomes and files.get(path):
+                    outcomes[path] = (files[path], new_etags.get(path))
+            return outcomes
+        
+        responses = await self._gather(self.read_file_if_changed, list(etags.items()))
+        return {
+            path: response for path, response in zip(etags, responses)
+            if isinstance(response, tuple) and (response[0] is None or response[0])
+        }
+    
+    async def write_files(self, files: Dict[str, str]) -> Dict[str, bool]:
+        """Écrit plusieurs fichiers; retourne le succès de chaque écriture"""
+        payload = {"files": [{"path": path, "content": content} for path, content in files.items()]}
+        result = await self._batch("/files/batch/write", payload)
+        if result is not None:
+            return {path: bool(result.get("results", {}).get(path, False)) for path in files}
+        
+        outcomes = await self._gather(self.write_file, list(files.items()))
+        return {path: outcome is True for path, outcome in zip(files, outcomes)}
+    
+    async def delete_files(self, file_paths: List[str]) -> Dict[str, bool]:
+        """Supprime plusieurs fichiers; retourne le succès de chaque suppression"""
+        result = await self._batch("/files/batch/delete", {"paths": file_paths})
+        if result is not None:
+            return {path: bool(result.get("results", {}).get(path, False)) for path in file_paths}
+        
+        outcomes = await self._gather(self.delete_file, [(path,) for path in file_paths])
+        return {path: outcome is True for path, outcome in zip(file_paths, outcomes)}
+    
+    async def _batch(self, endpoint: str, data: Dict[str, Any], coalesce: bool = False) -> Optional[Dict[str, Any]]:
+        """Appelle un endpoint batch; None si l'IDE ne le supporte pas"""
+        if self.batch_supported is False:
+            return None
+        try:
+            result = await self._make_request("POST", endpoint, data, idempotent=True, coalesce=coalesce)
+        except AntigravityAPIError as e:
+            if e.status_code in _UNSUPPORTED_STATUS:
+                logger.info("Endpoints batch non supportés par l'IDE: requêtes parallèles")
+                self.batch_supported = False
+                return None
+            raise
+        self.batch_supported = True
+        return result
+    
+    async def _gather(self, operation, arguments: List[tuple]) -> List[Any]:
+        """Exécute une opération unitaire en parallèle (concurrence bornée); les erreurs sont retournées"""
+        semaphore = asyncio.Semaphore(max(1, settings.file_batch_concurrency))
+        
+        async def run(args):
+            async with semaphore:
+                return await operation(*args)
+        
+        return await asyncio.gather(*(run(args) for args in arguments), return_exceptions=True)
+    
     # Méthodes pour l'éditeur
     
     async def get_cursor_position(self) -> Dict[str, int]:
@@ -134,6 +499,88 @@ class AntigravityClient:
             "stderr": result.get("stderr", "")
         }
     
+    async def execute_command_stream(self, command: str, cwd: Optional[str] = None) -> AsyncIterator[CommandChunk]:
+        """Exécute une commande et produit sa sortie au fil de l'eau, puis un morceau "exit"
+
+        Utilise le flux HTTP de l'IDE (un objet JSON par ligne) s'il est disponible, sinon un
+        sous-processus local lancé dans cwd, la racine locale du projet: sans elle, pas de repli.
+        Fermer l'itérateur avant la fin interrompt la commande.
+        """
+        response = None
+        if self.stream_supported is not False and self.breaker.allow():
+            response = await self._open_command_stream(command)
+        
+        if response is None:
+            if cwd is None:
+                raise AntigravityUnavailableError(
+                    "Flux terminal de l'IDE indisponible et aucun répertoire de projet pour une exécution locale"
+                )
+            local = stream_subprocess(command, cwd)
+            try:
+                async for chunk in local:
+                    yield chunk
+            finally:
+                await local.aclose()
+            return
+        
+        exit_code = None
+        try:
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    yield CommandChunk("stdout", line + "\n")
+                    continue
+                if "exit_code" in message:
+                    exit_code = message["exit_code"]
+                    break
+                yield CommandChunk(message.get("stream", "stdout"), message.get("data", ""))
+        finally:
+            # Fermer la réponse coupe la connexion: l'IDE interrompt la commande
+            await response.aclose()
+        yield CommandChunk("exit", exit_code=exit_code)
+    
+    async def _open_command_stream(self, command: str) -> Optional[httpx.Response]:
+        """Ouvre le flux terminal de l'IDE; None s'il n'est pas supporté ou injoignable"""
+        client = get_http_client()
+        request = client.build_request(
+            "POST",
+            f"{self.api_url}/terminal/execute/stream",
+            headers=self._get_headers(),
+            json={"command": command},
+            # Pas de délai de lecture propre: seule l'échéance en cours borne une commande longue
+            timeout=httpx.Timeout(timeout_for(self.timeout), read=remaining_time())
+        )
+        try:
+            response = await client.send(request, stream=True)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except httpx.RequestError as e:
+            logger.warning(f"Flux terminal injoignable, exécution locale: {e}")
+            self.breaker.record_failure()
+            return None
+        
+        if response.status_code in _UNSUPPORTED_STATUS:
+            await response.aclose()
+            logger.info("Flux terminal non supporté par l'IDE: exécution locale")
+            self.breaker.record_success()
+            self.stream_supported = False
+            return None
+        if response.is_error:
+            await response.aclose()
+            if response.status_code in _RETRYABLE_STATUS:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise AntigravityAPIError(f"Erreur API: {response.status_code}", response.status_code)
+        
+        self.breaker.record_success()
+        self.stream_supported = True
+        return response
+    
     # Méthodes pour l'intelligence artificielle
     
     async def get_ai_suggestion(self, context: str) -> str:
@@ -155,11 +602,19 @@ class AntigravityClient:
         data = {"pattern": pattern}
         if path:
             data["path"] = path
-        result = await self._make_request("POST", endpoint, data)
+        result = await self._make_request("POST", endpoint, data, idempotent=True, coalesce=True)
         return result.get("results", [])
     
     # Méthodes utilitaires
     
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retourne l'état du client (disjoncteur, requêtes partagées)"""
+        return {
+            "circuit_breaker": self.breaker.get_statistics(),
+            "in_flight": len(self._in_flight),
+            "coalesced_requests": self.coalesced_requests
+        }
+    
     async def check_connection(self) -> bool:
         """Vérifie la connexion avec l'API Antigravity"""
         try:
@@ -0,0 +1,178 @@
+"""
+Checkpoints incrémentaux des exécutions pour reprise après crash
+"""
+import json
+import os
+from typing import Dict, List, Optional, Any, Tuple
+from pathlib import Path
+from datetime import datetime
+from itertools import islice
+from loguru import logger
+
+from .context import Context, Task
+
+
+class CheckpointStore:
+    """Journal append-only (JSON Lines) de l'état de chaque exécution"""
+
+    def __init__(self, checkpoint_dir: Path, fsync: bool = False):
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.fsync = fsync
+
+        # Position déjà journalisée par exécution (tâches, messages, fichiers)
+        self._cursors: Dict[str, Dict[str, int]] = {}
+
+    def _journal_path(self, run_id: str) -> Path:
+        return self.checkpoint_dir / f"{run_id}.jsonl"
+
+    def _append(self, run_id: str, record: Dict[str, Any]):
+        """Ajoute un enregistrement au journal de l'exécution"""
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        record["timestamp"] = datetime.now().isoformat()
+
+        with open(self._journal_path(run_id), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def attach(self, context: Context, description: str):
+        """Démarre la journalisation d'un contexte et l'abonne à ses changements de statut"""
+        run_id = context.run_id
+        if run_id not in self._cursors:
+            self._cursors[run_id] = {"tasks": 0, "messages": 0, "files_created": 0, "files_modified": 0}
+            if not self._journal_path(run_id).exists():
+                self._append(run_id, {
+                    "type": "start",
+                    "description": description,
+                    "project_path": context.project_path,
+                    "project_name": context.project_name,
+                    "project_description": context.project_description,
+                    "started_at": context.started_at.isoformat()
+                })
+            else:
+                # Reprise: le contexte restauré correspond déjà au journal
+                self._cursors[run_id] = {
+                    "tasks": len(context.tasks),
+                    "messages": len(context.messages),
+                    "files_created": len(context.files_created),
+                    "files_modified": len(context.files_modified)
+                }
+
+        if self._on_status_change not in context.status_listeners:
+            context.status_listeners.append(self._on_status_change)
+
+    def detach(self, context: Context, status: Optional[str] = None):
+        """Arrête la journalisation d'un contexte et enregistre son statut final"""
+        if self._on_status_change in context.status_listeners:
+            context.status_listeners.remove(self._on_status_change)
+
+        if context.run_id in self._cursors:
+            self.checkpoint(context)
+            if status:
+                self._append(context.run_id, {"type": "end", "status": status})
+            del self._cursors[context.run_id]
+
+    def _on_status_change(self, context: Context, task: Task):
+        self.checkpoint(context, task)
+
+    def checkpoint(self, context: Context, task: Optional[Task] = None):
+        """Journalise uniquement ce qui a changé depuis le dernier checkpoint"""
+        cursor = self._cursors.get(context.run_id)
+        if cursor is None:
+            return
+
+        new_tasks = list(islice(context.tasks.values(), cursor["tasks"], None))
+        if task is not None and all(t is not task for t in new_tasks):
+            new_tasks.append(task)
+
+        record = {
+            "type": "delta",
+            "tasks": [t.to_dict() for t in new_tasks],
+            "messages": context.messages[cursor["messages"]:],
+            "files_created": context.files_created[cursor["files_created"]:],
+            "files_modified": context.files_modified[cursor["files_modified"]:],
+            "tasks_completed": context.tasks_completed,
+            "tasks_failed": context.tasks_failed,
+            "total_iterations": context.total_iterations
+        }
+
+        try:
+            self._append(context.run_id, record)
+        except OSError as e:
+            logger.error(f"Impossible d'écrire le checkpoint de {context.run_id}: {e}")
+            return
+
+        cursor["tasks"] = len(context.tasks)
+        cursor["messages"] = len(context.messages)
+        cursor["files_created"] = len(context.files_created)
+        cursor["files_modified"] = len(context.files_modified)
+
+    def load(
+        self,
+        run_id: str,
+        history_dir: Optional[Path] = None,
+        history_max_in_memory: Optional[int] = None,
+        history_segment_size: Optional[int] = None
+    ) -> Optional[Tuple[Context, str, Optional[str]]]:
+        """Rejoue le journal et retourne (contexte, description, statut final)
+
+        Avec history_dir, les historiques du contexte débordent sur disque pendant le rejeu.
+        """
+        journal = self._journal_path(run_id)
+        if not journal.exists():
+            return None
+
+        context = None
+        description = ""
+        final_status = None
+
+        with open(journal, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Dernière ligne tronquée par un crash
+                    logger.warning(f"Enregistrement de checkpoint illisible ignoré ({run_id})")
+                    continue
+
+                if record["type"] == "start":
+                    description = record["description"]
+                    context = Context(
+                        project_path=record["project_path"],
+                        project_name=record["project_name"],
+                        project_description=record["project_description"],
+                        run_id=run_id,
+                        started_at=datetime.fromisoformat(record["started_at"])
+                    )
+                    if history_dir is not None:
+                        context.configure_history(history_dir, history_max_in_memory, history_segment_size)
+                elif record["type"] == "delta" and context is not None:
+                    for task_data in record["tasks"]:
+                        context.tasks[task_data["id"]] = Task.from_dict(task_data)
+                    context.messages.extend(record["messages"])
+                    context.files_created.extend(record["files_created"])
+                    context.files_modified.extend(record["files_modified"])
+                    context.tasks_completed = record["tasks_completed"]
+                    context.tasks_failed = record["tasks_failed"]
+                    context.total_iterations = record["total_iterations"]
+                elif record["type"] == "end":
+                    final_status = record["status"]
+
+        if context is None:
+            return None
+        return context, description, final_status
+
+    def list_runs(self) -> List[str]:
+        """Liste les exécutions ayant un checkpoint"""
+        if not self.checkpoint_dir.exists():
+            return []
+        return sorted(p.stem for p in self.checkpoint_dir.glob("*.jsonl"))
+
+    def delete(self, run_id: str) -> bool:
+        """Supprime le checkpoint d'une exécution"""
+        journal = self._journal_path(run_id)
+        if journal.exists():
+            journal.unlink()
+            return True
+        return False
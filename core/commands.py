@@ -0,0 +1,118 @@
+"""
+Exécution de commandes en flux (sortie morceau par morceau, code de sortie en fin de flux)
+"""
+import asyncio
+import codecs
+import os
+import signal
+from dataclasses import dataclass
+from typing import Optional, AsyncIterator
+from loguru import logger
+
+try:
+    from .deadline import remaining_time
+except ImportError:
+    from core.deadline import remaining_time
+
+
+# Taille maximale d'une ligne lue sur la sortie d'un sous-processus
+MAX_LINE_BYTES = 1024 * 1024
+
+# Morceaux de sortie en attente du lecteur (au-delà, la lecture des tubes est suspendue)
+QUEUE_CHUNKS = 64
+
+
+@dataclass
+class CommandChunk:
+    """Morceau de sortie d'une commande; le dernier porte le code de sortie"""
+    stream: str  # "stdout", "stderr" ou "exit"
+    data: str = ""
+    exit_code: Optional[int] = None
+
+    @property
+    def is_exit(self) -> bool:
+        return self.stream == "exit"
+
+
+def _kill(process: asyncio.subprocess.Process):
+    """Tue la commande et ses sous-processus (qui gardent sinon les tubes de sortie ouverts)"""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+
+async def _pump(reader: asyncio.StreamReader, name: str, queue: asyncio.Queue):
+    """Transmet la sortie d'un flux ligne par ligne; une ligne trop longue part par blocs"""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        try:
+            data = await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            # Fin du flux: dernière ligne sans retour à la ligne
+            data = e.partial
+        except asyncio.LimitOverrunError as e:
+            # Les octets restent dans le tampon: les lire jusqu'à la limite
+            data = await reader.readexactly(e.consumed)
+        if not data:
+            break
+        text = decoder.decode(data)
+        if text:
+            await queue.put(CommandChunk(name, text))
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        await queue.put(CommandChunk(name, tail))
+
+
+async def stream_subprocess(command: str, cwd: Optional[str] = None) -> AsyncIterator[CommandChunk]:
+    """Exécute une commande locale et produit sa sortie ligne par ligne
+
+    Fermer l'itérateur avant la fin (break, aclose) tue la commande.
+    """
+    process = await asyncio.create_subprocess_shell(
+        command,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=MAX_LINE_BYTES,
+        # Groupe de processus propre: l'interruption atteint aussi les sous-commandes du shell
+        start_new_session=hasattr(os, "killpg")
+    )
+    # File bornée: un lecteur lent ralentit la commande au lieu d'accumuler toute sa sortie
+    queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_CHUNKS)
+
+    async def pump(reader: asyncio.StreamReader, name: str):
+        try:
+            await _pump(reader, name, queue)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Lecture de la sortie {name} interrompue: {e}")
+        await queue.put(None)
+
+    pumps = [
+        asyncio.ensure_future(pump(process.stdout, "stdout")),
+        asyncio.ensure_future(pump(process.stderr, "stderr"))
+    ]
+    try:
+        open_streams = len(pumps)
+        while open_streams:
+            # L'échéance en cours (sous-tâche, exécution) borne toute la commande
+            chunk = await asyncio.wait_for(queue.get(), timeout=remaining_time())
+            if chunk is None:
+                open_streams -= 1
+                continue
+            yield chunk
+
+        exit_code = await asyncio.wait_for(process.wait(), timeout=remaining_time())
+        yield CommandChunk("exit", exit_code=exit_code)
+    finally:
+        for task in pumps:
+            task.cancel()
+        if process.returncode is None:
+            logger.info(f"Commande interrompue avant la fin: {command}")
+            _kill(process)
+            await process.wait()
@@ -1,10 +1,30 @@
 """
 Gestion du contexte pour les agents
 """
-from typing import Dict, List, Any, Optional
+import time
+from array import array
+from bisect import bisect_right
+from typing import Dict, List, Any, Optional, Callable, Mapping, Sequence, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from pathlib import Path
+from types import MappingProxyType
+
+from .history import SpillableLog
+
+
+# Nombre d'actions récentes incluses dans to_dict (le reste se lit par offset)
+RECENT_ACTIONS_IN_PAYLOAD = 20
+
+# Nombre maximal d'entrées d'historique renvoyées par to_delta (le reste se lit par offset)
+DELTA_HISTORY_LIMIT = 200
+
+# Au-delà, les relevés de longueurs les plus anciens sont espacés (un sur deux)
+MAX_VERSION_MARKS = 1024
+
+# Publications d'instantanés entre deux fusions de la surcouche des tâches modifiées
+SNAPSHOT_COLLAPSE_EVERY = 16
 
 
 class TaskStatus(Enum):
@@ -14,6 +34,7 @@ class TaskStatus(Enum):
     COMPLETED = "completed"
     FAILED = "failed"
     BLOCKED = "blocked"
+    CANCELLED = "cancelled"
 
 
 class AgentType(Enum):
@@ -24,19 +45,401 @@ class AgentType(Enum):
     TESTER = "tester"
 
 
-@dataclass
 class Task:
-    """Représente une tâche à accomplir"""
-    id: str
-    description: str
-    status: TaskStatus = TaskStatus.PENDING
-    dependencies: List[str] = field(default_factory=list)
-    subtasks: List[str] = field(default_factory=list)
-    assigned_agent: Optional[AgentType] = None
-    created_at: datetime = field(default_factory=datetime.now)
-    updated_at: datetime = field(default_factory=datetime.now)
-    result: Optional[str] = None
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    """Représente une tâche à accomplir (enregistrement compact à __slots__)"""
+    
+    __slots__ = (
+        "id", "description", "_status", "dependencies", "_subtasks", "_assigned_agent",
+        "priority", "_created_at", "_updated_at", "result", "_metadata", "_store"
+    )
+    
+    def __init__(
+        self,
+        id: str,
+        description: str,
+        status: TaskStatus = TaskStatus.PENDING,
+        dependencies: Optional[List[str]] = None,
+        subtasks: Optional[List[str]] = None,
+        assigned_agent: Optional[AgentType] = None,
+        priority: int = 0,  # Plus la valeur est faible, plus la tâche est prioritaire
+        created_at: Optional[datetime] = None,
+        updated_at: Optional[datetime] = None,
+        result: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        self._store = None
+        self.id = id
+        self.description = description
+        self._status = status
+        self.dependencies = dependencies if dependencies is not None else []
+        self._subtasks = subtasks or None
+        self._assigned_agent = assigned_agent
+        self.priority = priority
+        # Horodatages stockés en secondes (float) plutôt qu'en datetime
+        now = time.time()
+        self._created_at = created_at.timestamp() if created_at else now
+        self._updated_at = updated_at.timestamp() if updated_at else now
+        self.result = result
+        self._metadata = metadata or None
+    
+    @property
+    def status(self) -> TaskStatus:
+        return self._status
+    
+    @status.setter
+    def status(self, status: TaskStatus):
+        previous = self._status
+        self._status = status
+        if self._store is not None and previous != status:
+            self._store._reindex(self, previous, self._assigned_agent)
+    
+    @property
+    def assigned_agent(self) -> Optional[AgentType]:
+        return self._assigned_agent
+    
+    @assigned_agent.setter
+    def assigned_agent(self, agent: Optional[AgentType]):
+        previous = self._assigned_agent
+        self._assigned_agent = agent
+        if self._store is not None and previous != agent:
+            self._store._reindex(self, self._status, previous)
+    
+    @property
+    def subtasks(self) -> List[str]:
+        if self._subtasks is None:
+            self._subtasks = []
+        return self._subtasks
+    
+    @subtasks.setter
+    def subtasks(self, subtasks: List[str]):
+        self._subtasks = subtasks
+    
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+    
+    @metadata.setter
+    def metadata(self, metadata: Dict[str, Any]):
+        self._metadata = metadata
+    
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self._created_at)
+    
+    @created_at.setter
+    def created_at(self, value: datetime):
+        self._created_at = value.timestamp()
+    
+    @property
+    def updated_at(self) -> datetime:
+        return datetime.fromtimestamp(self._updated_at)
+    
+    @updated_at.setter
+    def updated_at(self, value: datetime):
+        self._updated_at = value.timestamp()
+    
+    def touch(self):
+        """Met à jour l'horodatage de modification"""
+        self._updated_at = time.time()
+        if self._store is not None:
+            self._store._changed(self.id)
+    
+    def __repr__(self) -> str:
+        return (
+            f"Task(id={self.id!r}, status={self._status}, assigned_agent={self._assigned_agent}, "
+            f"dependencies={self.dependencies!r}, priority={self.priority})"
+        )
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Task):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+    
+    __hash__ = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convertit la tâche en dictionnaire"""
+        return {
+            "id": self.id,
+            "description": self.description,
+            "status": self._status.value,
+            "dependencies": self.dependencies,
+            "subtasks": self._subtasks or [],
+            "assigned_agent": self._assigned_agent.value if self._assigned_agent else None,
+            "priority": self.priority,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+            "result": self.result,
+            "metadata": self._metadata or {}
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Task":
+        """Reconstruit une tâche à partir de son dictionnaire"""
+        return cls(
+            id=data["id"],
+            description=data.get("description", ""),
+            status=TaskStatus(data.get("status", TaskStatus.PENDING.value)),
+            dependencies=list(data.get("dependencies", [])),
+            subtasks=list(data.get("subtasks", [])),
+            assigned_agent=AgentType(data["assigned_agent"]) if data.get("assigned_agent") else None,
+            priority=data.get("priority", 0),
+            created_at=datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None,
+            updated_at=datetime.fromisoformat(data["updated_at"]) if data.get("updated_at") else None,
+            result=data.get("result"),
+            metadata=dict(data.get("metadata", {}))
+        )
+
+
+class TaskStore(dict):
+    """Dictionnaire de tâches indexé par statut et par agent assigné"""
+    
+    def __init__(self, tasks: Optional[Dict[str, Task]] = None):
+        super().__init__()
+        # Dictionnaires imbriqués: ajout/retrait en O(1), ordre d'insertion conservé
+        self._by_status: Dict[TaskStatus, Dict[str, Task]] = {}
+        self._by_agent_status: Dict[tuple, Dict[str, Task]] = {}
+        # Notifié à chaque ajout, retrait ou modification d'une tâche (versions du contexte)
+        self.on_change: Optional[Callable[[str], None]] = None
+        if tasks:
+            self.update(tasks)
+    
+    def __setitem__(self, task_id: str, task: Task):
+        if task_id in self:
+            previous = super().__getitem__(task_id)
+            self._unindex(previous, previous._status, previous._assigned_agent)
+        super().__setitem__(task_id, task)
+        task._store = self
+        self._index(task)
+        self._changed(task_id)
+    
+    def __delitem__(self, task_id: str):
+        task = super().__getitem__(task_id)
+        super().__delitem__(task_id)
+        self._unindex(task, task._status, task._assigned_agent)
+        task._store = None
+        self._changed(task_id)
+    
+    def pop(self, task_id: str, *default):
+        if task_id not in self:
+            if default:
+                return default[0]
+            raise KeyError(task_id)
+        task = super().__getitem__(task_id)
+        del self[task_id]
+        return task
+    
+    def setdefault(self, task_id: str, task: Task = None) -> Task:
+        if task_id not in self:
+            self[task_id] = task
+        return super().__getitem__(task_id)
+    
+    def update(self, *args, **kwargs):
+        for task_id, task in dict(*args, **kwargs).items():
+            self[task_id] = task
+    
+    def clear(self):
+        task_ids = list(self)
+        for task in self.values():
+            task._store = None
+        super().clear()
+        self._by_status.clear()
+        self._by_agent_status.clear()
+        for task_id in task_ids:
+            self._changed(task_id)
+    
+    def by_status(self, status: TaskStatus) -> List[Task]:
+        """Tâches ayant un statut donné"""
+        return list(self._by_status.get(status, {}).values())
+    
+    def by_agent(self, agent_type: AgentType, status: Optional[TaskStatus] = None) -> List[Task]:
+        """Tâches assignées à un agent (éventuellement filtrées par statut)"""
+        if status is not None:
+            return list(self._by_agent_status.get((agent_type, status), {}).values())
+        return [
+            task for (agent, _), tasks in self._by_agent_status.items() if agent == agent_type
+            for task in tasks.values()
+        ]
+    
+    def count_by_status(self) -> Dict[str, int]:
+        """Nombre de tâches par statut"""
+        return {status.value: len(tasks) for status, tasks in self._by_status.items() if tasks}
+    
+    def _index(self, task: Task):
+        self._by_status.setdefault(task._status, {})[task.id] = task
+        self._by_agent_status.setdefault((task._assigned_agent, task._status), {})[task.id] = task
+    
+    def _unindex(self, task: Task, status: TaskStatus, agent: Optional[AgentType]):
+        self._by_status.get(status, {}).pop(task.id, None)
+        self._by_agent_status.get((agent, status), {}).pop(task.id, None)
+    
+    def _reindex(self, task: Task, previous_status: TaskStatus, previous_agent: Optional[AgentType]):
+        """Appelé par la tâche quand son statut ou son agent change"""
+        if super().get(task.id) is not task:
+            return
+        self._unindex(task, previous_status, previous_agent)
+        self._index(task)
+        self._changed(task.id)
+    
+    def _changed(self, task_id: str):
+        if self.on_change is not None:
+            self.on_change(task_id)
+
+
+def _freeze_task(task: Task) -> Mapping[str, Any]:
+    """Copie figée d'une tâche (listes en tuples, vue en lecture seule)"""
+    data = task.to_dict()
+    data["dependencies"] = tuple(data["dependencies"])
+    data["subtasks"] = tuple(data["subtasks"])
+    data["metadata"] = MappingProxyType(dict(data["metadata"]))
+    return MappingProxyType(data)
+
+
+# Marque une tâche supprimée dans la surcouche d'un instantané
+_REMOVED = object()
+
+
+class SnapshotTasks(Mapping):
+    """Tâches figées d'un instantané: base partagée entre instantanés + petite surcouche des modifications
+
+    Publier un instantané ne copie que la surcouche; elle est fusionnée dans une nouvelle base
+    toutes les SNAPSHOT_COLLAPSE_EVERY publications ou quand elle dépasse la moitié de la base.
+    """
+    
+    __slots__ = ("_base", "_overlay", "_length", "_generation")
+    
+    def __init__(self, base: Mapping[str, Any], overlay: Optional[Dict[str, Any]] = None, generation: int = 0):
+        self._base = base
+        self._overlay = overlay or {}
+        self._generation = generation
+        length = len(base)
+        for task_id, task in self._overlay.items():
+            if task_id in base:
+                length -= task is _REMOVED
+            else:
+                length += task is not _REMOVED
+        self._length = length
+    
+    def __getitem__(self, task_id: str) -> Mapping[str, Any]:
+        task = self._overlay.get(task_id, _REMOVED)
+        if task is _REMOVED:
+            if task_id in self._overlay:
+                raise KeyError(task_id)
+            return self._base[task_id]
+        return task
+    
+    def __iter__(self):
+        # Ordre d'insertion du contexte: tâches de la base, puis nouvelles tâches
+        overlay = self._overlay
+        for task_id in self._base:
+            if overlay.get(task_id) is not _REMOVED:
+                yield task_id
+        for task_id, task in overlay.items():
+            if task is not _REMOVED and task_id not in self._base:
+                yield task_id
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def updated(self, changes: Dict[str, Any]) -> "SnapshotTasks":
+        """Nouvelle vue avec les tâches modifiées (_REMOVED pour une suppression)"""
+        overlay = dict(self._overlay)
+        overlay.update(changes)
+        generation = self._generation + 1
+        if generation < SNAPSHOT_COLLAPSE_EVERY and len(overlay) <= len(self._base) // 2:
+            return SnapshotTasks(self._base, overlay, generation)
+        merged = SnapshotTasks(self._base, overlay)
+        return SnapshotTasks({task_id: merged[task_id] for task_id in merged})
+
+
+class AppendOnlyView(Sequence):
+    """Vue figée des length premiers éléments d'une liste qui ne fait que grandir (sans copie)"""
+    
+    __slots__ = ("_items", "_length")
+    
+    def __init__(self, items: List[Any], length: Optional[int] = None):
+        self._items = items
+        self._length = len(items) if length is None else length
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self._items[i] for i in range(*index.indices(self._length)))
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return self._items[index]
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (AppendOnlyView, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"AppendOnlyView({list(self)!r})"
+
+
+@dataclass(frozen=True)
+class ContextSnapshot:
+    """État immuable d'un contexte à une version donnée, lisible sans verrou"""
+    version: int
+    run_id: Optional[str]
+    project_path: str
+    project_name: str
+    project_description: str
+    # Les tâches inchangées sont partagées avec l'instantané précédent
+    tasks: Mapping[str, Mapping[str, Any]]
+    recent_actions: Tuple[Dict[str, Any], ...]
+    action_history_size: int
+    messages_size: int
+    # Vues sur les listes du contexte, qui ne font que grandir
+    files_created: Sequence[str]
+    files_modified: Sequence[str]
+    files_deleted: Sequence[str]
+    tasks_completed: int
+    tasks_failed: int
+    total_iterations: int
+    started_at: datetime
+    updated_at: datetime
+    
+    def tasks_by_status(self, status: TaskStatus) -> List[Mapping[str, Any]]:
+        """Tâches de l'instantané ayant un statut donné"""
+        return [task for task in self.tasks.values() if task["status"] == status.value]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Même forme que Context.to_dict, construite depuis l'instantané"""
+        return {
+            "run_id": self.run_id,
+            "version": self.version,
+            "project_path": self.project_path,
+            "project_name": self.project_name,
+            "project_description": self.project_description,
+            "tasks": {
+                task_id: {
+                    **task,
+                    "dependencies": list(task["dependencies"]),
+                    "subtasks": list(task["subtasks"]),
+                    "metadata": dict(task["metadata"])
+                }
+                for task_id, task in self.tasks.items()
+            },
+            "action_history": list(self.recent_actions),
+            "action_history_size": self.action_history_size,
+            "messages_size": self.messages_size,
+            "files_created": list(self.files_created),
+            "files_modified": list(self.files_modified),
+            "files_deleted": list(self.files_deleted),
+            "tasks_completed": self.tasks_completed,
+            "tasks_failed": self.tasks_failed,
+            "total_iterations": self.total_iterations,
+            "started_at": self.started_at.isoformat(),
+            "updated_at": self.updated_at.isoformat()
+        }
 
 
 @dataclass
@@ -48,12 +451,15 @@ class Context:
     project_name: str
     project_description: str
     
-    # Tâches
-    tasks: Dict[str, Task] = field(default_factory=dict)
+    # Identifiant de l'exécution (run) à laquelle appartient ce contexte
+    run_id: Optional[str] = None
+    
+    # Tâches (indexées par statut et par agent)
+    tasks: TaskStore = field(default_factory=TaskStore)
     current_task: Optional[str] = None
     
-    # Historique des actions
-    action_history: List[Dict[str, Any]] = field(default_factory=list)
+    # Historique des actions (borné en mémoire, voir configure_history)
+    action_history: SpillableLog = field(default_factory=lambda: SpillableLog("actions"))
     
     # État du projet
     files_created: List[str] = field(default_factory=list)
@@ -65,13 +471,52 @@ class Context:
     tasks_failed: int = 0
     total_iterations: int = 0
     
-    # Messages et communication
-    messages: List[Dict[str, str]] = field(default_factory=list)
+    # Messages et communication (bornés en mémoire, voir configure_history)
+    messages: SpillableLog = field(default_factory=lambda: SpillableLog("messages"))
     
     # Métadonnées
     started_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
     
+    # Abonnés notifiés à chaque fichier créé (pipeline en streaming)
+    file_listeners: List[Callable[[str], None]] = field(default_factory=list, repr=False)
+    
+    # Abonnés notifiés à chaque changement de statut de tâche (checkpoints)
+    status_listeners: List[Callable[["Context", Task], None]] = field(default_factory=list, repr=False)
+    
+    # Version incrémentée à chaque modification (voir to_delta)
+    version: int = field(default=0, compare=False)
+    # Dernière version ayant modifié chaque tâche, dans l'ordre des modifications
+    _task_versions: Dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    # Longueurs des historiques relevées à chaque version où elles ont changé
+    _marks: Dict[str, array] = field(default_factory=dict, init=False, repr=False, compare=False)
+    # Dernier instantané publié (remplacé atomiquement, jamais modifié)
+    _snapshot: Optional[ContextSnapshot] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        if not isinstance(self.tasks, TaskStore):
+            self.tasks = TaskStore(self.tasks)
+        self.tasks.on_change = self._task_changed
+        self._marks = {name: array('q') for name in ("version", "messages", "actions", "files")}
+        if not isinstance(self.messages, SpillableLog):
+            log = SpillableLog("messages")
+            log.extend(self.messages)
+            self.messages = log
+        if not isinstance(self.action_history, SpillableLog):
+            log = SpillableLog("actions")
+            log.extend(self.action_history)
+            self.action_history = log
+    
+    def configure_history(
+        self,
+        spill_dir: Optional[Path],
+        max_in_memory: Optional[int] = None,
+        segment_size: Optional[int] = None
+    ):
+        """Active le débordement sur disque des messages et actions au-delà de max_in_memory"""
+        self.messages.configure(spill_dir, max_in_memory, segment_size)
+        self.action_history.configure(spill_dir, max_in_memory, segment_size)
+    
     def add_message(self, role: str, content: str, agent: Optional[AgentType] = None):
         """Ajoute un message au contexte"""
         self.messages.append({
@@ -81,6 +526,7 @@ class Context:
             "timestamp": datetime.now().isoformat()
         })
         self.updated_at = datetime.now()
+        self.bump_version()
     
     def add_action(self, action_type: str, details: Dict[str, Any]):
         """Ajoute une action à l'historique"""
@@ -90,14 +536,23 @@ class Context:
             "timestamp": datetime.now().isoformat()
         })
         self.updated_at = datetime.now()
+        self.bump_version()
+    
+    def record_file_created(self, file_path: str):
+        """Enregistre un fichier créé et notifie les abonnés"""
+        self.files_created.append(file_path)
+        self.updated_at = datetime.now()
+        self.bump_version()
+        for listener in list(self.file_listeners):
+            listener(file_path)
     
     def update_task_status(self, task_id: str, status: TaskStatus, result: Optional[str] = None):
         """Met à jour le statut d'une tâche"""
         if task_id in self.tasks:
             self.tasks[task_id].status = status
-            self.tasks[task_id].updated_at = datetime.now()
             if result:
                 self.tasks[task_id].result = result
+            self.tasks[task_id].touch()
             
             if status == TaskStatus.COMPLETED:
                 self.tasks_completed += 1
@@ -105,6 +560,103 @@ class Context:
                 self.tasks_failed += 1
             
             self.updated_at = datetime.now()
+            
+            for listener in list(self.status_listeners):
+                listener(self, self.tasks[task_id])
+    
+    def bump_version(self) -> int:
+        """Incrémente la version et relève la longueur des historiques"""
+        self.version += 1
+        marks = self._marks
+        lengths = (len(self.messages), len(self.action_history), len(self.files_created))
+        if not marks["version"] or lengths != (marks["messages"][-1], marks["actions"][-1], marks["files"][-1]):
+            marks["version"].append(self.version)
+            marks["messages"].append(lengths[0])
+            marks["actions"].append(lengths[1])
+            marks["files"].append(lengths[2])
+            if len(marks["version"]) > MAX_VERSION_MARKS:
+                self._compact_marks()
+        return self.version
+    
+    def _compact_marks(self):
+        """Garde un relevé sur deux dans la moitié la plus ancienne
+        
+        Une version intermédiaire retombe sur un relevé antérieur: le delta renvoie alors
+        quelques entrées déjà connues, à remplacer à partir des offsets retournés.
+        """
+        half = MAX_VERSION_MARKS // 2
+        for name, values in self._marks.items():
+            self._marks[name] = values[:half:2] + values[half:]
+    
+    def _task_changed(self, task_id: str):
+        version = self.bump_version()
+        # Réinsertion en fin: le dictionnaire reste trié par version croissante
+        self._task_versions.pop(task_id, None)
+        self._task_versions[task_id] = version
+    
+    def _history_offsets(self, since_version: int) -> tuple:
+        """Longueurs (messages, actions, fichiers) connues d'un client à une version donnée"""
+        marks = self._marks
+        index = bisect_right(marks["version"], since_version) - 1
+        if index < 0:
+            return 0, 0, 0
+        return marks["messages"][index], marks["actions"][index], marks["files"][index]
+    
+    def publish_snapshot(self) -> ContextSnapshot:
+        """Publie un instantané immuable de l'état courant (à appeler par l'écrivain après un lot de modifications)"""
+        previous = self._snapshot
+        if previous is not None and previous.version == self.version:
+            return previous
+        
+        if previous is None:
+            tasks = SnapshotTasks({task_id: _freeze_task(task) for task_id, task in self.tasks.items()})
+        else:
+            # Seules les tâches modifiées depuis l'instantané précédent sont figées, le reste est partagé
+            changes = {}
+            for task_id, version in reversed(self._task_versions.items()):
+                if version <= previous.version:
+                    break
+                task = self.tasks.get(task_id)
+                changes[task_id] = _REMOVED if task is None else _freeze_task(task)
+            # Ordre chronologique: les nouvelles tâches s'ajoutent dans leur ordre de création
+            changes = dict(reversed(list(changes.items())))
+            tasks = previous.tasks.updated(changes) if changes else previous.tasks
+        
+        self._snapshot = ContextSnapshot(
+            version=self.version,
+            run_id=self.run_id,
+            project_path=self.project_path,
+            project_name=self.project_name,
+            project_description=self.project_description,
+            tasks=tasks,
+            recent_actions=tuple(self.action_history.recent(RECENT_ACTIONS_IN_PAYLOAD)),
+            action_history_size=len(self.action_history),
+            messages_size=len(self.messages),
+            files_created=self._file_view(previous and previous.files_created, self.files_created),
+            files_modified=self._file_view(previous and previous.files_modified, self.files_modified),
+            files_deleted=self._file_view(previous and previous.files_deleted, self.files_deleted),
+            tasks_completed=self.tasks_completed,
+            tasks_failed=self.tasks_failed,
+            total_iterations=self.total_iterations,
+            started_at=self.started_at,
+            updated_at=self.updated_at
+        )
+        return self._snapshot
+    
+    @staticmethod
+    def _file_view(previous: Optional[Sequence[str]], current: List[str]) -> Sequence[str]:
+        """Réutilise la vue précédente quand la liste n'a pas changé de longueur"""
+        if previous is not None and len(previous) == len(current):
+            return previous
+        return AppendOnlyView(current)
+    
+    @property
+    def snapshot(self) -> ContextSnapshot:
+        """Dernier instantané publié (lecture sans verrou; publié à la première lecture)"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.publish_snapshot()
+        return snapshot
     
     def get_task(self, task_id: str) -> Optional[Task]:
         """Récupère une tâche par son ID"""
@@ -112,37 +664,27 @@ class Context:
     
     def get_pending_tasks(self) -> List[Task]:
         """Récupère toutes les tâches en attente"""
-        return [task for task in self.tasks.values() if task.status == TaskStatus.PENDING]
+        return self.tasks.by_status(TaskStatus.PENDING)
     
     def get_tasks_for_agent(self, agent_type: AgentType) -> List[Task]:
         """Récupère les tâches assignées à un agent spécifique"""
-        return [
-            task for task in self.tasks.values()
-            if task.assigned_agent == agent_type and task.status == TaskStatus.PENDING
-        ]
+        return self.tasks.by_agent(agent_type, TaskStatus.PENDING)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convertit le contexte en dictionnaire"""
         return {
+            "run_id": self.run_id,
+            "version": self.version,
             "project_path": self.project_path,
             "project_name": self.project_name,
             "project_description": self.project_description,
             "tasks": {
-                task_id: {
-                    "id": task.id,
-                    "description": task.description,
-                    "status": task.status.value,
-                    "dependencies": task.dependencies,
-                    "subtasks": task.subtasks,
-                    "assigned_agent": task.assigned_agent.value if task.assigned_agent else None,
-                    "created_at": task.created_at.isoformat(),
-                    "updated_at": task.updated_at.isoformat(),
-                    "result": task.result,
-                    "metadata": task.metadata
-                }
+                task_id: task.to_dict()
                 for task_id, task in self.tasks.items()
             },
-            "action_history": self.action_history,
+            "action_history": self.action_history.recent(RECENT_ACTIONS_IN_PAYLOAD),
+            "action_history_size": len(self.action_history),
+            "messages_size": len(self.messages),
             "files_created": self.files_created,
             "files_modified": self.files_modified,
             "files_deleted": self.files_deleted,
@@ -152,3 +694,45 @@ class Context:
             "started_at": self.started_at.isoformat(),
             "updated_at": self.updated_at.isoformat()
         }
+    
+    def to_delta(self, since_version: int, history_limit: int = DELTA_HISTORY_LIMIT) -> Dict[str, Any]:
+        """Retourne uniquement les tâches et entrées d'historique modifiées depuis une version"""
+        if since_version < 0 or since_version > self.version:
+            # Version inconnue (autre contexte, redémarrage): tout renvoyer
+            since_version = 0
+        
+        tasks = {}
+        removed_tasks = []
+        for task_id, version in reversed(self._task_versions.items()):
+            if version <= since_version:
+                break
+            task = self.tasks.get(task_id)
+            if task is None:
+                removed_tasks.append(task_id)
+            else:
+                tasks[task_id] = task.to_dict()
+        
+        messages_offset, actions_offset, files_offset = self._history_offsets(since_version)
+        # Au-delà de history_limit, seules les entrées les plus récentes sont renvoyées
+        messages_offset = max(messages_offset, len(self.messages) - history_limit)
+        actions_offset = max(actions_offset, len(self.action_history) - history_limit)
+        
+        return {
+            "run_id": self.run_id,
+            "version": self.version,
+            "since": since_version,
+            "tasks": tasks,
+            "removed_tasks": removed_tasks,
+            "messages": self.messages.read(messages_offset, history_limit),
+            "messages_offset": messages_offset,
+            "messages_size": len(self.messages),
+            "action_history": self.action_history.read(actions_offset, history_limit),
+            "action_history_offset": actions_offset,
+            "action_history_size": len(self.action_history),
+            "files_created": self.files_created[files_offset:],
+            "files_created_offset": files_offset,
+            "tasks_completed": self.tasks_completed,
+            "tasks_failed": self.tasks_failed,
+            "total_iterations": self.total_iterations,
+            "updated_at": self.updated_at.isoformat()
+        }
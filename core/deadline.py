@@ -0,0 +1,58 @@
+"""
+Propagation des échéances (deadlines) à travers les appels asynchrones
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+
+# Échéance absolue (horloge monotone) de l'exécution courante
+_deadline: ContextVar[Optional[float]] = ContextVar("auto_antigravity_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """Limite la durée du bloc; une échéance englobante plus proche reste prioritaire"""
+    if seconds is None or seconds <= 0:
+        yield
+        return
+
+    new_deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        new_deadline = min(new_deadline, current)
+
+    token = _deadline.set(new_deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def detached_deadline():
+    """Bloc sans échéance: travail partagé par des appelants ayant chacun la leur"""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Temps restant avant l'échéance courante (None si aucune échéance)"""
+    current = _deadline.get()
+    if current is None:
+        return None
+    return max(0.0, current - time.monotonic())
+
+
+def timeout_for(default: Optional[float]) -> Optional[float]:
+    """Timeout à utiliser pour un appel: le plus court entre le défaut et le temps restant"""
+    remaining = remaining_time()
+    if remaining is None:
+        return default
+    if default is None:
+        return remaining
+    return min(default, remaining)
@@ -0,0 +1,150 @@
+"""
+Bus d'événements asynchrone (pub/sub en processus) pour l'orchestrateur et les agents
+"""
+import asyncio
+import inspect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Any, Callable, AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from loguru import logger
+
+
+class EventType(Enum):
+    """Types d'événements publiés"""
+    RUN_STARTED = "run.started"
+    RUN_FINISHED = "run.finished"
+    TASK_STARTED = "task.started"
+    TASK_COMPLETED = "task.completed"
+    TASK_FAILED = "task.failed"
+    TASK_CANCELLED = "task.cancelled"
+    AGENT_ACTION = "agent.action"
+    MODEL_CALL = "model.call"
+    FILE_WRITTEN = "file.written"
+    CACHE_EVICTED = "cache.evicted"
+
+
+@dataclass
+class Event:
+    """Événement publié sur le bus"""
+    type: EventType
+    data: Dict[str, Any] = field(default_factory=dict)
+    run_id: Optional[str] = None
+    timestamp: datetime = field(default_factory=datetime.now)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convertit l'événement en dictionnaire"""
+        return {
+            "type": self.type.value,
+            "run_id": self.run_id,
+            "timestamp": self.timestamp.isoformat(),
+            "data": self.data
+        }
+
+
+Handler = Callable[[Event], Any]
+
+# Exécution courante: les émetteurs sans contexte (modèles) héritent de son run_id
+_current_run_id: ContextVar[Optional[str]] = ContextVar("auto_antigravity_run_id", default=None)
+
+
+@contextmanager
+def run_scope(run_id: Optional[str]):
+    """Associe les événements publiés dans le bloc à une exécution"""
+    token = _current_run_id.set(run_id)
+    try:
+        yield
+    finally:
+        _current_run_id.reset(token)
+
+
+class EventBus:
+    """Bus pub/sub: publication non bloquante, abonnés synchrones, asynchrones ou en flux"""
+
+    def __init__(self):
+        self._handlers: List[tuple] = []
+        self._pending: set = set()
+        self.published = 0
+        self.handler_errors = 0
+
+    def subscribe(self, handler: Handler, event_types: Optional[Iterable[EventType]] = None) -> Callable[[], None]:
+        """Abonne un handler (fonction ou coroutine); retourne la fonction de désabonnement"""
+        entry = (handler, frozenset(event_types) if event_types else None)
+        self._handlers.append(entry)
+
+        def unsubscribe():
+            if entry in self._handlers:
+                self._handlers.remove(entry)
+
+        return unsubscribe
+
+    def publish(self, event_type: EventType, run_id: Optional[str] = None, **data) -> Event:
+        """Publie un événement sans attendre les abonnés asynchrones"""
+        event = Event(type=event_type, data=data, run_id=run_id or _current_run_id.get())
+        self.published += 1
+
+        for handler, event_types in list(self._handlers):
+            if event_types is not None and event_type not in event_types:
+                continue
+            try:
+                outcome = handler(event)
+                if inspect.isawaitable(outcome):
+                    self._schedule(outcome)
+            except Exception as e:
+                # Un abonné défaillant ne doit jamais casser l'émetteur
+                self.handler_errors += 1
+                logger.warning(f"Erreur d'un abonné sur {event_type.value}: {e}")
+
+        return event
+
+    def _schedule(self, awaitable):
+        """Exécute un handler asynchrone en tâche de fond"""
+        try:
+            task = asyncio.ensure_future(awaitable)
+        except RuntimeError:
+            # Aucune boucle en cours: l'événement est perdu pour cet abonné
+            awaitable.close()
+            return
+        self._pending.add(task)
+        task.add_done_callback(self._on_handler_done)
+
+    def _on_handler_done(self, task: asyncio.Task):
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.handler_errors += 1
+            logger.warning(f"Erreur d'un abonné asynchrone: {task.exception()}")
+
+    async def stream(
+        self,
+        event_types: Optional[Iterable[EventType]] = None,
+        max_queue: int = 1000
+    ) -> AsyncIterator[Event]:
+        """Itère sur les événements publiés; les plus anciens sont perdus si le lecteur est trop lent"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+        def enqueue(event: Event):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+        unsubscribe = self.subscribe(enqueue, event_types)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            unsubscribe()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retourne les statistiques du bus"""
+        return {
+            "subscribers": len(self._handlers),
+            "published": self.published,
+            "handler_errors": self.handler_errors,
+            "pending_handlers": len(self._pending)
+        }
+
+
+# Bus partagé du processus (les modèles et agents n'ont pas de référence à l'orchestrateur)
+event_bus = EventBus()
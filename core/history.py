@@ -0,0 +1,172 @@
+"""
+Historiques bornés en mémoire avec débordement sur disque (messages, actions)
+"""
+import json
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Optional, Any, Iterator
+from pathlib import Path
+from loguru import logger
+
+
+DEFAULT_MAX_IN_MEMORY = 500
+DEFAULT_SEGMENT_SIZE = 5000
+
+
+class SpillableLog:
+    """Journal append-only borné en mémoire; les entrées anciennes sont relues depuis le disque
+
+    Sans répertoire de débordement, toutes les entrées restent en mémoire (aucune n'est perdue).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_in_memory: int = DEFAULT_MAX_IN_MEMORY,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        spill_dir: Optional[Path] = None
+    ):
+        self.name = name
+        self.max_in_memory = max(1, max_in_memory)
+        self.segment_size = max(1, segment_size)
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+
+        self._recent: deque = deque()
+        self._offset = 0  # Index absolu de la première entrée en mémoire
+        self._segments: List[list] = []  # [index de début, nombre d'entrées, chemin]
+
+    def configure(
+        self,
+        spill_dir: Optional[Path],
+        max_in_memory: Optional[int] = None,
+        segment_size: Optional[int] = None
+    ):
+        """Change le répertoire de débordement et les limites (s'applique aux débordements suivants)"""
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        if max_in_memory:
+            self.max_in_memory = max(1, max_in_memory)
+        if segment_size:
+            self.segment_size = max(1, segment_size)
+        self._enforce_limit()
+
+    def append(self, entry: Dict[str, Any]):
+        self._recent.append(entry)
+        self._enforce_limit()
+
+    def extend(self, entries):
+        self._recent.extend(entries)
+        self._enforce_limit()
+
+    def __len__(self) -> int:
+        return self._offset + len(self._recent)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        yield from self._read_spilled(0, self._offset)
+        yield from list(self._recent)
+
+    def __getitem__(self, index):
+        length = len(self)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(length)
+            if step != 1:
+                return list(self[start:stop])[::step]
+            return self._read_range(start, stop)
+
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError(f"{self.name}: index {index} hors limites")
+        if index >= self._offset:
+            return self._recent[index - self._offset]
+        return next(self._read_spilled(index, index + 1))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, SpillableLog)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SpillableLog({self.name!r}, total={len(self)}, en_mémoire={len(self._recent)})"
+
+    def read(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Lit les entrées [offset, offset + limit) (depuis le disque si nécessaire)"""
+        return self[offset:offset + limit]
+
+    def recent(self, count: int) -> List[Dict[str, Any]]:
+        """Dernières entrées"""
+        if count <= 0:
+            return []
+        return self[-count:]
+
+    def clear(self):
+        """Vide le journal (les segments sur disque sont conservés)"""
+        self._recent.clear()
+        self._offset = 0
+        self._segments = []
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retourne l'occupation du journal"""
+        return {
+            "total": len(self),
+            "in_memory": len(self._recent),
+            "spilled": self._offset,
+            "segments": len(self._segments)
+        }
+
+    def _enforce_limit(self):
+        """Déborde la moitié la plus ancienne quand la limite mémoire est dépassée"""
+        if self.spill_dir is None or len(self._recent) <= self.max_in_memory:
+            return
+        overflow = len(self._recent) - self.max_in_memory + self.max_in_memory // 2
+        batch = [self._recent.popleft() for _ in range(overflow)]
+        self._spill(batch)
+
+    def _spill(self, batch: List[Dict[str, Any]]):
+        """Écrit un lot d'entrées dans les segments (les entrées non écrites restent en mémoire)"""
+        position = 0
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            while position < len(batch):
+                segment = self._writable_segment()
+                chunk = batch[position:position + self.segment_size - segment[1]]
+                mode = 'a' if segment[1] else 'w'
+                with open(segment[2], mode, encoding='utf-8') as f:
+                    for entry in chunk:
+                        f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+                segment[1] += len(chunk)
+                self._offset += len(chunk)
+                position += len(chunk)
+        except OSError as e:
+            logger.error(f"Impossible d'écrire l'historique {self.name} sur disque, conservé en mémoire: {e}")
+            self._recent.extendleft(reversed(batch[position:]))
+            self.spill_dir = None
+
+    def _writable_segment(self) -> list:
+        """Segment courant s'il a de la place et prolonge l'historique, sinon un nouveau"""
+        if self._segments:
+            last = self._segments[-1]
+            if last[0] + last[1] == self._offset and last[1] < self.segment_size:
+                return last
+        segment = [self._offset, 0, self.spill_dir / f"{self.name}-{self._offset:010d}.jsonl"]
+        self._segments.append(segment)
+        return segment
+
+    def _read_range(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        if start >= stop:
+            return []
+        entries = list(self._read_spilled(start, min(stop, self._offset)))
+        if stop > self._offset:
+            memory_start = max(start, self._offset) - self._offset
+            entries.extend(islice(self._recent, memory_start, stop - self._offset))
+        return entries
+
+    def _read_spilled(self, start: int, stop: int) -> Iterator[Dict[str, Any]]:
+        """Relit les entrées [start, stop) depuis les segments"""
+        for segment_start, count, path in self._segments:
+            segment_stop = segment_start + count
+            if segment_stop <= start or segment_start >= stop:
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = islice(f, max(start, segment_start) - segment_start, min(stop, segment_stop) - segment_start)
+                for line in lines:
+                    yield json.loads(line)
@@ -1,97 +1,175 @@
 """
 Orchestrateur principal pour coordonner les agents
 """
+import asyncio
+import shutil
 from typing import List, Optional
 from pathlib import Path
+from datetime import datetime
 from loguru import logger
 
 from .context import Context, Task, TaskStatus, AgentType
-from .api_client import AntigravityClient
+from .api_client import AntigravityClient, get_antigravity_client
+from .scheduler import AgentPool, TaskScheduler, build_agent_pools
+from .runs import RunRegistry, RunStatus, TaskRun
+from .pipeline import StreamingPipeline
+from .checkpoint import CheckpointStore
+from .deadline import deadline_scope, remaining_time
+from .workers import JobQueue, RemoteAgentProxy, WorkerProcessPool
+from .events import EventBus, EventType, event_bus, run_scope
+from .workspace import probe_workspace_backend
+
+try:
+    from ..config import settings
+except ImportError:
+    from config import settings
 
 
 class Orchestrator:
     """Orchestrateur qui coordonne les agents et gère le workflow"""
     
-    def __init__(self, api_client: Optional[AntigravityClient] = None, enable_monitoring: bool = True):
-        self.api_client = api_client or AntigravityClient()
+    def __init__(
+        self,
+        api_client: Optional[AntigravityClient] = None,
+        enable_monitoring: bool = True,
+        max_concurrent_tasks: Optional[int] = None,
+        streaming_pipeline: Optional[bool] = None,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        events: Optional[EventBus] = None
+    ):
+        self.api_client = api_client or get_antigravity_client()
+        self.events = events or event_bus
         self.agents = {}
         self.context: Optional[Context] = None
+        self.runs = RunRegistry(on_forget=self._forget_run)
+        self.checkpoints = checkpoint_store
+        if self.checkpoints is None and settings.enable_checkpoints:
+            self.checkpoints = CheckpointStore(settings.checkpoint_dir)
+        self.max_concurrent_tasks = max_concurrent_tasks or settings.max_concurrent_tasks
+        self.streaming_pipeline = settings.streaming_pipeline if streaming_pipeline is None else streaming_pipeline
+        self.agent_pools = build_agent_pools(settings.agent_pool_sizes, settings.agent_pool_queue_depths)
+        self.subtask_timeout = settings.subtask_timeout
+        self.run_timeout = settings.run_timeout
+        self._schedulers = {}
         
-        # Système de monitoring
-        self.enable_monitoring = enable_monitoring
-        self.dashboard = None
-        self.cache_manager = None
-        self.auto_accept = None
-        self.recovery_tools = None
+        # Mode coordinateur/workers (voir start_workers)
+        self.job_queue: Optional[JobQueue] = None
+        self.worker_pool: Optional[WorkerProcessPool] = None
+        # Pools des types délégués aux workers, dimensionnés sur le nombre de workers
+        self.worker_agent_pools: dict = {}
         
-        if self.enable_monitoring:
-            self._init_monitoring()
+        # Système de monitoring (composants construits à la première utilisation)
+        self.enable_monitoring = enable_monitoring
+        self._dashboard = None
+        self._cache_manager = None
+        self._auto_accept = None
+        self._recovery_tools = None
     
-    def _init_monitoring(self):
-        """Initialise le système de monitoring"""
-        try:
-            from ..monitoring.dashboard import MonitoringDashboard
-            from ..monitoring.cache_manager import CacheManager, CacheConfig
-            from ..monitoring.auto_accept import AutoAcceptManager
-            from ..monitoring.recovery_tools import RecoveryTools
-        except ImportError:
-            from monitoring.dashboard import MonitoringDashboard
-            from monitoring.cache_manager import CacheManager, CacheConfig
-            from monitoring.auto_accept import AutoAcceptManager
-            from monitoring.recovery_tools import RecoveryTools
-        
-        # Initialiser le dashboard
-        self.dashboard = MonitoringDashboard()
-        
-        # Initialiser le gestionnaire de cache
-        cache_dir = Path("./cache")
-        cache_config = CacheConfig(
-            auto_clean_enabled=True,
-            auto_clean_threshold_mb=500,
-            auto_clean_keep_count=5
-        )
-        self.cache_manager = CacheManager(cache_dir, cache_config)
-        
-        # Initialiser le gestionnaire Auto-Accept
-        self.auto_accept = AutoAcceptManager()
-        
-        # Initialiser les outils de récupération
-        self.recovery_tools = RecoveryTools()
-        
-        logger.info("Système de monitoring initialisé")
+    @property
+    def dashboard(self):
+        """Dashboard de monitoring, abonné au bus d'événements dès sa création"""
+        if self._dashboard is None and self.enable_monitoring:
+            try:
+                from ..monitoring.dashboard import MonitoringDashboard
+                from ..models.cache import get_response_cache
+            except ImportError:
+                from monitoring.dashboard import MonitoringDashboard
+                from models.cache import get_response_cache
+            
+            self._dashboard = MonitoringDashboard()
+            self._dashboard.attach_event_bus(self.events)
+            self._dashboard.register_response_cache(get_response_cache())
+            for agent_type, pool in self.agent_pools.items():
+                self._dashboard.register_agent_pool(agent_type.value, pool)
+            for agent_type, agent_instance in self.agents.items():
+                self._register_in_dashboard(agent_type, agent_instance)
+        return self._dashboard
+    
+    @property
+    def cache_manager(self):
+        """Gestionnaire de cache; son index est chargé en arrière-plan"""
+        if self._cache_manager is None and self.enable_monitoring:
+            try:
+                from ..monitoring.cache_manager import CacheManager, CacheConfig
+            except ImportError:
+                from monitoring.cache_manager import CacheManager, CacheConfig
+            
+            cache_config = CacheConfig(
+                auto_clean_enabled=True,
+                auto_clean_threshold_mb=500,
+                auto_clean_keep_count=5
+            )
+            self._cache_manager = CacheManager(Path("./cache"), cache_config, self.events, background_load=True)
+        return self._cache_manager
+    
+    def start_background_loads(self):
+        """Lance sans attendre les chargements en arrière-plan (index du cache)"""
+        if self.cache_manager is not None:
+            logger.debug("Chargement de l'index du cache lancé en arrière-plan")
+    
+    async def wait_for_cache(self):
+        """Attend, sans bloquer la boucle d'événements, que l'index du cache soit chargé"""
+        if self.enable_monitoring and self.cache_manager:
+            await self.cache_manager.wait_until_loaded()
+    
+    @property
+    def auto_accept(self):
+        """Gestionnaire Auto-Accept"""
+        if self._auto_accept is None and self.enable_monitoring:
+            try:
+                from ..monitoring.auto_accept import AutoAcceptManager
+            except ImportError:
+                from monitoring.auto_accept import AutoAcceptManager
+            self._auto_accept = AutoAcceptManager()
+        return self._auto_accept
+    
+    @property
+    def recovery_tools(self):
+        """Outils de récupération"""
+        if self._recovery_tools is None and self.enable_monitoring:
+            try:
+                from ..monitoring.recovery_tools import RecoveryTools
+            except ImportError:
+                from monitoring.recovery_tools import RecoveryTools
+            self._recovery_tools = RecoveryTools()
+        return self._recovery_tools
     
     def register_agent(self, agent_type: AgentType, agent_instance):
         """Enregistre un agent dans l'orchestrateur"""
         self.agents[agent_type] = agent_instance
         
-        # Enregistrer dans le dashboard si le monitoring est activé
-        if self.enable_monitoring and self.dashboard:
-            self.dashboard.register_agent(agent_instance.name, agent_type.value)
-            
-            # Auto-Discovery et enregistrement du modèle pour affichage des quotas
-            if hasattr(agent_instance, 'model'):
-                try:
-                    # Import local pour éviter problèmes circulaires si monitoring désactivé
-                    try:
-                        from ..monitoring.dashboard import ModelFamily
-                    except ImportError:
-                        from monitoring.dashboard import ModelFamily
-                        
-                    model = agent_instance.model
-                    model_name = getattr(model, 'model_name', f"{agent_instance.name} Model")
-                    
-                    # Heuristique simple pour la famille
-                    family = ModelFamily.OPENAI
-                    if 'gemini' in model_name.lower(): family = ModelFamily.GEMINI
-                    elif 'claude' in model_name.lower(): family = ModelFamily.CLAUDE
-                    
-                    # On fixe des limites arbitraires mais réalistes (1M tokens)
-                    self.dashboard.register_model(model_name, family, thinking_limit=1000000, flow_limit=1000000)
-                except Exception as e:
-                    logger.warning(f"Impossible d'enregistrer le modèle pour {agent_instance.name}: {e}")
+        # Enregistrer dans le dashboard s'il existe déjà (sinon à sa création)
+        if self._dashboard is not None:
+            self._register_in_dashboard(agent_type, agent_instance)
         
         logger.info(f"Agent {agent_type.value} enregistré")
     
+    def _register_in_dashboard(self, agent_type: AgentType, agent_instance):
+        """Enregistre un agent et son modèle dans le dashboard"""
+        self._dashboard.register_agent(agent_instance.name, agent_type.value)
+        
+        # Auto-Discovery et enregistrement du modèle pour affichage des quotas
+        if hasattr(agent_instance, 'model'):
+            try:
+                # Import local pour éviter problèmes circulaires si monitoring désactivé
+                try:
+                    from ..monitoring.dashboard import ModelFamily
+                except ImportError:
+                    from monitoring.dashboard import ModelFamily
+                    
+                model = agent_instance.model
+                model_name = getattr(model, 'model_name', f"{agent_instance.name} Model")
+                
+                # Heuristique simple pour la famille
+                family = ModelFamily.OPENAI
+                if 'gemini' in model_name.lower(): family = ModelFamily.GEMINI
+                elif 'claude' in model_name.lower(): family = ModelFamily.CLAUDE
+                
+                # On fixe des limites arbitraires mais réalistes (1M tokens)
+                self._dashboard.register_model(model_name, family, thinking_limit=1000000, flow_limit=1000000)
+            except Exception as e:
+                logger.warning(f"Impossible d'enregistrer le modèle pour {agent_instance.name}: {e}")
+    
     async def initialize_project(
         self,
         project_path: str,
@@ -107,121 +185,324 @@ class Orchestrator:
             project_description=project_description
         )
         
-        # Vérifier la connexion avec Antigravity
-        connected = await self.api_client.check_connection()
-        if not connected:
-            logger.warning("Impossible de se connecter à l'API Antigravity")
+        # Choisir le backend de l'espace de travail (aucun appel réseau sans clé API)
+        await probe_workspace_backend(self.api_client)
         
         return self.context
     
+    def new_run_context(
+        self,
+        project_path: Optional[str] = None,
+        project_name: Optional[str] = None,
+        project_description: Optional[str] = None
+    ) -> Context:
+        """Crée un contexte isolé pour une nouvelle exécution à partir du projet courant"""
+        template = self.context
+        if not template and not project_path:
+            raise ValueError("Context non initialisé")
+        
+        return Context(
+            project_path=project_path or template.project_path,
+            project_name=project_name or (template.project_name if template else Path(project_path).name),
+            project_description=project_description or (template.project_description if template else "")
+        )
+    
+    def submit_task(self, task_description: str, context: Optional[Context] = None) -> TaskRun:
+        """Démarre une tâche en arrière-plan et retourne son exécution"""
+        run = self.runs.create(task_description, context or self.new_run_context())
+        run.handle = asyncio.create_task(self._run(run))
+        logger.info(f"Exécution {run.run_id} démarrée ({self.runs.active_count()} en cours)")
+        return run
+    
     async def execute_task(
         self,
         task_description: str,
         context: Optional[Context] = None
     ) -> dict:
-        """Exécute une tâche complète"""
-        if context:
-            self.context = context
+        """Exécute une tâche complète dans son propre contexte"""
+        run = self.runs.create(task_description, context or self.new_run_context())
+        return await self._run(run)
+    
+    def resume_run(self, run_id: str) -> TaskRun:
+        """Reprend en arrière-plan une exécution interrompue à partir de son checkpoint"""
+        if not self.checkpoints:
+            raise ValueError("Checkpoints désactivés")
         
-        if not self.context:
-            raise ValueError("Context non initialisé")
+        active = self.runs.get(run_id)
+        if active and not active.is_finished:
+            raise ValueError(f"L'exécution {run_id} est toujours en cours")
         
-        logger.info(f"Exécution de la tâche: {task_description}")
-        self.context.add_message("system", task_description)
+        restored = self.checkpoints.load(
+            run_id, settings.history_dir / run_id, settings.history_max_in_memory, settings.history_segment_size
+        )
+        if not restored:
+            raise ValueError(f"Aucun checkpoint pour l'exécution {run_id}")
         
-        # Créer la tâche principale
-        main_task = Task(
-            id="main",
-            description=task_description,
-            status=TaskStatus.IN_PROGRESS
+        context, description, final_status = restored
+        if final_status == RunStatus.COMPLETED.value:
+            raise ValueError(f"L'exécution {run_id} est déjà terminée")
+        
+        # Les tâches complétées sont conservées, celles interrompues repartent de zéro
+        for task in context.tasks.values():
+            if task.id != "main" and task.status in (TaskStatus.IN_PROGRESS, TaskStatus.CANCELLED):
+                task.status = TaskStatus.PENDING
+        
+        run = self.runs.create(description, context)
+        run.handle = asyncio.create_task(self._run(run, resume=True))
+        logger.info(f"Reprise de l'exécution {run_id}")
+        return run
+    
+    async def resume(self, run_id: str) -> dict:
+        """Reprend une exécution interrompue et attend sa fin"""
+        return await self.resume_run(run_id).handle
+    
+    async def _run(self, run: TaskRun, resume: bool = False) -> dict:
+        """Déroule une exécution en publiant son début et sa fin sur le bus d'événements"""
+        # Le dashboard doit être abonné avant les premiers événements de l'exécution
+        self.dashboard
+        
+        with run_scope(run.run_id):
+            self.events.publish(EventType.RUN_STARTED, run.run_id, description=run.description, resume=resume)
+            try:
+                return await self._run_workflow(run, resume)
+            finally:
+                self.events.publish(
+                    EventType.RUN_FINISHED,
+                    run.run_id,
+                    status=run.status.value,
+                    error=run.result.get("error") if run.result else None
+                )
+    
+    async def _run_workflow(self, run: TaskRun, resume: bool) -> dict:
+        """Déroule le workflow complet d'une exécution"""
+        context = run.context
+        task_description = run.description
+        run.status = RunStatus.RUNNING
+        context.configure_history(
+            settings.history_dir / run.run_id, settings.history_max_in_memory, settings.history_segment_size
         )
-        self.context.tasks["main"] = main_task
         
+        if self.checkpoints:
+            self.checkpoints.attach(context, task_description)
+        
+        if resume and "main" in context.tasks:
+            logger.info(f"[{run.run_id}] Reprise de la tâche: {task_description}")
+            context.update_task_status("main", TaskStatus.IN_PROGRESS)
+        else:
+            logger.info(f"[{run.run_id}] Exécution de la tâche: {task_description}")
+            context.add_message("system", task_description)
+            
+            # Créer la tâche principale
+            main_task = Task(
+                id="main",
+                description=task_description,
+                status=TaskStatus.IN_PROGRESS
+            )
+            context.tasks["main"] = main_task
+        context.publish_snapshot()
+        
+        cancelled = None
         try:
-            # Étape 1: Planification
-            logger.info("Étape 1: Planification")
-            planner = self.agents.get(AgentType.PLANNER)
-            if planner:
-                subtasks = await planner.plan(task_description, self.context)
-                logger.info(f"{len(subtasks)} sous-tâches planifiées")
+            # L'échéance de l'exécution se propage aux sous-tâches, appels modèles et sous-processus
+            with deadline_scope(self.run_timeout):
+                await asyncio.wait_for(self._workflow(context, task_description, resume), timeout=remaining_time())
+            
+            # Une sous-tâche jamais démarrée ne peut pas être comptée comme réalisée
+            unstarted = [task.id for task in context.get_pending_tasks() if task.id != "main"]
+            if unstarted:
+                raise RuntimeError(f"Sous-tâche(s) jamais exécutée(s): {', '.join(unstarted)}")
+            
+            # Marquer la tâche comme complétée
+            context.update_task_status("main", TaskStatus.COMPLETED, "Tâche complétée avec succès")
             
+            run.status = RunStatus.COMPLETED
+            run.result = {
+                "success": True,
+                "run_id": run.run_id,
+                "context": context.to_dict(),
+                "message": "Tâche exécutée avec succès"
+            }
+        
+        except asyncio.CancelledError as e:
+            logger.warning(f"[{run.run_id}] Exécution annulée")
+            self._fail_run(run, RunStatus.CANCELLED, TaskStatus.CANCELLED, "Exécution annulée")
+            # Annulation extérieure (arrêt du serveur, appelant annulé): propagée après l'enregistrement
+            if not run.cancel_requested:
+                cancelled = e
+        
+        except asyncio.TimeoutError:
+            logger.error(f"[{run.run_id}] Délai d'exécution dépassé")
+            self._fail_run(run, RunStatus.FAILED, TaskStatus.FAILED, "Délai d'exécution dépassé")
+        
+        except Exception as e:
+            logger.error(f"Erreur lors de l'exécution de la tâche: {e}")
+            self._fail_run(run, RunStatus.FAILED, TaskStatus.FAILED, str(e))
+        
+        run.finished_at = datetime.now()
+        context.publish_snapshot()
+        if self.checkpoints:
+            self.checkpoints.detach(context, run.status.value)
+        if cancelled is not None:
+            raise cancelled
+        return run.result
+    
+    def _forget_run(self, run: TaskRun):
+        """Supprime l'historique sur disque d'une exécution terminée sortie du registre"""
+        shutil.rmtree(settings.history_dir / run.run_id, ignore_errors=True)
+    
+    def _fail_run(self, run: TaskRun, run_status: RunStatus, task_status: TaskStatus, error: str):
+        """Termine une exécution en échec ou annulée"""
+        run.context.update_task_status("main", task_status, error)
+        run.status = run_status
+        run.result = {
+            "success": False,
+            "run_id": run.run_id,
+            "error": error,
+            "context": run.context.to_dict()
+        }
+    
+    async def _workflow(self, context: Context, task_description: str, resume: bool):
+        """Planification, exécution des sous-tâches, revue et tests"""
+        # Étape 1: Planification (déjà faite si le plan a été restauré)
+        planner = self.agents.get(AgentType.PLANNER)
+        already_planned = resume and len(context.tasks) > 1
+        if planner and not already_planned:
+            logger.info("Étape 1: Planification")
+            subtasks = await planner.plan(task_description, context)
+            logger.info(f"{len(subtasks)} sous-tâches planifiées")
+            context.publish_snapshot()
+        
+        if self.checkpoints:
+            self.checkpoints.checkpoint(context)
+        
+        reviewer = self.agents.get(AgentType.REVIEWER)
+        tester = self.agents.get(AgentType.TESTER)
+        
+        if self.streaming_pipeline:
+            # Étapes 2 à 4 en parallèle: chaque fichier écrit part en revue, les tests suivent
+            logger.info("Étapes 2-4: Exécution, revue et tests en streaming")
+            pipeline = StreamingPipeline(context, reviewer, tester, settings.review_batch_size)
+            outcome = await pipeline.run(self._execute_subtasks(context))
+            logger.info(f"Résultat de la revue: {outcome['review']}")
+            logger.info(f"Tests terminés: {outcome['tests']}")
+        else:
             # Étape 2: Exécution des sous-tâches
             logger.info("Étape 2: Exécution des sous-tâches")
-            await self._execute_subtasks()
+            await self._execute_subtasks(context)
             
             # Étape 3: Revue
             logger.info("Étape 3: Revue du code")
-            reviewer = self.agents.get(AgentType.REVIEWER)
             if reviewer:
-                review_result = await reviewer.review(self.context)
+                review_result = await reviewer.review(context)
                 logger.info(f"Résultat de la revue: {review_result}")
             
             # Étape 4: Tests
             logger.info("Étape 4: Tests")
-            tester = self.agents.get(AgentType.TESTER)
             if tester:
-                test_results = await tester.test(self.context)
+                test_results = await tester.test(context)
                 logger.info(f"Tests terminés: {test_results}")
-            
-            # Marquer la tâche comme complétée
-            self.context.update_task_status("main", TaskStatus.COMPLETED, "Tâche complétée avec succès")
-            
-            return {
-                "success": True,
-                "context": self.context.to_dict(),
-                "message": "Tâche exécutée avec succès"
-            }
+    
+    def start_workers(self, num_workers: Optional[int] = None, spawn: bool = True):
+        """Active le mode coordinateur: les sous-tâches partent vers des processus workers"""
+        num_workers = settings.worker_processes if num_workers is None else num_workers
+        if num_workers <= 0 or self.job_queue:
+            return
         
-        except Exception as e:
-            logger.error(f"Erreur lors de l'exécution de la tâche: {e}")
-            self.context.update_task_status("main", TaskStatus.FAILED, str(e))
-            return {
-                "success": False,
-                "error": str(e),
-                "context": self.context.to_dict()
-            }
+        self.job_queue = JobQueue(settings.worker_queue_path, settings.worker_lease_seconds)
+        self.worker_agent_pools = {
+            agent_type: AgentPool(
+                agent_type, num_workers, settings.agent_pool_queue_depths.get(agent_type.value, 0)
+            )
+            for agent_type in AgentType if agent_type.value in settings.worker_agent_types
+        }
+        if spawn:
+            # spawn=False: seuls des workers lancés à part (sur le même hôte) consomment la file
+            self.worker_pool = WorkerProcessPool(
+                settings.worker_queue_path,
+                num_workers,
+                settings.worker_agent_types,
+                settings.worker_agent_factory,
+                settings.worker_lease_seconds
+            )
+            self.worker_pool.start()
+        logger.info(f"Mode workers activé ({settings.worker_queue_path})")
+    
+    def stop_workers(self):
+        """Arrête les processus workers et revient à l'exécution locale"""
+        if self.worker_pool:
+            self.worker_pool.stop()
+        self.worker_pool = None
+        self.job_queue = None
+        self.worker_agent_pools = {}
     
-    async def _execute_subtasks(self):
-        """Exécute toutes les sous-tâches en attente"""
-        iteration = 0
-        max_iterations = 10
+    def shutdown(self):
+        """Arrête les workers et désabonne le dashboard du bus d'événements (partagé par le processus)"""
+        self.stop_workers()
+        if self._dashboard is not None:
+            self._dashboard.detach_event_bus()
+    
+    def _subtask_agents(self) -> dict:
+        """Agents utilisés pour les sous-tâches (proxys vers les workers si le mode est actif)"""
+        if not self.job_queue:
+            return self.agents
         
-        while iteration < max_iterations:
-            pending_tasks = self.context.get_pending_tasks()
-            
-            if not pending_tasks:
-                logger.info("Toutes les tâches sont complétées")
-                break
-            
-            logger.info(f"Itération {iteration + 1}: {len(pending_tasks)} tâches en attente")
-            
-            for task in pending_tasks:
-                if not task.assigned_agent:
-                    continue
-                
-                agent = self.agents.get(task.assigned_agent)
-                if not agent:
-                    logger.warning(f"Agent {task.assigned_agent.value} non trouvé pour la tâche {task.id}")
-                    continue
-                
-                try:
-                    logger.info(f"Exécution de la tâche {task.id} par {task.assigned_agent.value}")
-                    self.context.update_task_status(task.id, TaskStatus.IN_PROGRESS)
-                    
-                    result = await agent.execute(task, self.context)
-                    
-                    self.context.update_task_status(task.id, TaskStatus.COMPLETED, result)
-                    logger.info(f"Tâche {task.id} complétée")
-                
-                except Exception as e:
-                    logger.error(f"Erreur lors de l'exécution de la tâche {task.id}: {e}")
-                    self.context.update_task_status(task.id, TaskStatus.FAILED, str(e))
-            
-            iteration += 1
-            self.context.total_iterations = iteration
+        agents = dict(self.agents)
+        for agent_type in AgentType:
+            if agent_type.value in settings.worker_agent_types:
+                agents[agent_type] = RemoteAgentProxy(agent_type, self.job_queue)
+        return agents
     
-    def get_context(self) -> Optional[Context]:
-        """Retourne le contexte actuel"""
+    async def _execute_subtasks(self, context: Context):
+        """Exécute les sous-tâches en attente en parallèle selon leurs dépendances"""
+        pools = self.agent_pools
+        max_concurrent_tasks = self.max_concurrent_tasks
+        if self.job_queue:
+            # Les jobs délégués sont bornés par le nombre de workers, pas par les limites locales
+            pools = {**self.agent_pools, **self.worker_agent_pools}
+            max_concurrent_tasks += sum(pool.max_workers for pool in self.worker_agent_pools.values())
+        scheduler = TaskScheduler(
+            context, self._subtask_agents(), max_concurrent_tasks, pools, self.subtask_timeout, self.events
+        )
+        self._schedulers[context.run_id] = scheduler
+        try:
+            await scheduler.run()
+        finally:
+            self._schedulers.pop(context.run_id, None)
+    
+    def cancel_run(self, run_id: str) -> bool:
+        """Annule une exécution en cours; ses workers sont libérés immédiatement"""
+        run = self.runs.get(run_id)
+        if not run or run.is_finished or not run.handle:
+            return False
+        run.cancel_requested = True
+        run.handle.cancel()
+        logger.info(f"Annulation de l'exécution {run_id} demandée")
+        return True
+    
+    def cancel_task(self, run_id: str, task_id: str) -> bool:
+        """Annule une sous-tâche d'une exécution en cours"""
+        scheduler = self._schedulers.get(run_id)
+        if not scheduler:
+            return False
+        return scheduler.cancel_task(task_id)
+    
+    def get_run(self, run_id: str) -> Optional[TaskRun]:
+        """Retourne une exécution par son ID"""
+        return self.runs.get(run_id)
+    
+    def list_runs(self, active_only: bool = False) -> List[TaskRun]:
+        """Liste les exécutions connues"""
+        return self.runs.list(active_only)
+    
+    def get_context(self, run_id: Optional[str] = None) -> Optional[Context]:
+        """Retourne le contexte d'une exécution (par défaut la plus récente encore active)"""
+        if run_id is not None:
+            run = self.runs.get(run_id)
+            return run.context if run else None
+        runs = self.runs.list(active_only=True) or self.runs.list()
+        if runs:
+            return max(runs, key=lambda run: run.created_at).context
+        # Aucune exécution: contexte du projet servant de modèle
         return self.context
     
     def reset(self):
@@ -231,28 +512,51 @@ class Orchestrator:
     
     # Méthodes de Monitoring
     
-    def get_dashboard_data(self) -> dict:
-        """Retourne toutes les données du dashboard"""
+    def get_dashboard_data(self, since: Optional[int] = None, run_id: Optional[str] = None) -> dict:
+        """Retourne les données du dashboard (seulement les tâches modifiées depuis `since` si fourni)"""
         if not self.enable_monitoring or not self.dashboard:
             return {"error": "Monitoring désactivé"}
         data = self.dashboard.get_full_dashboard_data()
         
-        # Injecter les tâches du contexte actuel
-        if self.context and self.context.tasks:
-            tasks_list = []
-            for task_id, task in self.context.tasks.items():
-                tasks_list.append({
-                    "id": task.id,
-                    "description": task.description,
-                    "status": task.status.value,
-                    "agent": task.assigned_agent.value if task.assigned_agent else None,
-                    "dependencies": task.dependencies
-                })
-            data["tasks"] = tasks_list
-            data["project_name"] = self.context.project_name
+        # Injecter les tâches du contexte de l'exécution demandée (ou de la plus récente active)
+        context = self.get_context(run_id)
+        if context:
+            data["context_version"] = context.version
+            if since is not None:
+                delta = context.to_delta(since)
+                changed = delta.pop("tasks")
+                data["tasks"] = [self._dashboard_task(task) for task in changed.values()]
+                data["context_delta"] = delta
+                data["project_name"] = context.project_name
+            else:
+                # Instantané immuable: aucune itération sur les tâches en cours de modification
+                snapshot = context.snapshot
+                if snapshot.tasks:
+                    data["tasks"] = [self._dashboard_task(task) for task in snapshot.tasks.values()]
+                    data["project_name"] = snapshot.project_name
         
+        data["runs"] = [run.to_dict() for run in self.runs.list()]
+        if isinstance(self.api_client, AntigravityClient):
+            data["antigravity_api"] = self.api_client.get_statistics()
+        if self.job_queue:
+            data["workers"] = {
+                "jobs": self.job_queue.get_statistics(),
+                "processes": self.worker_pool.get_statistics() if self.worker_pool else None
+            }
         return data
     
+    @staticmethod
+    def _dashboard_task(task: dict) -> dict:
+        """Résumé d'une tâche (dictionnaire sérialisé ou figé) pour le dashboard"""
+        return {
+            "id": task["id"],
+            "description": task["description"],
+            "status": task["status"],
+            "agent": task["assigned_agent"],
+            "dependencies": list(task["dependencies"]),
+            "priority": task["priority"]
+        }
+    
     def get_quota_summary(self) -> dict:
         """Retourne le résumé des quotas"""
         if not self.enable_monitoring or not self.dashboard:
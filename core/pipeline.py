@@ -0,0 +1,121 @@
+"""
+Pipeline en streaming entre les étapes Coder, Reviewer et Tester
+"""
+import asyncio
+from typing import Dict, Any, List, Optional, Awaitable
+from loguru import logger
+
+from .context import Context
+
+
+# Marqueur de fin de flux dans la file des fichiers
+_END_OF_STREAM = object()
+
+
+class StreamingPipeline:
+    """Fait chevaucher génération, revue et tests au lieu de les enchaîner par barrières"""
+
+    def __init__(self, context: Context, reviewer=None, tester=None, batch_size: int = 5):
+        self.context = context
+        self.reviewer = reviewer
+        self.tester = tester
+        self.batch_size = max(1, batch_size)
+
+        self._files: asyncio.Queue = asyncio.Queue()
+        self._batches_reviewed = 0
+        self._review_done = False
+        self._reviewed = asyncio.Event()
+
+        self.review_result: Dict[str, Any] = {"summary": "Aucun fichier à revoir", "issues": [], "suggestions": []}
+        self.test_results: Optional[Dict[str, Any]] = None
+        self._files_reviewed = 0
+
+    async def run(self, producer: Awaitable) -> Dict[str, Any]:
+        """Exécute le producteur (les sous-tâches) en alimentant la revue et les tests au fil de l'eau"""
+        self.context.file_listeners.append(self._on_file_created)
+
+        review_task = asyncio.create_task(self._review_loop())
+        test_task = asyncio.create_task(self._test_loop())
+
+        try:
+            await producer
+        except BaseException:
+            review_task.cancel()
+            test_task.cancel()
+            raise
+        finally:
+            self.context.file_listeners.remove(self._on_file_created)
+            self._files.put_nowait(_END_OF_STREAM)
+
+        try:
+            await review_task
+        finally:
+            self._review_done = True
+            self._reviewed.set()
+            await test_task
+
+        return {"review": self.review_result, "tests": self.test_results}
+
+    def _on_file_created(self, file_path: str):
+        """Reçoit chaque fichier écrit par le Coder"""
+        self._files.put_nowait(file_path)
+
+    async def _next_batch(self) -> Optional[List[str]]:
+        """Attend un fichier puis récupère ceux déjà disponibles, jusqu'à la taille du lot"""
+        first = await self._files.get()
+        if first is _END_OF_STREAM:
+            return None
+
+        batch = [first]
+        while len(batch) < self.batch_size and not self._files.empty():
+            item = self._files.get_nowait()
+            if item is _END_OF_STREAM:
+                self._files.put_nowait(_END_OF_STREAM)
+                break
+            batch.append(item)
+        return batch
+
+    async def _review_loop(self):
+        """Revoit les fichiers par lots dès leur création"""
+        while True:
+            batch = await self._next_batch()
+            if batch is None:
+                break
+
+            if self.reviewer:
+                review = await self.reviewer.review_files(batch, self.context)
+                self.review_result["issues"].extend(review.get("issues", []))
+                self.review_result["suggestions"].extend(review.get("suggestions", []))
+
+            self._files_reviewed += len(batch)
+            self.review_result["summary"] = (
+                f"{self._files_reviewed} fichier(s) revoiué(s), "
+                f"{len(self.review_result['issues'])} problème(s) identifié(s)"
+            )
+            self._batches_reviewed += 1
+            self._reviewed.set()
+            logger.info(f"Lot {self._batches_reviewed} revu ({len(batch)} fichier(s))")
+
+    async def _test_loop(self):
+        """Lance les tests dès le premier lot revu, puis à nouveau si de nouveaux lots arrivent"""
+        if not self.tester:
+            return
+
+        tested_batches = 0
+        while True:
+            if not self._review_done:
+                await self._reviewed.wait()
+            self._reviewed.clear()
+
+            if self._batches_reviewed == tested_batches:
+                if self._review_done:
+                    break
+                continue
+
+            tested_batches = self._batches_reviewed
+            logger.info(f"Tests sur {tested_batches} lot(s) revu(s)")
+            self.test_results = await self.tester.test(self.context)
+
+        # Aucun fichier produit: exécuter les tests une fois, comme en mode séquentiel
+        if self.test_results is None:
+            self.test_results = await self.tester.test(self.context)
@@ -0,0 +1,182 @@
+"""
+Construction du contexte des prompts dans un budget de tokens
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Iterable
+
+try:
+    from ..config import settings
+    from .context import Context, TaskStatus
+except ImportError:
+    from config import settings
+    from core.context import Context, TaskStatus
+
+
+# En dessous de ce reste de budget, un élément n'est plus tronqué pour tenir
+MIN_TRUNCATED_TOKENS = 64
+
+# Éléments candidats repris de l'historique du contexte
+CANDIDATE_MESSAGES = 50
+CANDIDATE_RESULTS = 50
+
+_KEYWORD = re.compile(r"\w{3,}")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimation locale rapide: ~4 caractères par token, au moins un token par mot"""
+    if not text:
+        return 0
+    return max(len(text) // 4, len(text.split())) + 1
+
+
+def budget_for_model(model_name: Optional[str]) -> int:
+    """Budget de contexte (tokens) configuré pour un modèle"""
+    budgets = settings.prompt_context_budgets
+    return budgets.get(model_name, budgets.get("default", 1500))
+
+
+def _keywords(text: str) -> set:
+    return {word.lower() for word in _KEYWORD.findall(text)}
+
+
+def rank_by_relevance(query: str, texts: Iterable[str], limit: int) -> List[str]:
+    """Textes partageant le plus de mots-clés avec la requête (les textes sans lien sont écartés)"""
+    query_keywords = _keywords(query)
+    if not query_keywords:
+        return []
+    scored = []
+    for index, text in enumerate(dict.fromkeys(texts)):
+        overlap = len(query_keywords & _keywords(text))
+        if overlap:
+            scored.append((-overlap, index, text))
+    return [text for _, _, text in sorted(scored)[:limit]]
+
+
+@dataclass
+class ContextItem:
+    """Élément candidat au contexte d'un prompt"""
+    kind: str
+    text: str
+    weight: float = 1.0
+    recency: float = 0.0  # 0 (ancien) à 1 (récent)
+    truncatable: bool = False
+    order: int = 0
+    score: float = 0.0
+    tokens: int = 0
+
+
+class PromptContextBuilder:
+    """Classe les éléments de contexte par pertinence et garde les meilleurs dans le budget"""
+
+    def __init__(self, budget_tokens: int, query: str = ""):
+        self.budget_tokens = max(0, budget_tokens)
+        self.query_keywords = _keywords(query)
+        self.used_tokens = 0
+        self._items: List[ContextItem] = []
+        self._selected: Optional[Dict[str, List[ContextItem]]] = None
+        self._omitted: Dict[str, int] = {}
+
+    def add(
+        self,
+        kind: str,
+        text: str,
+        weight: float = 1.0,
+        recency: float = 0.0,
+        truncatable: bool = False
+    ):
+        """Ajoute un élément candidat"""
+        if text:
+            self._items.append(ContextItem(kind, text, weight, recency, truncatable, order=len(self._items)))
+            self._selected = None
+
+    def add_files(self, paths: Iterable[str], weight: float = 1.0):
+        """Ajoute des chemins de fichiers (les plus récents d'abord dans le classement à pertinence égale)"""
+        paths = list(dict.fromkeys(paths))
+        for index, path in enumerate(paths):
+            self.add("files", path, weight, recency=(index + 1) / len(paths))
+
+    def add_context(self, context: Context, files: bool = True):
+        """Ajoute les fichiers, résultats de tâches et messages récents d'un contexte"""
+        if files:
+            self.add_files(context.files_created + context.files_modified)
+
+        completed = context.tasks.by_status(TaskStatus.COMPLETED)[-CANDIDATE_RESULTS:]
+        for index, task in enumerate(completed):
+            if task.result and task.id != "main":
+                self.add("results", f"{task.description}: {task.result}", 0.8, (index + 1) / len(completed))
+
+        messages = context.messages.recent(CANDIDATE_MESSAGES)
+        for index, message in enumerate(messages):
+            if message.get("role") != "system":
+                self.add("messages", message.get("content", ""), 0.5, (index + 1) / len(messages), truncatable=True)
+
+    def _score(self, item: ContextItem) -> float:
+        """Pertinence (mots-clés partagés avec la requête), pondérée par le type et la récence"""
+        relevance = 0.0
+        if self.query_keywords:
+            relevance = len(self.query_keywords & _keywords(item.text)) / len(self.query_keywords)
+        return item.weight * (1.0 + 2.0 * relevance) + 0.5 * item.recency
+
+    def pack(self) -> Dict[str, List[ContextItem]]:
+        """Sélectionne les éléments les mieux classés qui tiennent dans le budget"""
+        if self._selected is not None:
+            return self._selected
+
+        for item in self._items:
+            item.score = self._score(item)
+            item.tokens = estimate_tokens(item.text)
+
+        remaining = self.budget_tokens
+        selected: List[ContextItem] = []
+        self._omitted = {}
+        for item in sorted(self._items, key=lambda i: (-i.score, i.order)):
+            if item.tokens <= remaining:
+                selected.append(item)
+                remaining -= item.tokens
+            elif item.truncatable and remaining >= MIN_TRUNCATED_TOKENS:
+                # Environ 4 caractères par token; le reste du budget est consommé
+                truncated = item.text[:remaining * 4] + "\n[... tronqué]"
+                selected.append(ContextItem(
+                    item.kind, truncated, item.weight, item.recency, True, item.order, item.score, remaining
+                ))
+                remaining = 0
+            else:
+                self._omitted[item.kind] = self._omitted.get(item.kind, 0) + 1
+
+        self.used_tokens = self.budget_tokens - remaining
+        # Ordre d'origine conservé dans chaque section (messages chronologiques, fichiers)
+        self._selected = {}
+        for item in sorted(selected, key=lambda i: i.order):
+            self._selected.setdefault(item.kind, []).append(item)
+        return self._selected
+
+    def texts(self, kind: str) -> List[str]:
+        """Textes retenus pour un type d'élément"""
+        return [item.text for item in self.pack().get(kind, [])]
+
+    def omitted(self, kind: str) -> int:
+        """Nombre d'éléments écartés faute de budget"""
+        self.pack()
+        return self._omitted.get(kind, 0)
+
+    def render(self, kind: str, separator: str = "\n", prefix: str = "", empty: str = "Aucun") -> str:
+        """Section de prompt pour un type d'élément (avec le nombre d'éléments omis)"""
+        texts = self.texts(kind)
+        omitted = self.omitted(kind)
+        if not texts and not omitted:
+            return empty
+        lines = [f"{prefix}{text}" for text in texts]
+        if omitted:
+            lines.append(f"{prefix}(+{omitted} non inclus)")
+        return separator.join(lines)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retourne l'occupation du budget"""
+        self.pack()
+        return {
+            "budget_tokens": self.budget_tokens,
+            "used_tokens": self.used_tokens,
+            "candidates": len(self._items),
+            "omitted": dict(self._omitted)
+        }
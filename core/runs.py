@@ -0,0 +1,106 @@
+"""
+Registre des exécutions de tâches (runs) de l'orchestrateur
+"""
+import asyncio
+import uuid
+from typing import Dict, List, Optional, Any, Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+
+from .context import Context
+
+
+class RunStatus(Enum):
+    """Statuts possibles d'une exécution"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+@dataclass
+class TaskRun:
+    """Exécution d'une tâche avec son propre contexte"""
+    run_id: str
+    description: str
+    context: Context
+    status: RunStatus = RunStatus.PENDING
+    created_at: datetime = field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    handle: Optional[asyncio.Task] = field(default=None, repr=False)
+    # Annulation demandée par l'utilisateur (cancel_run), à distinguer d'un arrêt du serveur
+    cancel_requested: bool = False
+
+    @property
+    def is_finished(self) -> bool:
+        """Vérifie si l'exécution est terminée"""
+        return self.status in (RunStatus.COMPLETED, RunStatus.FAILED, RunStatus.CANCELLED)
+
+    def to_dict(self, include_context: bool = False) -> Dict[str, Any]:
+        """Convertit l'exécution en dictionnaire"""
+        data = {
+            "run_id": self.run_id,
+            "description": self.description,
+            "status": self.status.value,
+            "project_name": self.context.project_name,
+            "tasks_completed": self.context.tasks_completed,
+            "tasks_failed": self.context.tasks_failed,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+        if self.result is not None:
+            data["success"] = self.result.get("success", False)
+            data["error"] = self.result.get("error")
+        if include_context:
+            # Dernier instantané publié: lisible pendant que les agents modifient le contexte
+            data["context"] = self.context.snapshot.to_dict()
+        return data
+
+
+class RunRegistry:
+    """Registre des exécutions en cours et récentes"""
+
+    def __init__(self, max_finished_runs: int = 100, on_forget: Optional[Callable[[TaskRun], None]] = None):
+        self.max_finished_runs = max_finished_runs
+        self._runs: Dict[str, TaskRun] = {}
+        # Appelé pour chaque exécution terminée oubliée (nettoyage de ses fichiers)
+        self.on_forget = on_forget
+
+    def create(self, description: str, context: Context) -> TaskRun:
+        """Crée et enregistre une nouvelle exécution"""
+        run_id = context.run_id or uuid.uuid4().hex[:12]
+        context.run_id = run_id
+
+        run = TaskRun(run_id=run_id, description=description, context=context)
+        self._runs[run_id] = run
+        self._prune()
+        return run
+
+    def get(self, run_id: str) -> Optional[TaskRun]:
+        """Récupère une exécution par son ID"""
+        return self._runs.get(run_id)
+
+    def list(self, active_only: bool = False) -> List[TaskRun]:
+        """Liste les exécutions (plus récentes d'abord)"""
+        runs = [run for run in self._runs.values() if not (active_only and run.is_finished)]
+        runs.sort(key=lambda r: r.created_at, reverse=True)
+        return runs
+
+    def active_count(self) -> int:
+        """Nombre d'exécutions non terminées"""
+        return sum(1 for run in self._runs.values() if not run.is_finished)
+
+    def _prune(self):
+        """Oublie les exécutions terminées les plus anciennes au-delà de la limite"""
+        finished = [run for run in self._runs.values() if run.is_finished]
+        if len(finished) <= self.max_finished_runs:
+            return
+
+        finished.sort(key=lambda r: r.created_at)
+        for run in finished[:len(finished) - self.max_finished_runs]:
+            del self._runs[run.run_id]
+            if self.on_forget:
+                self.on_forget(run)
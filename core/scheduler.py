@@ -0,0 +1,430 @@
+"""
+Ordonnanceur de sous-tâches basé sur le graphe de dépendances
+"""
+import asyncio
+import heapq
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Any
+from loguru import logger
+
+from .context import Context, Task, TaskStatus, AgentType
+from .deadline import deadline_scope, remaining_time
+from .events import EventBus, EventType, event_bus
+
+
+# Statuts d'une dépendance qui empêchent définitivement ses dépendants de démarrer
+_DEAD_STATUSES = (TaskStatus.FAILED, TaskStatus.BLOCKED, TaskStatus.CANCELLED)
+
+
+class AgentPool:
+    """Pool de workers borné pour un type d'agent (bulkhead)"""
+
+    def __init__(self, agent_type: AgentType, max_workers: int, max_queue: int):
+        self.agent_type = agent_type
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+
+        # Ordonnanceurs (pool partagé entre exécutions) en attente d'une place libérée
+        self._capacity_waiters: List[asyncio.Future] = []
+
+        # Statistiques (queued: tâches prêtes, toutes exécutions confondues, en attente d'un worker)
+        self.active = 0
+        self.queued = 0
+        self.total_acquired = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def can_accept(self) -> bool:
+        """Vérifie que le pool peut encore accepter une tâche (workers + file d'attente)"""
+        return self.active + self.queued < self.max_workers + self.max_queue
+
+    def has_free_worker(self) -> bool:
+        """Vérifie qu'un worker est libre tout de suite"""
+        return self.active < self.max_workers
+
+    def wait_for_capacity(self) -> asyncio.Future:
+        """Future résolu à la prochaine place libérée dans le pool (par n'importe quelle exécution)"""
+        waiter = asyncio.get_running_loop().create_future()
+        self._capacity_waiters.append(waiter)
+        return waiter
+
+    def _notify_capacity(self):
+        """Réveille les ordonnanceurs qui attendent une place"""
+        waiters, self._capacity_waiters = self._capacity_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def acquire(self, enqueued_at: float) -> "PoolSlot":
+        """Prend un worker libre (voir has_free_worker) pour une tâche prête depuis `enqueued_at`"""
+        return PoolSlot(self, enqueued_at)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retourne les statistiques du pool"""
+        return {
+            "agent_type": self.agent_type.value,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queue_length": self.queued,
+            "saturated": not self.can_accept(),
+            "total_acquired": self.total_acquired,
+            "avg_wait_seconds": self.total_wait_time / self.total_acquired if self.total_acquired else 0.0,
+            "max_wait_seconds": self.max_wait_time,
+            "utilization": (self.active / self.max_workers) * 100
+        }
+
+
+class PoolSlot:
+    """Worker d'un pool pris pour une tâche et conservé jusqu'à la fin de son exécution"""
+
+    def __init__(self, pool: AgentPool, enqueued_at: float):
+        self.pool = pool
+        self._released = False
+
+        wait_time = time.monotonic() - enqueued_at
+        pool.total_acquired += 1
+        pool.total_wait_time += wait_time
+        pool.max_wait_time = max(pool.max_wait_time, wait_time)
+        pool.active += 1
+
+    def release(self):
+        """Rend le worker (idempotent: aussi appelé si la tâche est annulée avant de démarrer)"""
+        if not self._released:
+            self._released = True
+            self.pool.active -= 1
+            self.pool._notify_capacity()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+
+def build_agent_pools(pool_sizes: Dict[str, int], queue_depths: Dict[str, int]) -> Dict[AgentType, AgentPool]:
+    """Crée un pool par type d'agent à partir de la configuration"""
+    pools = {}
+    for agent_type in AgentType:
+        pools[agent_type] = AgentPool(
+            agent_type,
+            max_workers=pool_sizes.get(agent_type.value, 1),
+            max_queue=queue_depths.get(agent_type.value, 0)
+        )
+    return pools
+
+
+def compute_critical_paths(tasks) -> Dict[str, int]:
+    """Longueur de la plus longue chaîne de tâches dépendantes à partir de chaque tâche (incluse)"""
+    tasks = list(tasks)
+    dependents: Dict[str, List[str]] = {task.id: [] for task in tasks}
+    for task in tasks:
+        for dep in task.dependencies:
+            if dep in dependents:
+                dependents[dep].append(task.id)
+
+    lengths: Dict[str, int] = {}
+    for root in dependents:
+        if root in lengths:
+            continue
+
+        # Parcours en profondeur itératif (les cycles sont coupés)
+        stack = [(root, iter(dependents[root]))]
+        visiting = {root}
+        while stack:
+            task_id, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                visiting.discard(task_id)
+                lengths[task_id] = 1 + max(
+                    (lengths.get(c, 0) for c in dependents[task_id] if c not in visiting), default=0
+                )
+            elif child not in lengths and child not in visiting:
+                visiting.add(child)
+                stack.append((child, iter(dependents[child])))
+
+    return lengths
+
+
+class TaskScheduler:
+    """Exécute les sous-tâches d'un contexte en parallèle en respectant leurs dépendances"""
+
+    def __init__(
+        self,
+        context: Context,
+        agents: Dict[AgentType, object],
+        max_concurrent_tasks: int = 5,
+        pools: Optional[Dict[AgentType, AgentPool]] = None,
+        task_timeout: Optional[float] = None,
+        events: Optional[EventBus] = None
+    ):
+        self.context = context
+        self.agents = agents
+        self.max_concurrent_tasks = max(1, max_concurrent_tasks)
+        self.pools = pools or {}
+        self.task_timeout = task_timeout
+        self.events = events or event_bus
+
+        self._running: Dict[asyncio.Task, str] = {}
+        self._runners: Dict[str, asyncio.Task] = {}
+        self._critical_path: Dict[str, int] = {}
+
+        # File prête incrémentale: dépendants, dépendances restantes et un tas par pool
+        self._dependents: Dict[str, List[str]] = {}
+        self._remaining: Dict[str, int] = {}
+        self._ready: Dict[Optional[AgentType], List[tuple]] = {}
+        self._ready_since: Dict[str, float] = {}
+        self._sequence = 0
+
+    async def run(self):
+        """Exécute toutes les sous-tâches en attente jusqu'à épuisement du graphe"""
+        rounds = 0
+        self._critical_path = compute_critical_paths(self.context.tasks.values())
+        self._build_ready_queues()
+
+        try:
+            while True:
+                self._dispatch_ready_tasks()
+                # Fin d'un lot de modifications: les lecteurs voient l'état à jour
+                self.context.publish_snapshot()
+
+                # Pool partagé saturé par d'autres exécutions: attendre qu'une place s'y libère
+                saturated = [
+                    self.pools[key] for key, heap in self._ready.items()
+                    if heap and key is not None and not self.pools[key].has_free_worker()
+                ]
+                if not self._running and not saturated:
+                    break
+
+                waiters = [pool.wait_for_capacity() for pool in saturated]
+                try:
+                    done, _ = await asyncio.wait(
+                        [*self._running.keys(), *waiters], return_when=asyncio.FIRST_COMPLETED
+                    )
+                finally:
+                    for waiter in waiters:
+                        waiter.cancel()
+                for finished in done:
+                    task_id = self._running.pop(finished, None)
+                    if task_id is not None:
+                        self._runners.pop(task_id, None)
+                        self._on_task_finished(task_id)
+
+                rounds += 1
+                self.context.total_iterations = rounds
+        finally:
+            # Exécution annulée: arrêter immédiatement les sous-tâches en cours
+            if self._running:
+                for runner in self._running:
+                    runner.cancel()
+                await asyncio.gather(*self._running, return_exceptions=True)
+                self._running.clear()
+                self._runners.clear()
+            # Tâches restées dans la file: elles ne comptent plus dans l'attente des pools
+            for key, heap in self._ready.items():
+                if key is not None:
+                    self.pools[key].queued -= len(heap)
+                heap.clear()
+            self._ready_since.clear()
+
+        # Tâches dont une dépendance n'a jamais pu se terminer: cycle de dépendances
+        stuck = [
+            task_id for task_id, count in self._remaining.items()
+            if count > 0 and self._status(task_id) == TaskStatus.PENDING
+        ]
+        for task_id in stuck:
+            self.context.update_task_status(task_id, TaskStatus.BLOCKED, "Cycle de dépendances détecté")
+
+        self.context.publish_snapshot()
+        
+        unstarted = [
+            task_id for task_id, count in self._remaining.items()
+            if count == 0 and self._status(task_id) == TaskStatus.PENDING
+        ]
+        if stuck:
+            logger.warning(f"{len(stuck)} tâche(s) non exécutable(s): {stuck}")
+        elif unstarted:
+            logger.warning(f"{len(unstarted)} tâche(s) jamais démarrée(s): {unstarted}")
+        else:
+            logger.info("Toutes les tâches sont complétées")
+
+    def _build_ready_queues(self):
+        """Indexe les dépendants et compte les dépendances restantes de chaque tâche en attente"""
+        self._dependents = {}
+        self._remaining = {}
+        self._ready = {}
+        self._ready_since = {}
+        dead = []
+
+        for task in self.context.get_pending_tasks():
+            if not self._is_dispatchable(task):
+                agent_name = task.assigned_agent.value if task.assigned_agent else "aucun"
+                logger.warning(f"Agent {agent_name} non trouvé pour la tâche {task.id}")
+                self.context.update_task_status(task.id, TaskStatus.BLOCKED, f"Agent indisponible: {agent_name}")
+                dead.append(task.id)
+                continue
+
+            remaining = 0
+            for dep in task.dependencies:
+                status = self._status(dep)
+                if status == TaskStatus.COMPLETED:
+                    continue
+                remaining += 1
+                self._dependents.setdefault(dep, []).append(task.id)
+                if status in _DEAD_STATUSES:
+                    dead.append(dep)
+            self._remaining[task.id] = remaining
+            if remaining == 0:
+                self._push_ready(task)
+
+        for task_id in dead:
+            self._block_dependents(task_id)
+
+    def _push_ready(self, task: Task):
+        """Ajoute une tâche prête à la file de son pool (la chaîne la plus longue, puis la priorité)"""
+        key = task.assigned_agent if task.assigned_agent in self.pools else None
+        self._sequence += 1
+        entry = (-self._critical_path.get(task.id, 1), task.priority, self._sequence, task.id)
+        heapq.heappush(self._ready.setdefault(key, []), entry)
+        self._ready_since[task.id] = time.monotonic()
+        if key is not None:
+            self.pools[key].queued += 1
+
+    def _dispatch_ready_tasks(self):
+        """Démarre les tâches prêtes tant qu'un worker de leur pool et la limite globale le permettent
+
+        Les tâches en attente restent dans le tas: une tâche du chemin critique prête plus tard
+        passe devant celles de moindre priorité au lieu d'attendre derrière elles
+        """
+        for key, heap in self._ready.items():
+            pool = self.pools[key] if key is not None else None
+            while heap and self._has_capacity(pool):
+                task_id = heapq.heappop(heap)[-1]
+                ready_since = self._ready_since.pop(task_id)
+                if pool is not None:
+                    pool.queued -= 1
+                task = self.context.get_task(task_id)
+                # Entrée périmée: tâche annulée entre-temps
+                if task is not None and task.status == TaskStatus.PENDING:
+                    self._start(task, pool.acquire(ready_since) if pool is not None else _no_pool())
+
+    def _has_capacity(self, pool: Optional[AgentPool]) -> bool:
+        """Vérifie la limite globale et, si la tâche en a un, qu'un worker de son pool est libre"""
+        if len(self._running) >= self.max_concurrent_tasks:
+            return False
+        return pool is None or pool.has_free_worker()
+
+    def _on_task_finished(self, task_id: str):
+        """Débloque les dépendants d'une tâche complétée, ou bloque ceux d'une tâche en échec"""
+        if self._status(task_id) != TaskStatus.COMPLETED:
+            self._block_dependents(task_id)
+            return
+
+        for dependent_id in self._dependents.pop(task_id, ()):
+            self._remaining[dependent_id] -= 1
+            if self._remaining[dependent_id] == 0 and self._status(dependent_id) == TaskStatus.PENDING:
+                self._push_ready(self.context.tasks[dependent_id])
+
+    def _block_dependents(self, task_id: str):
+        """Bloque (transitivement) les tâches qui dépendent d'une tâche qui ne se terminera pas"""
+        stack = [task_id]
+        while stack:
+            failed_id = stack.pop()
+            for dependent_id in self._dependents.pop(failed_id, ()):
+                if self._status(dependent_id) != TaskStatus.PENDING:
+                    continue
+                self.context.update_task_status(
+                    dependent_id, TaskStatus.BLOCKED, f"Dépendance(s) en échec: {failed_id}"
+                )
+                stack.append(dependent_id)
+
+    def _is_dispatchable(self, task: Task) -> bool:
+        """Vérifie qu'un agent est disponible pour la tâche"""
+        return task.assigned_agent is not None and task.assigned_agent in self.agents
+
+    def _status(self, task_id: str) -> TaskStatus:
+        """Statut d'une tâche (une dépendance inconnue est considérée comme satisfaite)"""
+        task = self.context.get_task(task_id)
+        if task is None:
+            return TaskStatus.COMPLETED
+        return task.status
+
+    def cancel_task(self, task_id: str) -> bool:
+        """Annule une sous-tâche; son worker est libéré immédiatement"""
+        runner = self._runners.get(task_id)
+        if runner is not None:
+            runner.cancel()
+            return True
+
+        if self._status(task_id) == TaskStatus.PENDING and task_id in self.context.tasks:
+            self.context.update_task_status(task_id, TaskStatus.CANCELLED, "Annulée avant démarrage")
+            self._block_dependents(task_id)
+            return True
+        return False
+
+    def _start(self, task: Task, pool_slot):
+        """Démarre l'exécution d'une tâche dont le worker est déjà pris"""
+        logger.info(f"Exécution de la tâche {task.id} par {task.assigned_agent.value}")
+        self.context.update_task_status(task.id, TaskStatus.IN_PROGRESS)
+        runner = asyncio.create_task(self._execute(task, pool_slot))
+        if isinstance(pool_slot, PoolSlot):
+            runner.add_done_callback(lambda _: pool_slot.release())
+        self._running[runner] = task.id
+        self._runners[task.id] = runner
+
+    async def _execute(self, task: Task, pool_slot):
+        """Exécute une tâche avec l'agent qui lui est assigné, dans la limite de son échéance"""
+        agent = self.agents[task.assigned_agent]
+        agent_name = getattr(agent, "name", task.assigned_agent.value)
+        run_id = self.context.run_id
+        started = None
+        try:
+            # Le pool de l'agent isole les types entre eux (la limite globale est vérifiée au démarrage)
+            async with pool_slot:
+                started = time.monotonic()
+                self.events.publish(EventType.TASK_STARTED, run_id, task_id=task.id, agent=agent_name)
+                with deadline_scope(self.task_timeout):
+                    result = await asyncio.wait_for(agent.execute(task, self.context), timeout=remaining_time())
+            self.context.update_task_status(task.id, TaskStatus.COMPLETED, result)
+            self._publish_outcome(EventType.TASK_COMPLETED, task, agent_name, started)
+            logger.info(f"Tâche {task.id} complétée")
+        except asyncio.CancelledError:
+            logger.warning(f"Tâche {task.id} annulée")
+            self.context.update_task_status(task.id, TaskStatus.CANCELLED, "Tâche annulée")
+            self._publish_outcome(EventType.TASK_CANCELLED, task, agent_name, started)
+            raise
+        except asyncio.TimeoutError:
+            logger.error(f"Délai dépassé pour la tâche {task.id}")
+            self.context.update_task_status(task.id, TaskStatus.FAILED, "Délai d'exécution dépassé")
+            self._publish_outcome(EventType.TASK_FAILED, task, agent_name, started, "Délai d'exécution dépassé")
+        except Exception as e:
+            logger.error(f"Erreur lors de l'exécution de la tâche {task.id}: {e}")
+            self.context.update_task_status(task.id, TaskStatus.FAILED, str(e))
+            self._publish_outcome(EventType.TASK_FAILED, task, agent_name, started, str(e))
+
+    def _publish_outcome(
+        self,
+        event_type: EventType,
+        task: Task,
+        agent_name: str,
+        started: Optional[float],
+        error: Optional[str] = None
+    ):
+        """Publie la fin d'une tâche (durée nulle si elle n'a jamais démarré)"""
+        self.events.publish(
+            event_type,
+            self.context.run_id,
+            task_id=task.id,
+            agent=agent_name,
+            started=started is not None,
+            duration_seconds=time.monotonic() - started if started is not None else 0.0,
+            error=error
+        )
+
+
+@asynccontextmanager
+async def _no_pool():
+    """Slot neutre pour les agents sans pool"""
+    yield
@@ -0,0 +1,423 @@
+"""
+Mode coordinateur/workers: exécution des sous-tâches dans des processus séparés
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from typing import Dict, List, Optional, Any, Callable
+from pathlib import Path
+from loguru import logger
+
+from .context import Context, Task, AgentType
+from .deadline import deadline_scope, remaining_time
+
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+_FINISHED_STATUSES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+# Nombre de messages récents transmis au worker avec le contexte
+_SNAPSHOT_MESSAGES = 20
+
+
+class JobQueue:
+    """File de sous-tâches partagée entre le coordinateur et les workers (SQLite)
+
+    Mono-machine: le mode WAL et les verrous SQLite ne fonctionnent pas de façon fiable sur un
+    système de fichiers réseau (NFS, SMB). Les workers doivent tourner sur l'hôte du coordinateur,
+    avec la file sur un disque local.
+    """
+
+    def __init__(self, db_path: Path, lease_seconds: float = 60):
+        self.db_path = Path(db_path)
+        self.lease_seconds = lease_seconds
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    agent_type TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    outcome TEXT,
+                    worker_id TEXT,
+                    created_at REAL NOT NULL,
+                    heartbeat_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, agent_type, created_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Une connexion par appel: la file est utilisée depuis plusieurs threads et processus
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def enqueue(self, agent_type: str, payload: Dict[str, Any]) -> str:
+        """Ajoute une sous-tâche à la file et retourne l'identifiant du job"""
+        job_id = uuid.uuid4().hex
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, agent_type, status, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, agent_type, JOB_PENDING, json.dumps(payload, ensure_ascii=False), time.time())
+            )
+        return job_id
+
+    def claim(self, worker_id: str, agent_types: List[str]) -> Optional[Dict[str, Any]]:
+        """Attribue le plus ancien job disponible au worker (ou un job dont le worker a disparu)"""
+        if not agent_types:
+            return None
+
+        now = time.time()
+        placeholders = ", ".join("?" for _ in agent_types)
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                f"""
+                SELECT id, agent_type, payload FROM jobs
+                WHERE agent_type IN ({placeholders})
+                  AND (status = ? OR (status = ? AND heartbeat_at < ?))
+                ORDER BY created_at LIMIT 1
+                """,
+                (*agent_types, JOB_PENDING, JOB_RUNNING, now - self.lease_seconds)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = ?, heartbeat_at = ? WHERE id = ?",
+                (JOB_RUNNING, worker_id, now, row["id"])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        return {"id": row["id"], "agent_type": row["agent_type"], "payload": json.loads(row["payload"])}
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Prolonge le bail du worker; retourne False si le job a été annulé ou repris"""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ? AND worker_id = ?",
+                (time.time(), job_id, JOB_RUNNING, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def finish(self, job_id: str, worker_id: str, status: str, outcome: Dict[str, Any]):
+        """Enregistre le résultat d'un job (ignoré s'il a été annulé entre-temps)"""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, outcome = ? WHERE id = ? AND status = ? AND worker_id = ?",
+                (status, json.dumps(outcome, ensure_ascii=False), job_id, JOB_RUNNING, worker_id)
+            )
+
+    def cancel(self, job_id: str):
+        """Annule un job en attente ou en cours"""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ? WHERE id = ? AND status IN (?, ?)",
+                (JOB_CANCELLED, job_id, JOB_PENDING, JOB_RUNNING)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Retourne l'état d'un job"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT status, outcome, worker_id FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "status": row["status"],
+            "outcome": json.loads(row["outcome"]) if row["outcome"] else None,
+            "worker_id": row["worker_id"]
+        }
+
+    def delete(self, job_id: str):
+        """Supprime un job terminé"""
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def get_statistics(self) -> Dict[str, int]:
+        """Nombre de jobs par statut"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+
+def context_snapshot(context: Context) -> Dict[str, Any]:
+    """Partie du contexte nécessaire à un worker pour exécuter une sous-tâche"""
+    return {
+        "run_id": context.run_id,
+        "project_path": context.project_path,
+        "project_name": context.project_name,
+        "project_description": context.project_description,
+        "tasks": [task.to_dict() for task in context.tasks.values()],
+        "files_created": list(context.files_created),
+        "files_modified": list(context.files_modified),
+        "messages": context.messages[-_SNAPSHOT_MESSAGES:]
+    }
+
+
+def restore_context(snapshot: Dict[str, Any]) -> Context:
+    """Reconstruit un contexte de travail à partir d'un snapshot"""
+    context = Context(
+        project_path=snapshot["project_path"],
+        project_name=snapshot["project_name"],
+        project_description=snapshot["project_description"],
+        run_id=snapshot.get("run_id")
+    )
+    for task_data in snapshot["tasks"]:
+        context.tasks[task_data["id"]] = Task.from_dict(task_data)
+    context.files_created.extend(snapshot["files_created"])
+    context.files_modified.extend(snapshot["files_modified"])
+    context.messages.extend(snapshot["messages"])
+    return context
+
+
+class RemoteAgentProxy:
+    """Agent local qui délègue l'exécution des sous-tâches aux workers via la file"""
+
+    def __init__(self, agent_type: AgentType, queue: JobQueue, poll_interval: float = 0.2):
+        self.agent_type = agent_type
+        self.name = f"{agent_type.value} (workers)"
+        self.queue = queue
+        self.poll_interval = poll_interval
+
+    async def execute(self, task: Task, context: Context) -> str:
+        """Publie la sous-tâche, attend son résultat et reporte ses effets dans le contexte"""
+        payload = {
+            "task": task.to_dict(),
+            "context": context_snapshot(context),
+            "timeout": remaining_time()
+        }
+        job_id = await asyncio.to_thread(self.queue.enqueue, self.agent_type.value, payload)
+
+        try:
+            while True:
+                job = await asyncio.to_thread(self.queue.get, job_id)
+                if job is None or job["status"] in _FINISHED_STATUSES:
+                    break
+                await asyncio.sleep(self.poll_interval)
+        except asyncio.CancelledError:
+            # Hors de la boucle d'événements (attente possible du verrou SQLite), sans être interrompu
+            await asyncio.shield(asyncio.to_thread(self.queue.cancel, job_id))
+            raise
+
+        await asyncio.to_thread(self.queue.delete, job_id)
+        if job is None or job["status"] == JOB_CANCELLED:
+            raise RuntimeError(f"Job {job_id} annulé côté worker")
+
+        outcome = job["outcome"] or {}
+        for file_path in outcome.get("files_created", []):
+            context.record_file_created(file_path)
+        context.files_modified.extend(outcome.get("files_modified", []))
+        context.messages.extend(outcome.get("messages", []))
+
+        if job["status"] == JOB_FAILED:
+            raise RuntimeError(outcome.get("error", "Erreur inconnue du worker"))
+        return outcome.get("result")
+
+
+class Worker:
+    """Boucle d'un worker: réclame des jobs et les exécute avec ses propres agents"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        agents: Dict[AgentType, Any],
+        worker_id: Optional[str] = None,
+        poll_interval: float = 0.2,
+        heartbeat_interval: Optional[float] = None
+    ):
+        self.queue = queue
+        self.agents = agents
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval or max(1.0, queue.lease_seconds / 3)
+        self.jobs_done = 0
+
+    async def run(self, max_jobs: Optional[int] = None):
+        """Traite les jobs jusqu'à l'arrêt du processus (ou max_jobs)"""
+        agent_types = [agent_type.value for agent_type in self.agents]
+        logger.info(f"Worker {self.worker_id} démarré ({', '.join(agent_types)})")
+
+        while max_jobs is None or self.jobs_done < max_jobs:
+            job = await asyncio.to_thread(self.queue.claim, self.worker_id, agent_types)
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self.run_job(job)
+            self.jobs_done += 1
+
+    async def run_job(self, job: Dict[str, Any]):
+        """Exécute un job et publie son résultat"""
+        payload = job["payload"]
+        task = Task.from_dict(payload["task"])
+        context = restore_context(payload["context"])
+        agent = self.agents[AgentType(job["agent_type"])]
+
+        files_created: List[str] = []
+        context.file_listeners.append(files_created.append)
+        known_modified = len(context.files_modified)
+        known_messages = len(context.messages)
+
+        execution = asyncio.create_task(self._execute(agent, task, context, payload.get("timeout")))
+        heartbeat = asyncio.create_task(self._keep_alive(job["id"], execution))
+        try:
+            result = await execution
+            status, outcome = JOB_COMPLETED, {"result": result}
+        except asyncio.CancelledError:
+            if not (heartbeat.done() and heartbeat.result()):
+                raise
+            logger.warning(f"Job {job['id']} annulé par le coordinateur")
+            return
+        except Exception as e:
+            logger.error(f"Erreur lors de l'exécution du job {job['id']}: {e}")
+            status, outcome = JOB_FAILED, {"error": str(e)}
+        finally:
+            heartbeat.cancel()
+
+        outcome["files_created"] = files_created
+        outcome["files_modified"] = context.files_modified[known_modified:]
+        outcome["messages"] = context.messages[known_messages:]
+        await asyncio.to_thread(self.queue.finish, job["id"], self.worker_id, status, outcome)
+
+    async def _execute(self, agent, task: Task, context: Context, timeout: Optional[float]):
+        with deadline_scope(timeout):
+            return await asyncio.wait_for(agent.execute(task, context), timeout=remaining_time())
+
+    async def _keep_alive(self, job_id: str, execution: asyncio.Task):
+        """Prolonge le bail du job; retourne True si l'exécution a été interrompue (job annulé)"""
+        while not execution.done():
+            await asyncio.sleep(self.heartbeat_interval)
+            if not await asyncio.to_thread(self.queue.heartbeat, job_id, self.worker_id):
+                execution.cancel()
+                return True
+        return False
+
+
+def default_agent_factory() -> Dict[AgentType, Any]:
+    """Agents d'un worker construits à partir des clés API de l'environnement"""
+    try:
+        from ..agents.coder import CoderAgent
+        from ..agents.tester import TesterAgent
+        from ..models.factory import ModelFactory
+        from ..models.null import NullModel
+        from ..config import settings
+    except ImportError:
+        from agents.coder import CoderAgent
+        from agents.tester import TesterAgent
+        from models.factory import ModelFactory
+        from models.null import NullModel
+        from config import settings
+
+    def create_model(model_type: str, api_key: Optional[str], model_name: str):
+        if not api_key:
+            return NullModel(f"{model_name} (No Key)")
+        return ModelFactory.create_model(model_type, api_key, model_name)
+
+    return {
+        AgentType.CODER: CoderAgent(create_model("claude", settings.anthropic_api_key, settings.coder_model)),
+        AgentType.TESTER: TesterAgent(create_model("openai", settings.openai_api_key, "gpt-4"))
+    }
+
+
+def load_agent_factory(path: str) -> Callable[[], Dict[AgentType, Any]]:
+    """Charge une fabrique d'agents "module:fonction" (fabrique par défaut si vide)"""
+    if not path:
+        return default_agent_factory
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def worker_main(db_path: str, agent_types: List[str], factory_path: str = "", lease_seconds: float = 60):
+    """Point d'entrée d'un processus worker"""
+    factory = load_agent_factory(factory_path)
+    agents = {
+        agent_type: agent for agent_type, agent in factory().items()
+        if agent_type.value in agent_types
+    }
+    worker = Worker(JobQueue(Path(db_path), lease_seconds), agents)
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        pass
+
+
+class WorkerProcessPool:
+    """Lance et arrête les processus workers locaux"""
+
+    def __init__(
+        self,
+        db_path: Path,
+        num_workers: int,
+        agent_types: List[str],
+        factory_path: str = "",
+        lease_seconds: float = 60
+    ):
+        self.db_path = Path(db_path)
+        self.num_workers = max(1, num_workers)
+        self.agent_types = list(agent_types)
+        self.factory_path = factory_path
+        self.lease_seconds = lease_seconds
+        self.processes: List[multiprocessing.Process] = []
+
+    def start(self):
+        """Démarre les processus workers"""
+        # spawn: aucun état de la boucle asyncio du coordinateur n'est hérité
+        mp_context = multiprocessing.get_context("spawn")
+        for _ in range(self.num_workers - len(self.processes)):
+            process = mp_context.Process(
+                target=worker_main,
+                args=(str(self.db_path), self.agent_types, self.factory_path, self.lease_seconds),
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+        logger.info(f"{len(self.processes)} worker(s) démarré(s) sur {self.db_path}")
+
+    def stop(self, timeout: float = 5):
+        """Arrête les processus workers"""
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join(timeout)
+        self.processes.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retourne l'état des processus workers"""
+        return {
+            "num_workers": self.num_workers,
+            "alive": sum(1 for process in self.processes if process.is_alive()),
+            "agent_types": self.agent_types
+        }
+
+
+if __name__ == "__main__":
+    # Worker supplémentaire sur l'hôte du coordinateur:
+    # python -m auto_antigravity.core.workers --queue ./workers/jobs.sqlite3
+    parser = argparse.ArgumentParser(description="Worker Auto-Antigravity")
+    parser.add_argument("--queue", required=True, help="Chemin de la file SQLite (disque local de l'hôte du coordinateur)")
+    parser.add_argument("--agents", default="coder", help="Types d'agents servis, séparés par des virgules")
+    parser.add_argument("--factory", default="", help="Fabrique d'agents module:fonction")
+    parser.add_argument("--lease", type=float, default=60, help="Durée du bail d'un job (secondes)")
+    args = parser.parse_args()
+    worker_main(args.queue, args.agents.split(","), args.factory, args.lease)
@@ -0,0 +1,390 @@
+"""
+Backends d'accès à l'espace de travail: API Antigravity ou système de fichiers local
+"""
+import asyncio
+import fnmatch
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Union, Tuple, AsyncIterator
+from pathlib import Path
+from loguru import logger
+
+try:
+    from ..config import settings
+    from .api_client import AntigravityClient, get_antigravity_client
+    from .commands import CommandChunk, stream_subprocess
+    from .deadline import timeout_for
+except ImportError:
+    from config import settings
+    from core.api_client import AntigravityClient, get_antigravity_client
+    from core.commands import CommandChunk, stream_subprocess
+    from core.deadline import timeout_for
+
+
+# Limite des résultats de recherche locale
+MAX_SEARCH_RESULTS = 500
+
+
+class LocalWorkspaceBackend:
+    """Même interface que AntigravityClient, directement sur le disque (aucun appel réseau)"""
+
+    name = "local"
+    is_remote = False
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root).resolve()
+
+    def _resolve(self, file_path: str) -> Path:
+        """Chemin absolu d'un fichier du projet (refuse de sortir de la racine)"""
+        path = (self.root / file_path).resolve()
+        if path != self.root and self.root not in path.parents:
+            raise ValueError(f"Chemin hors de l'espace de travail: {file_path}")
+        return path
+
+    @staticmethod
+    def _is_ignored_name(name: str) -> bool:
+        return any(fnmatch.fnmatch(name, pattern) for pattern in settings.ignore_patterns)
+
+    def validator(self, file_path: str) -> Optional[Tuple[int, int]]:
+        """(mtime en ns, taille) d'un fichier, sans le lire; None s'il est absent"""
+        try:
+            stat = self._resolve(file_path).stat()
+        except (OSError, ValueError):
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    # Méthodes pour les fichiers (les accès disque s'exécutent hors de la boucle d'événements)
+
+    async def read_file(self, file_path: str) -> str:
+        """Lit le contenu d'un fichier"""
+        return await asyncio.to_thread(self._read_sync, file_path)
+
+    async def write_file(self, file_path: str, content: str) -> bool:
+        """Écrit du contenu dans un fichier"""
+        return await asyncio.to_thread(self._write_sync, file_path, content)
+
+    async def list_files(self, directory: str) -> List[str]:
+        """Liste les fichiers d'un répertoire"""
+        return await asyncio.to_thread(self._list_sync, directory)
+
+    async def delete_file(self, file_path: str) -> bool:
+        """Supprime un fichier"""
+        return await asyncio.to_thread(self._delete_sync, file_path)
+
+    async def read_files(self, file_paths: List[str]) -> Dict[str, str]:
+        """Lit plusieurs fichiers; les fichiers illisibles sont omis"""
+        return await asyncio.to_thread(self._read_many_sync, file_paths)
+
+    async def read_files_if_changed(
+        self,
+        validators: Dict[str, Optional[Tuple[int, int]]]
+    ) -> Dict[str, Tuple[Optional[str], Tuple[int, int]]]:
+        """Lecture conditionnelle groupée: {chemin: (contenu ou None si inchangé, validateur)}; les fichiers illisibles sont omis"""
+        return await asyncio.to_thread(self._read_if_changed_sync, validators)
+
+    async def validators(self, file_paths: List[str]) -> Dict[str, Optional[Tuple[int, int]]]:
+        """Validateurs (mtime, taille) de plusieurs fichiers, relevés en un seul passage hors de la boucle"""
+        return await asyncio.to_thread(lambda: {path: self.validator(path) for path in file_paths})
+
+    async def write_files(self, files: Dict[str, str]) -> Dict[str, bool]:
+        """Écrit plusieurs fichiers; retourne le succès de chaque écriture"""
+        return await asyncio.to_thread(self._batch_sync, "l'écriture", self._write_sync, list(files.items()))
+
+    async def delete_files(self, file_paths: List[str]) -> Dict[str, bool]:
+        """Supprime plusieurs fichiers; retourne le succès de chaque suppression"""
+        return await asyncio.to_thread(
+            self._batch_sync, "la suppression", self._delete_sync, [(path,) for path in file_paths]
+        )
+
+    def _read_sync(self, file_path: str) -> str:
+        return self._resolve(file_path).read_text(encoding='utf-8')
+
+    def _write_sync(self, file_path: str, content: str) -> bool:
+        path = self._resolve(file_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+        return True
+
+    def _list_sync(self, directory: str) -> List[str]:
+        path = self._resolve(directory)
+        if not path.is_dir():
+            return []
+        return sorted(str(child.relative_to(self.root)) for child in path.iterdir())
+
+    def _delete_sync(self, file_path: str) -> bool:
+        path = self._resolve(file_path)
+        if not path.is_file():
+            return False
+        path.unlink()
+        return True
+
+    def _read_many_sync(self, file_paths: List[str]) -> Dict[str, str]:
+        contents = {}
+        for file_path in file_paths:
+            try:
+                content = self._read_sync(file_path)
+            except (OSError, ValueError, UnicodeDecodeError) as e:
+                logger.error(f"Erreur lors de la lecture du fichier {file_path}: {e}")
+                continue
+            if content:
+                contents[file_path] = content
+        return contents
+
+    def _read_if_changed_sync(
+        self,
+        validators: Dict[str, Optional[Tuple[int, int]]]
+    ) -> Dict[str, Tuple[Optional[str], Tuple[int, int]]]:
+        outcomes = {}
+        for file_path, known in validators.items():
+            # Le validateur est relevé avant la lecture: une écriture concurrente invalidera l'entrée
+            validator = self.validator(file_path)
+            if validator is None:
+                continue
+            if validator == known:
+                outcomes[file_path] = (None, validator)
+                continue
+            try:
+                content = self._read_sync(file_path)
+            except (OSError, ValueError, UnicodeDecodeError) as e:
+                logger.error(f"Erreur lors de la lecture du fichier {file_path}: {e}")
+                continue
+            if content:
+                outcomes[file_path] = (content, validator)
+        return outcomes
+
+    @staticmethod
+    def _batch_sync(operation: str, function, calls: List[tuple]) -> Dict[str, bool]:
+        """Applique une opération fichier par fichier; un échec n'interrompt pas le lot"""
+        results = {}
+        for args in calls:
+            try:
+                results[args[0]] = function(*args)
+            except (OSError, ValueError) as e:
+                logger.error(f"Erreur lors de {operation} du fichier {args[0]}: {e}")
+                results[args[0]] = False
+        return results
+
+    # Méthodes pour le terminal
+
+    async def execute_command(self, command: str) -> Dict[str, Any]:
+        """Exécute une commande dans la racine du projet"""
+        process = await asyncio.create_subprocess_shell(
+            command,
+            cwd=str(self.root),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout_for(settings.timeout))
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            process.kill()
+            await process.wait()
+            raise
+        return {
+            "exit_code": process.returncode,
+            "stdout": stdout.decode('utf-8', errors='replace'),
+            "stderr": stderr.decode('utf-8', errors='replace')
+        }
+
+    def execute_command_stream(self, command: str, cwd: Optional[str] = None) -> AsyncIterator[CommandChunk]:
+        """Exécute une commande et produit sa sortie au fil de l'eau, terminée par un morceau de sortie"""
+        return stream_subprocess(command, cwd or str(self.root))
+
+    # Méthodes pour la gestion de projet
+
+    async def get_project_info(self) -> Dict[str, Any]:
+        """Informations sur le projet local"""
+        return {"name": self.root.name, "path": str(self.root), "backend": self.name}
+
+    async def search_in_files(self, pattern: str, path: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Recherche un motif (expression régulière) dans les fichiers du projet"""
+        regex = re.compile(pattern)
+        base = self._resolve(path) if path else self.root
+        return await asyncio.to_thread(self._search_sync, regex, base)
+
+    def _search_sync(self, regex: "re.Pattern", base: Path) -> List[Dict[str, Any]]:
+        results = []
+        for directory, dirnames, filenames in os.walk(base):
+            # Élagage en place: node_modules, .git... ne sont jamais parcourus
+            dirnames[:] = sorted(name for name in dirnames if not self._is_ignored_name(name))
+            for filename in sorted(filenames):
+                if self._is_ignored_name(filename):
+                    continue
+                file = Path(directory) / filename
+                try:
+                    with open(file, 'r', encoding='utf-8') as f:
+                        for number, line in enumerate(f, 1):
+                            if regex.search(line):
+                                results.append({
+                                    "path": str(file.relative_to(self.root)),
+                                    "line": number,
+                                    "text": line.rstrip("\n")
+                                })
+                                if len(results) >= MAX_SEARCH_RESULTS:
+                                    return results
+                except (OSError, UnicodeDecodeError):
+                    continue
+        return results
+
+    # Méthodes utilitaires
+
+    async def check_connection(self) -> bool:
+        """Le disque local est toujours disponible"""
+        return True
+
+
+WorkspaceBackend = Union[AntigravityClient, LocalWorkspaceBackend]
+
+# Résultat de la sonde de l'API (None: pas encore sondée)
+_api_available: Optional[bool] = None
+_local_backends: Dict[Path, LocalWorkspaceBackend] = {}
+
+
+async def probe_workspace_backend(client: Optional[AntigravityClient] = None) -> str:
+    """Sonde l'API une seule fois (au démarrage) et retient le backend à utiliser"""
+    global _api_available
+    client = client or get_antigravity_client()
+    if not client.api_key:
+        # Mode dégradé: aucune requête réseau, même pour la sonde
+        _api_available = False
+    else:
+        _api_available = await client.check_connection()
+        if not _api_available:
+            logger.warning("Impossible de se connecter à l'API Antigravity: espace de travail local utilisé")
+    logger.info(f"Backend de l'espace de travail: {'api' if _api_available else 'local'}")
+    return "api" if _api_available else "local"
+
+
+def reset_workspace_backend():
+    """Oublie le résultat de la sonde (une nouvelle sélection aura lieu)"""
+    global _api_available
+    _api_available = None
+
+
+def get_workspace_backend(project_path: Union[str, Path]) -> WorkspaceBackend:
+    """Backend à utiliser pour un projet: l'API si elle est joignable, sinon le disque local"""
+    use_api = _api_available
+    if use_api is None:
+        # Pas encore sondée: l'API seulement si une clé est configurée (le disjoncteur protège le reste)
+        use_api = bool(get_antigravity_client().api_key)
+    if use_api:
+        return get_antigravity_client()
+
+    root = Path(project_path).resolve()
+    backend = _local_backends.get(root)
+    if backend is None:
+        backend = LocalWorkspaceBackend(root)
+        _local_backends[root] = backend
+    return backend
+
+
+class FileContentCache:
+    """Cache LRU du contenu des fichiers, revalidé par mtime/taille (local) ou ETag (API)"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        # (espace, chemin) -> (contenu, validateur)
+        self._entries: "OrderedDict[tuple, Tuple[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _namespace(backend: WorkspaceBackend) -> str:
+        return str(backend.root) if not backend.is_remote else backend.api_url
+
+    async def read(self, backend: WorkspaceBackend, file_path: str) -> Optional[str]:
+        """Lit un fichier à travers le cache (None s'il est illisible)"""
+        return (await self.read_many(backend, [file_path])).get(file_path)
+
+    async def read_many(self, backend: WorkspaceBackend, file_paths: List[str]) -> Dict[str, str]:
+        """Lit des fichiers à travers le cache; seuls les fichiers modifiés sont relus
+
+        Validateurs connus (mtime/taille en local, ETag pour l'API) envoyés en un seul appel au backend
+        """
+        namespace = self._namespace(backend)
+        file_paths = list(dict.fromkeys(file_paths))
+        known = {}
+        for file_path in file_paths:
+            entry = self._get(namespace, file_path)
+            known[file_path] = entry[1] if entry is not None else None
+
+        contents = {}
+        outcomes = await backend.read_files_if_changed(known)
+        for file_path, (content, validator) in outcomes.items():
+            if content is None:
+                entry = self._get(namespace, file_path)
+                if entry is not None:
+                    self.hits += 1
+                    contents[file_path] = entry[0]
+                continue
+            self.misses += 1
+            contents[file_path] = content
+            if validator:
+                self._put(namespace, file_path, content, validator)
+            else:
+                self._discard(namespace, file_path)
+        return {path: contents[path] for path in file_paths if path in contents}
+
+    async def written(self, backend: WorkspaceBackend, files: Dict[str, str]):
+        """Met à jour le cache après l'écriture de fichiers par l'agent"""
+        namespace = self._namespace(backend)
+        validators = await backend.validators(list(files)) if files and not backend.is_remote else {}
+        for file_path, content in files.items():
+            validator = validators.get(file_path)
+            if validator is None:
+                # ETag du nouveau contenu inconnu: la prochaine lecture le récupérera
+                self._discard(namespace, file_path)
+            else:
+                self._put(namespace, file_path, content, validator)
+
+    def invalidate(self, backend: WorkspaceBackend, file_path: str):
+        """Oublie un fichier"""
+        self._discard(self._namespace(backend), file_path)
+
+    def clear(self):
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def _get(self, namespace: str, file_path: str) -> Optional[Tuple[str, Any]]:
+        key = (namespace, file_path)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _put(self, namespace: str, file_path: str, content: str, validator: Any):
+        size = len(content)
+        self._discard(namespace, file_path)
+        if size > self.max_bytes:
+            return
+        self._entries[(namespace, file_path)] = (content, validator)
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.size_bytes -= len(evicted)
+            self.evictions += 1
+
+    def _discard(self, namespace: str, file_path: str):
+        entry = self._entries.pop((namespace, file_path), None)
+        if entry is not None:
+            self.size_bytes -= len(entry[0])
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retourne l'occupation et l'efficacité du cache"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions
+        }
+
+
+# Cache partagé par tous les agents du processus
+file_cache = FileContentCache(settings.file_cache_max_bytes)
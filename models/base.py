@@ -1,9 +1,17 @@
 """
 Classe de base pour les modèles d'IA
 """
+import time
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any
 
+try:
+    from ..core.deadline import remaining_time
+    from ..core.events import EventType, event_bus
+except ImportError:
+    from core.deadline import remaining_time
+    from core.events import EventType, event_bus
+
 
 class BaseModel(ABC):
     """Classe de base pour tous les modèles d'IA"""
@@ -38,3 +46,29 @@ class BaseModel(ABC):
         """Valide que la clé API est présente"""
         if not self.api_key:
             raise ValueError(f"Clé API manquante pour le modèle {self.model_name}")
+    
+    def _request_timeout(self) -> Dict[str, Any]:
+        """Timeout de requête aligné sur l'échéance en cours (vide si aucune échéance)"""
+        remaining = remaining_time()
+        if remaining is None:
+            return {}
+        return {"timeout": remaining}
+    
+    def _publish_call(
+        self,
+        method: str,
+        started: float,
+        prompt_chars: int,
+        response_chars: int = 0,
+        error: Optional[str] = None
+    ):
+        """Publie un appel au modèle sur le bus d'événements"""
+        event_bus.publish(
+            EventType.MODEL_CALL,
+            model=self.model_name,
+            method=method,
+            duration_seconds=time.monotonic() - started,
+            prompt_chars=prompt_chars,
+            response_chars=response_chars,
+            error=error
+        )
@@ -0,0 +1,370 @@
+"""
+Cache persistant des réponses des modèles d'IA
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+from loguru import logger
+
+from .base import BaseModel
+from .similarity import minhash_signature, lsh_buckets, estimate_similarity, similarity_available
+
+try:
+    from ..config import settings
+except ImportError:
+    from config import settings
+
+
+class ResponseCache:
+    """Réponses des modèles sur disque (SQLite), avec expiration par entrée et éviction LRU bornée en taille"""
+
+    def __init__(self, db_path: Path, max_bytes: int, ttl_seconds: float = 0):
+        self.db_path = Path(db_path)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._ready = False
+        self._lock = threading.Lock()
+
+        # Statistiques du processus courant
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.expired = 0
+        self.evictions = 0
+        # Occupation tenue à jour à chaque écriture (None avant le premier accès à la base)
+        self._entries: Optional[int] = None
+        self._size_bytes: Optional[int] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Base créée au premier accès: un modèle instancié sans être appelé ne touche pas au disque
+        if not self._ready:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    model_name TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+            # Signatures MinHash et buckets LSH des réponses réutilisables pour des prompts proches
+            conn.execute("CREATE TABLE IF NOT EXISTS signatures (key TEXT PRIMARY KEY, signature BLOB NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (namespace TEXT NOT NULL, bucket TEXT NOT NULL, key TEXT NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (namespace, bucket)")
+            self._entries, self._size_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            self._ready = True
+        return conn
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model_name: str,
+        prompt: Any,
+        temperature: float,
+        max_tokens: int,
+        options: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Clé d'une requête: empreinte du fournisseur, du modèle, du prompt et des paramètres"""
+        prompt_hash = hashlib.sha256(
+            json.dumps(prompt, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        parameters = json.dumps(
+            [provider, model_name, prompt_hash, temperature, max_tokens, options or {}],
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(parameters.encode("utf-8")).hexdigest()
+
+    def _forget(self, conn: sqlite3.Connection, keys: List[str], sizes: List[int]):
+        """Supprime les réponses et leurs signatures"""
+        with self._lock:
+            self._entries -= len(keys)
+            self._size_bytes -= sum(sizes)
+        rows = [(key,) for key in keys]
+        conn.executemany("DELETE FROM responses WHERE key = ?", rows)
+        conn.executemany("DELETE FROM signatures WHERE key = ?", rows)
+        conn.executemany("DELETE FROM buckets WHERE key = ?", rows)
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key: str) -> Optional[str]:
+        """Réponse en cache (None si absente ou expirée)"""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT response, expires_at, size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] is not None and row[1] <= now:
+                self._forget(conn, [key], [row[2]])
+                self._count("expired")
+                row = None
+            if row is None:
+                self._count("misses")
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self._count("hits")
+        return row[0]
+
+    def put(
+        self,
+        key: str,
+        provider: str,
+        model_name: str,
+        response: str,
+        ttl_seconds: Optional[float] = None
+    ):
+        """Enregistre une réponse puis évince les moins récemment utilisées au-delà de la taille maximale"""
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, model_name, response, size, now, now + ttl if ttl else None, now)
+            )
+            # Relevé exact dans la transaction (la base peut être partagée avec d'autres processus)
+            entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            with self._lock:
+                self._entries, self._size_bytes = entries, total
+            if total > self.max_bytes:
+                evicted, sizes = [], []
+                for old_key, old_size in conn.execute(
+                    "SELECT key, size FROM responses WHERE key != ? ORDER BY accessed_at", (key,)
+                ):
+                    if total <= self.max_bytes:
+                        break
+                    evicted.append(old_key)
+                    sizes.append(old_size)
+                    total -= old_size
+                self._forget(conn, evicted, sizes)
+                with self._lock:
+                    self.evictions += len(evicted)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            # Compteurs d'occupation relus à la prochaine connexion
+            self._ready = False
+            raise
+        finally:
+            conn.close()
+
+    def index_similar(self, key: str, namespace: str, signature: bytes):
+        """Rend une réponse enregistrée retrouvable par similarité dans son espace de noms"""
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("INSERT OR REPLACE INTO signatures VALUES (?, ?)", (key, signature))
+            conn.execute("DELETE FROM buckets WHERE key = ?", (key,))
+            conn.executemany(
+                "INSERT INTO buckets VALUES (?, ?, ?)",
+                [(namespace, bucket, key) for bucket in lsh_buckets(signature)]
+            )
+            conn.execute("COMMIT")
+
+    def find_similar(self, namespace: str, signature: bytes, threshold: float) -> Optional[str]:
+        """Réponse au prompt le plus proche de l'espace de noms (None sous le seuil de similarité)"""
+        buckets = lsh_buckets(signature)
+        placeholders = ", ".join("?" for _ in buckets)
+        now = time.time()
+        with closing(self._connect()) as conn:
+            candidates = conn.execute(
+                f"""
+                SELECT DISTINCT s.key, s.signature, r.expires_at FROM buckets b
+                JOIN signatures s ON s.key = b.key
+                JOIN responses r ON r.key = b.key
+                WHERE b.namespace = ? AND b.bucket IN ({placeholders})
+                """,
+                (namespace, *buckets)
+            ).fetchall()
+
+            best_key, best_similarity = None, threshold
+            for key, candidate, expires_at in candidates:
+                if expires_at is not None and expires_at <= now:
+                    continue
+                similarity = estimate_similarity(signature, candidate)
+                if similarity >= best_similarity:
+                    best_key, best_similarity = key, similarity
+            if best_key is None:
+                return None
+
+            row = conn.execute("SELECT response FROM responses WHERE key = ?", (best_key,)).fetchone()
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, best_key))
+        self._count("similar_hits")
+        logger.debug(f"Prompt proche trouvé dans le cache (similarité {best_similarity:.2f})")
+        return row[0]
+
+    def clear(self) -> int:
+        """Vide le cache et retourne le nombre de réponses supprimées"""
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM signatures")
+            conn.execute("DELETE FROM buckets")
+            cursor = conn.execute("DELETE FROM responses")
+        with self._lock:
+            self._entries, self._size_bytes = 0, 0
+        logger.info(f"{cursor.rowcount} réponses de modèles supprimées du cache")
+        return cursor.rowcount
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retourne le taux de succès et l'occupation du cache (sans accès disque)"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "similar_hit_rate": self.similar_hits / lookups if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "entries": self._entries,
+            "size_bytes": self._size_bytes,
+            "max_bytes": self.max_bytes
+        }
+
+
+class CachedModel(BaseModel):
+    """Modèle dont les réponses sont servies depuis le cache persistant quand c'est possible
+
+    Les appels à température > 0 contournent le cache, sauf si settings.model_cache_sampled est activé.
+    Un appel peut forcer le comportement avec use_cache=True/False et fixer sa durée de vie avec cache_ttl.
+    Avec cache_scope (type d'agent) et un seuil configuré pour ce type, la réponse à un prompt
+    quasi identique (similarité MinHash) est réutilisée. cache_similarity_text restreint la signature
+    à la partie variable du prompt (sans le gabarit commun à tous les appels de l'agent) et
+    cache_similarity_key doit correspondre exactement (par exemple la demande de l'utilisateur).
+    """
+
+    def __init__(self, model: BaseModel, cache: ResponseCache, provider: str):
+        super().__init__(api_key=model.api_key, model_name=model.model_name)
+        self.model = model
+        self.cache = cache
+        self.provider = provider
+
+    def __getattr__(self, name: str):
+        # get_model_info, get_usage... restent ceux du modèle enveloppé
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    @staticmethod
+    def _similarity_threshold(scope: Optional[str]) -> Optional[float]:
+        """Seuil de similarité du type d'agent (None: correspondances exactes seulement)"""
+        if not settings.model_similarity_cache or scope is None:
+            return None
+        threshold = settings.model_similarity_thresholds.get(scope)
+        if threshold is None or not similarity_available():
+            return None
+        return threshold
+
+    @staticmethod
+    def _prompt_text(prompt: Any) -> str:
+        if isinstance(prompt, str):
+            return prompt
+        return "\n".join(str(message.get("content", "")) for message in prompt)
+
+    async def generate(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        **kwargs
+    ) -> str:
+        """Génère une réponse à partir d'un prompt"""
+        return await self._cached("generate", prompt, temperature, max_tokens, kwargs)
+
+    async def generate_with_history(
+        self,
+        messages: list,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        **kwargs
+    ) -> str:
+        """Génère une réponse à partir d'un historique de messages"""
+        return await self._cached("generate_with_history", messages, temperature, max_tokens, kwargs)
+
+    async def _cached(
+        self,
+        method: str,
+        prompt: Any,
+        temperature: float,
+        max_tokens: int,
+        kwargs: Dict[str, Any]
+    ) -> str:
+        use_cache = kwargs.pop("use_cache", None)
+        ttl_seconds = kwargs.pop("cache_ttl", None)
+        scope = kwargs.pop("cache_scope", None)
+        similarity_key = kwargs.pop("cache_similarity_key", None)
+        similarity_text = kwargs.pop("cache_similarity_text", None)
+        call = getattr(self.model, method)
+        threshold = self._similarity_threshold(scope) if use_cache is not False else None
+        if use_cache is None:
+            # Un seuil de similarité configuré pour le type d'agent vaut accord pour réutiliser ses réponses
+            use_cache = temperature <= 0 or settings.model_cache_sampled or threshold is not None
+        if not use_cache:
+            self.cache._count("bypassed")
+            return await call(prompt, temperature=temperature, max_tokens=max_tokens, **kwargs)
+
+        key = ResponseCache.make_key(
+            self.provider, self.model_name, [method, prompt], temperature, max_tokens, kwargs
+        )
+        namespace, signature = None, None
+        try:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is None and threshold is not None:
+                namespace = ResponseCache.make_key(
+                    self.provider, self.model_name, [method, scope, similarity_key], None, max_tokens, kwargs
+                )
+                text = similarity_text if similarity_text is not None else self._prompt_text(prompt)
+                signature = await asyncio.to_thread(minhash_signature, text)
+                cached = await asyncio.to_thread(self.cache.find_similar, namespace, signature, threshold)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache des réponses indisponible: {e}")
+            cached = None
+        if cached is not None:
+            logger.debug(f"Réponse de {self.model_name} servie depuis le cache")
+            return cached
+
+        response = await call(prompt, temperature=temperature, max_tokens=max_tokens, **kwargs)
+        if response:
+            try:
+                await asyncio.to_thread(
+                    self.cache.put, key, self.provider, self.model_name, response, ttl_seconds
+                )
+                if signature is not None:
+                    await asyncio.to_thread(self.cache.index_similar, key, namespace, signature)
+            except sqlite3.Error as e:
+                logger.warning(f"Réponse de {self.model_name} non mise en cache: {e}")
+        return response
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Cache partagé des réponses des modèles (None s'il est désactivé)"""
+    global _response_cache
+    if not settings.model_cache_enabled:
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            settings.model_cache_path, settings.model_cache_max_bytes, settings.model_cache_ttl
+        )
+    return _response_cache
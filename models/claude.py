@@ -1,6 +1,7 @@
 """
 Intégration avec Anthropic Claude
 """
+import time
 from typing import Optional, Dict, Any, List
 from loguru import logger
 
@@ -39,6 +40,7 @@ class ClaudeModel(BaseModel):
         **kwargs
     ) -> str:
         """Génère une réponse à partir d'un prompt"""
+        started = time.monotonic()
         try:
             message = await self.client.messages.create(
                 model=self.model_name,
@@ -47,12 +49,16 @@ class ClaudeModel(BaseModel):
                 messages=[{
                     "role": "user",
                     "content": prompt
-                }]
+                }],
+                **self._request_timeout()
             )
             
-            return message.content[0].text
+            text = message.content[0].text
+            self._publish_call("generate", started, len(prompt), len(text or ""))
+            return text
         
         except Exception as e:
+            self._publish_call("generate", started, len(prompt), error=str(e))
             logger.error(f"Erreur lors de la génération Claude: {e}")
             raise
     
@@ -64,6 +70,8 @@ class ClaudeModel(BaseModel):
         **kwargs
     ) -> str:
         """Génère une réponse à partir d'un historique de messages"""
+        started = time.monotonic()
+        prompt_chars = sum(len(m["content"]) for m in messages)
         try:
             # Convertir les messages au format Claude
             claude_messages = []
@@ -83,12 +91,16 @@ class ClaudeModel(BaseModel):
                 model=self.model_name,
                 max_tokens=max_tokens,
                 temperature=temperature,
-                messages=claude_messages
+                messages=claude_messages,
+                **self._request_timeout()
             )
             
-            return message.content[0].text
+            text = message.content[0].text
+            self._publish_call("generate_with_history", started, prompt_chars, len(text or ""))
+            return text
         
         except Exception as e:
+            self._publish_call("generate_with_history", started, prompt_chars, error=str(e))
             logger.error(f"Erreur lors de la génération avec historique Claude: {e}")
             raise
     
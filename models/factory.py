@@ -7,6 +7,7 @@ from .base import BaseModel
 from .gemini import GeminiModel
 from .claude import ClaudeModel
 from .openai import OpenAIModel
+from .cache import CachedModel, get_response_cache
 
 
 class ModelFactory:
@@ -43,7 +44,14 @@ class ModelFactory:
         
         final_model_name = model_name or default_names[model_type]
         
-        return model_class(api_key=api_key, model_name=final_model_name)
+        model = model_class(api_key=api_key, model_name=final_model_name)
+        
+        # Réponses rejouées depuis le cache persistant (reprise, relance d'une tâche)
+        response_cache = get_response_cache()
+        if response_cache is not None:
+            model = CachedModel(model, response_cache, provider=model_type)
+        
+        return model
     
     @classmethod
     def create_from_config(cls, config: Dict[str, Any]) -> BaseModel:
@@ -1,6 +1,7 @@
 """
 Intégration avec Google Gemini
 """
+import time
 from typing import Optional, Dict, Any, List
 from loguru import logger
 
@@ -44,6 +45,7 @@ class GeminiModel(BaseModel):
         **kwargs
     ) -> str:
         """Génère une réponse à partir d'un prompt"""
+        started = time.monotonic()
         try:
             generation_config = genai.types.GenerationConfig(
                 temperature=temperature,
@@ -52,12 +54,16 @@ class GeminiModel(BaseModel):
             
             response = await self.client.generate_content_async(
                 prompt,
-                generation_config=generation_config
+                generation_config=generation_config,
+                request_options=self._request_timeout()
             )
             
-            return response.text
+            text = response.text
+            self._publish_call("generate", started, len(prompt), len(text or ""))
+            return text
         
         except Exception as e:
+            self._publish_call("generate", started, len(prompt), error=str(e))
             logger.error(f"Erreur lors de la génération Gemini: {e}")
             raise
     
@@ -69,6 +75,8 @@ class GeminiModel(BaseModel):
         **kwargs
     ) -> str:
         """Génère une réponse à partir d'un historique de messages"""
+        started = time.monotonic()
+        prompt_chars = sum(len(m["content"]) for m in messages)
         try:
             generation_config = genai.types.GenerationConfig(
                 temperature=temperature,
@@ -78,12 +86,16 @@ class GeminiModel(BaseModel):
             chat = self.client.start_chat(history=messages)
             response = await chat.send_message_async(
                 messages[-1]["content"],
-                generation_config=generation_config
+                generation_config=generation_config,
+                request_options=self._request_timeout()
             )
             
-            return response.text
+            text = response.text
+            self._publish_call("generate_with_history", started, prompt_chars, len(text or ""))
+            return text
         
         except Exception as e:
+            self._publish_call("generate_with_history", started, prompt_chars, error=str(e))
             logger.error(f"Erreur lors de la génération avec historique Gemini: {e}")
             raise
     
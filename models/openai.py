@@ -1,6 +1,7 @@
 """
 Intégration avec OpenAI
 """
+import time
 from typing import Optional, Dict, Any, List
 from loguru import logger
 
@@ -39,6 +40,7 @@ class OpenAIModel(BaseModel):
         **kwargs
     ) -> str:
         """Génère une réponse à partir d'un prompt"""
+        started = time.monotonic()
         try:
             response = await self.client.chat.completions.create(
                 model=self.model_name,
@@ -47,12 +49,16 @@ class OpenAIModel(BaseModel):
                     "content": prompt
                 }],
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                **self._request_timeout()
             )
             
-            return response.choices[0].message.content
+            text = response.choices[0].message.content
+            self._publish_call("generate", started, len(prompt), len(text or ""))
+            return text
         
         except Exception as e:
+            self._publish_call("generate", started, len(prompt), error=str(e))
             logger.error(f"Erreur lors de la génération OpenAI: {e}")
             raise
     
@@ -64,17 +70,23 @@ class OpenAIModel(BaseModel):
         **kwargs
     ) -> str:
         """Génère une réponse à partir d'un historique de messages"""
+        started = time.monotonic()
+        prompt_chars = sum(len(m["content"]) for m in messages)
         try:
             response = await self.client.chat.completions.create(
                 model=self.model_name,
                 messages=messages,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                **self._request_timeout()
             )
             
-            return response.choices[0].message.content
+            text = response.choices[0].message.content
+            self._publish_call("generate_with_history", started, prompt_chars, len(text or ""))
+            return text
         
         except Exception as e:
+            self._publish_call("generate_with_history", started, prompt_chars, error=str(e))
             logger.error(f"Erreur lors de la génération avec historique OpenAI: {e}")
             raise
     
@@ -0,0 +1,84 @@
+"""
+Signatures MinHash des prompts et buckets LSH pour retrouver les prompts quasi identiques
+"""
+import hashlib
+import re
+from typing import List, Optional
+from loguru import logger
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# 128 permutations en 32 bandes de 4 lignes: deux prompts similaires à ~0.8 partagent
+# une bande avec une probabilité > 0.99, à ~0.3 avec une probabilité < 0.25
+NUM_PERMUTATIONS = 128
+BANDS = 32
+SHINGLE_WORDS = 3
+
+_PRIME = 4294967311  # premier nombre premier > 2^32
+_WORD = re.compile(r"\w+")
+_permutations = None
+_warned = False
+
+
+def similarity_available() -> bool:
+    """Le calcul des signatures nécessite numpy (paquet optionnel)"""
+    global _warned
+    if np is None and not _warned:
+        logger.warning("Cache par similarité demandé mais numpy est absent: correspondances exactes seulement")
+        _warned = True
+    return np is not None
+
+
+def _get_permutations():
+    global _permutations
+    if _permutations is None:
+        # Graine fixe: les signatures stockées restent comparables d'une exécution à l'autre
+        random = np.random.RandomState(1)
+        _permutations = (
+            random.randint(1, 2 ** 31, NUM_PERMUTATIONS, dtype=np.uint64),
+            random.randint(0, 2 ** 31, NUM_PERMUTATIONS, dtype=np.uint64)
+        )
+    return _permutations
+
+
+def _shingles(text: str) -> List[bytes]:
+    """Groupes de mots consécutifs (casse ignorée)"""
+    words = _WORD.findall(text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return [" ".join(words).encode("utf-8")]
+    return list({
+        " ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8")
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    })
+
+
+def minhash_signature(text: str) -> Optional[bytes]:
+    """Signature MinHash d'un texte (None sans numpy)"""
+    if not similarity_available():
+        return None
+    hashes = np.frombuffer(
+        b"".join(hashlib.blake2b(shingle, digest_size=4).digest() for shingle in _shingles(text)),
+        dtype="<u4"
+    ).astype(np.uint64)
+    a, b = _get_permutations()
+    # (a * h + b) mod p pour chaque permutation et chaque shingle, minimum par permutation
+    permuted = (np.outer(hashes, a) + b) % _PRIME
+    return permuted.min(axis=0).astype("<u8").tobytes()
+
+
+def lsh_buckets(signature: bytes) -> List[str]:
+    """Buckets LSH de la signature (un par bande)"""
+    rows = NUM_PERMUTATIONS // BANDS * 8
+    return [
+        f"{band}:{hashlib.blake2b(signature[band * rows:(band + 1) * rows], digest_size=8).hexdigest()}"
+        for band in range(BANDS)
+    ]
+
+
+def estimate_similarity(first: bytes, second: bytes) -> float:
+    """Estimation de la similarité de Jaccard entre deux signatures"""
+    return float(np.mean(np.frombuffer(first, dtype="<u8") == np.frombuffer(second, dtype="<u8")))
@@ -3,14 +3,21 @@ Gestionnaire de cache pour les tâches et conversations
 """
 from typing import Dict, List, Optional, Any
 from pathlib import Path
+import asyncio
 import shutil
 import json
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from loguru import logger
 
 from .dashboard import CacheEntry
 
+try:
+    from ..core.events import EventBus, EventType, event_bus
+except ImportError:
+    from core.events import EventBus, EventType, event_bus
+
 
 @dataclass
 class CacheConfig:
@@ -26,23 +33,53 @@ class CacheConfig:
 class CacheManager:
     """Gestionnaire de cache pour les tâches et conversations"""
     
-    def __init__(self, cache_dir: Path, config: Optional[CacheConfig] = None):
+    def __init__(
+        self,
+        cache_dir: Path,
+        config: Optional[CacheConfig] = None,
+        events: Optional[EventBus] = None,
+        background_load: bool = False
+    ):
         self.cache_dir = cache_dir
         self.config = config or CacheConfig()
+        self.events = events or event_bus
         
-        # Créer le répertoire de cache
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Index des entrées de cache (voir la propriété cache_index)
+        self._cache_index: Dict[str, CacheEntry] = {}
+        self._index_ready = threading.Event()
         
-        # Index des entrées de cache
-        self.cache_index: Dict[str, CacheEntry] = {}
-        
-        # Initialiser l'index
-        self._load_index()
+        # Initialiser l'index, éventuellement sans bloquer le démarrage
+        if background_load:
+            threading.Thread(target=self._load_index_in_background, name="cache-index", daemon=True).start()
+        else:
+            self._load_index()
+            self._index_ready.set()
         
         logger.info(f"CacheManager initialisé: {self.cache_dir}")
     
+    @property
+    def cache_index(self) -> Dict[str, CacheEntry]:
+        """Index des entrées de cache (attend la fin d'un chargement en arrière-plan)
+
+        Bloquant: depuis la boucle d'événements, attendre d'abord wait_until_loaded()
+        """
+        self._index_ready.wait()
+        return self._cache_index
+    
+    async def wait_until_loaded(self):
+        """Attend la fin du chargement de l'index sans bloquer la boucle d'événements"""
+        if not self._index_ready.is_set():
+            await asyncio.to_thread(self._index_ready.wait)
+    
+    def _load_index_in_background(self):
+        try:
+            self._load_index()
+        finally:
+            self._index_ready.set()
+    
     def _load_index(self):
-        """Charge l'index depuis le fichier"""
+        """Crée le répertoire de cache et charge l'index depuis le fichier"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
         index_file = self.cache_dir / "cache_index.json"
         
         if index_file.exists():
@@ -51,7 +88,7 @@ class CacheManager:
                     data = json.load(f)
                 
                 for task_id, entry_data in data.items():
-                    self.cache_index[task_id] = CacheEntry(
+                    self._cache_index[task_id] = CacheEntry(
                         task_id=task_id,
                         agent_type=entry_data.get("agent_type", ""),
                         file_count=entry_data.get("file_count", 0),
@@ -60,7 +97,7 @@ class CacheManager:
                         preview=entry_data.get("preview")
                     )
                 
-                logger.info(f"Index de cache chargé: {len(self.cache_index)} entrées")
+                logger.info(f"Index de cache chargé: {len(self._cache_index)} entrées")
             except Exception as e:
                 logger.error(f"Erreur lors du chargement de l'index: {e}")
     
@@ -160,8 +197,14 @@ class CacheManager:
                 shutil.rmtree(task_dir)
             
             # Supprimer de l'index
-            del self.cache_index[task_id]
+            entry = self.cache_index.pop(task_id)
             self._save_index()
+            self.events.publish(
+                EventType.CACHE_EVICTED,
+                task_id=task_id,
+                agent_type=entry.agent_type,
+                size=entry.total_size
+            )
             
             logger.info(f"Entrée de cache supprimée: {task_id}")
             return True
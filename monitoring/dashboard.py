@@ -121,6 +121,15 @@ class MonitoringDashboard:
         # Historique d'utilisation
         self.usage_history: List[UsageHistory] = []
         
+        # Pools de workers par type d'agent (objets exposant get_statistics())
+        self.agent_pools: Dict[str, Any] = {}
+        
+        # Cache persistant des réponses des modèles (objet exposant get_statistics())
+        self.response_cache: Optional[Any] = None
+        
+        # Fonctions de désabonnement du bus d'événements (voir detach_event_bus)
+        self._unsubscribers: List[Any] = []
+        
         # Configuration
         self.warning_threshold = 30.0  # 30%
         self.critical_threshold = 10.0  # 10%
@@ -152,6 +161,62 @@ class MonitoringDashboard:
             )
             logger.info(f"Modèle {model_name} ({family.value}) enregistré pour le suivi quotas")
     
+    def register_agent_pool(self, agent_type: str, pool: Any):
+        """Enregistre le pool de workers d'un type d'agent"""
+        self.agent_pools[agent_type] = pool
+    
+    def register_response_cache(self, cache: Any):
+        """Enregistre le cache des réponses des modèles (taux de succès affiché avec le cache)"""
+        self.response_cache = cache
+    
+    def attach_event_bus(self, bus):
+        """Met à jour le dashboard à partir des événements publiés plutôt que par polling"""
+        try:
+            from ..core.events import EventType
+        except ImportError:
+            from core.events import EventType
+        
+        handlers = {
+            EventType.TASK_STARTED: self._on_task_started,
+            EventType.TASK_COMPLETED: lambda event: self._on_task_finished(event, success=True),
+            EventType.TASK_FAILED: lambda event: self._on_task_finished(event, success=False),
+            EventType.TASK_CANCELLED: lambda event: self._on_task_finished(event, success=None),
+            EventType.MODEL_CALL: self._on_model_call,
+            EventType.CACHE_EVICTED: self._on_cache_evicted,
+        }
+        self._unsubscribers.append(bus.subscribe(lambda event: handlers[event.type](event), handlers.keys()))
+    
+    def detach_event_bus(self):
+        """Se désabonne des bus d'événements (le dashboard ne reçoit plus rien)"""
+        for unsubscribe in self._unsubscribers:
+            unsubscribe()
+        self._unsubscribers = []
+    
+    def _on_task_started(self, event):
+        self.update_agent_status(event.data["agent"], "processing", current_task=event.data["task_id"])
+    
+    def _on_task_finished(self, event, success: Optional[bool]):
+        agent_name = event.data["agent"]
+        if not event.data.get("started"):
+            return
+        if success is not None:
+            self.increment_agent_tasks(agent_name, success=success)
+        if agent_name in self.agents_status:
+            agent_status = self.agents_status[agent_name]
+            agent_status.current_task = None
+            agent_status.status = "error" if event.data.get("error") else "idle"
+            agent_status.error_message = event.data.get("error")
+            agent_status.last_activity = datetime.now()
+    
+    def _on_model_call(self, event):
+        usage = self.models_usage.get(event.data["model"])
+        if usage:
+            usage.requests_count += 1
+            usage.last_used = event.timestamp
+    
+    def _on_cache_evicted(self, event):
+        self.cache_entries.pop(event.data["task_id"], None)
+    
     def update_agent_status(
         self,
         agent_name: str,
@@ -319,7 +384,11 @@ class MonitoringDashboard:
             "idle_agents": 0,
             "total_tasks_completed": 0,
             "total_tasks_failed": 0,
-            "total_tasks": 0
+            "total_tasks": 0,
+            "pools": {
+                agent_type: pool.get_statistics()
+                for agent_type, pool in self.agent_pools.items()
+            }
         }
         
         for agent_name, status in self.agents_status.items():
@@ -333,7 +402,8 @@ class MonitoringDashboard:
                 "success_rate": status.success_rate,
                 "last_activity": status.last_activity.isoformat() if status.last_activity else None,
                 "current_task": status.current_task,
-                "error_message": status.error_message
+                "error_message": status.error_message,
+                "pool": summary["pools"].get(status.agent_type)
             }
             
             summary["agents"].append(agent_info)
@@ -379,7 +449,8 @@ class MonitoringDashboard:
                     "files": data["files"]
                 }
                 for agent_type, data in by_agent_type.items()
-            }
+            },
+            "model_responses": self.response_cache.get_statistics() if self.response_cache else None
         }
     
     def get_usage_trends(self, minutes: int = 90) -> Dict[str, Any]:
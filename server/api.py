@@ -7,7 +7,6 @@ import os
 import asyncio
 import httpx
 from typing import Optional, Dict, List, Any
-from datetime import datetime
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -25,15 +24,19 @@ if root_dir not in sys.path:
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 import psutil
 import traceback
+import json
 
 # Imports du Framework
 try:
     from core.orchestrator import Orchestrator
     from core.context import AgentType
+    from core.api_client import open_http_client, close_http_client
+    from core.workspace import probe_workspace_backend
     from agents.planner import PlannerAgent
     from agents.coder import CoderAgent
     from agents.reviewer import ReviewerAgent
@@ -417,7 +420,13 @@ async def startup_event():
     global orchestrator
     if FRAMEWORK_AVAILABLE:
         print("[AUTO-ANTIGRAVITY] Initialisation de l'Orchestrator...")
+        # Pool de connexions partagé par l'orchestrateur et tous les agents
+        await open_http_client()
         orchestrator = Orchestrator(enable_monitoring=True)
+        # Lance le chargement de l'index du cache en arrière-plan pendant la création des agents
+        orchestrator.start_background_loads()
+        # Sonde unique: toutes les E/S des agents passent ensuite par le backend retenu
+        await probe_workspace_backend(orchestrator.api_client)
         
         gemini_key = os.getenv("GEMINI_API_KEY", "")
         anthropic_key = os.getenv("ANTHROPIC_API_KEY", "")
@@ -456,6 +465,7 @@ async def startup_event():
             orchestrator.register_agent(AgentType.CODER, coder)
             orchestrator.register_agent(AgentType.REVIEWER, reviewer)
             orchestrator.register_agent(AgentType.TESTER, tester)
+            orchestrator.start_workers()
             
             print("[AUTO-ANTIGRAVITY] Agents initialises (mode potentiellement dégradé).")
             asyncio.create_task(fetch_external_quotas())
@@ -464,12 +474,23 @@ async def startup_event():
             print(f"[ERROR] Erreur lors de l'initialisation des agents: {e}")
             traceback.print_exc()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    if orchestrator:
+        orchestrator.shutdown()
+    if FRAMEWORK_AVAILABLE:
+        await close_http_client()
+
 @app.get("/api/dashboard")
-async def get_dashboard():
+async def get_dashboard(since: Optional[int] = None, run_id: Optional[str] = None):
     if not orchestrator:
         return {"error": "Orchestrator non initialise"}
     
-    data = orchestrator.get_dashboard_data()
+    await orchestrator.wait_for_cache()
+    
+    # ?since=<context_version>: seules les tâches et l'historique modifiés depuis cette version
+    # ?run_id=<id>: contexte de cette exécution (par défaut la plus récente encore active)
+    data = orchestrator.get_dashboard_data(since=since, run_id=run_id)
     agents_summary = data.get("agents_summary", {})
     agents_list = agents_summary.get("agents", [])
     
@@ -492,7 +513,7 @@ async def get_dashboard():
     except Exception as e:
         print(f"[WARN] Impossible de rafraîchir les quotas: {e}")
 
-    return {
+    response = {
         "agents": {
             "total_agents": agents_summary.get("total_agents", 0),
             "agents": agents_list
@@ -506,8 +527,13 @@ async def get_dashboard():
             "total_size_mb": cache_summary.get("total_size_mb", 0),
             "entries": cache_entries
         },
-        "auto_accept": auto_accept_data
+        "auto_accept": auto_accept_data,
+        "context_version": data.get("context_version")
     }
+    if since is not None:
+        response["tasks"] = data.get("tasks", [])
+        response["context_delta"] = data.get("context_delta")
+    return response
 
 @app.get("/api/dashboard/quota")
 async def get_quota_summary():
@@ -544,6 +570,7 @@ async def restart_agent(agent_name: str):
 @app.get("/api/cache")
 async def get_cache():
     if not orchestrator: return {}
+    await orchestrator.wait_for_cache()
     summary = orchestrator.get_cache_summary()
     entries = orchestrator.get_cache_entries()
     return {"total_entries": summary.get("total_entries", 0), "total_size_mb": summary.get("total_size_mb", 0), "entries": entries}
@@ -551,12 +578,14 @@ async def get_cache():
 @app.delete("/api/cache")
 async def clear_cache():
     if not orchestrator: return {"cleared": 0}
+    await orchestrator.wait_for_cache()
     count = orchestrator.clear_cache()
     return {"message": f"{count} entrées supprimées", "cleared": count}
 
 @app.post("/api/cache/auto-clean")
 async def auto_clean_cache():
     if not orchestrator: return {"cleaned": 0}
+    await orchestrator.wait_for_cache()
     count = orchestrator.auto_clean_cache()
     return {"message": f"{count} entrées nettoyées", "cleaned": count}
 
@@ -596,18 +625,89 @@ async def execute_task(task: TaskRequest, background_tasks: BackgroundTasks):
             project_description="Task from VS Code Extension"
         )
     
-    task_id = f"task_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-    background_tasks.add_task(run_orchestrator_task, task.description)
-    return {"task_id": task_id, "status": "started", "message": "Tache demarrée en arrière-plan"}
-
-async def run_orchestrator_task(description: str):
-    print(f"[TASK] Demarrage de la tache: {description}")
+    # Chaque requête obtient son propre contexte et son propre run
+    context = orchestrator.new_run_context(project_path=task.project_path)
+    run = orchestrator.submit_task(task.description, context)
+    background_tasks.add_task(watch_orchestrator_task, run.run_id)
+    return {"task_id": run.run_id, "status": "started", "message": "Tache demarrée en arrière-plan"}
+
+async def watch_orchestrator_task(run_id: str):
+    run = orchestrator.get_run(run_id)
+    print(f"[TASK] Demarrage de la tache {run_id}: {run.description}")
     try:
-        await orchestrator.execute_task(description)
+        result = await run.handle
+        if result.get("success"):
+            print(f"[TASK] Tache terminee: {run_id}")
+        else:
+            print(f"[TASK] Erreur tache {run_id}: {result.get('error')}")
         await fetch_external_quotas()
-        print(f"[TASK] Tache terminee: {description}")
     except Exception as e:
-        print(f"[TASK] Erreur tache: {e}")
+        print(f"[TASK] Erreur tache {run_id}: {e}")
+
+@app.get("/api/tasks")
+async def list_tasks(active_only: bool = False):
+    if not orchestrator: return {"tasks": []}
+    return {"tasks": [run.to_dict() for run in orchestrator.list_runs(active_only)]}
+
+@app.post("/api/task/{run_id}/resume")
+async def resume_task(run_id: str, background_tasks: BackgroundTasks):
+    if not orchestrator:
+        raise HTTPException(status_code=503, detail="Orchestrateur non prêt")
+    try:
+        run = orchestrator.resume_run(run_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    background_tasks.add_task(watch_orchestrator_task, run.run_id)
+    return {"task_id": run.run_id, "status": "resumed", "message": "Tache reprise depuis son checkpoint"}
+
+@app.post("/api/task/{run_id}/cancel")
+async def cancel_task(run_id: str, subtask_id: Optional[str] = None):
+    if not orchestrator:
+        raise HTTPException(status_code=503, detail="Orchestrateur non prêt")
+    if subtask_id:
+        cancelled = orchestrator.cancel_task(run_id, subtask_id)
+    else:
+        cancelled = orchestrator.cancel_run(run_id)
+    if not cancelled:
+        raise HTTPException(status_code=409, detail="Rien a annuler (tache terminee ou introuvable)")
+    return {"task_id": run_id, "subtask_id": subtask_id, "status": "cancelling"}
+
+@app.get("/api/task/{run_id}")
+async def get_task(run_id: str, include_context: bool = True):
+    if not orchestrator:
+        raise HTTPException(status_code=503, detail="Orchestrateur non prêt")
+    run = orchestrator.get_run(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail=f"Tache {run_id} introuvable")
+    return run.to_dict(include_context=include_context)
+
+@app.get("/api/task/{run_id}/history")
+async def get_task_history(run_id: str, kind: str = "messages", offset: int = 0, limit: int = 100):
+    if not orchestrator:
+        raise HTTPException(status_code=503, detail="Orchestrateur non prêt")
+    run = orchestrator.get_run(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail=f"Tache {run_id} introuvable")
+    if kind not in ("messages", "actions"):
+        raise HTTPException(status_code=400, detail="kind doit valoir 'messages' ou 'actions'")
+    log = run.context.messages if kind == "messages" else run.context.action_history
+    limit = max(0, min(limit, 1000))
+    return {"total": len(log), "offset": offset, "entries": log.read(max(0, offset), limit)}
+
+@app.get("/api/events")
+async def stream_events(run_id: Optional[str] = None):
+    """Flux Server-Sent Events des événements de l'orchestrateur et des agents"""
+    if not orchestrator:
+        raise HTTPException(status_code=503, detail="Orchestrateur non prêt")
+
+    async def event_source():
+        async for event in orchestrator.events.stream():
+            if run_id and event.run_id != run_id:
+                continue
+            payload = json.dumps(event.to_dict(), ensure_ascii=False, default=str)
+            yield f"event: {event.type.value}\ndata: {payload}\n\n"
+
+    return StreamingResponse(event_source(), media_type="text/event-stream")
 
 @app.get("/api/system/metrics")
 async def get_system_metrics():
@@ -0,0 +1,261 @@
+"""
+Tests pour le client API Antigravity
+"""
+import asyncio
+import httpx
+import pytest
+
+from auto_antigravity.core import api_client
+from auto_antigravity.core.api_client import AntigravityClient, get_http_client, close_http_client
+
+
+async def test_http_client_is_shared_per_loop():
+    """Un seul client HTTP est partagé jusqu'à sa fermeture"""
+    first = get_http_client()
+    assert get_http_client() is first
+    
+    await close_http_client()
+    assert first.is_closed
+    
+    second = get_http_client()
+    assert second is not first
+    await close_http_client()
+
+
+async def test_requests_reuse_the_shared_client(monkeypatch):
+    """Toutes les instances d'AntigravityClient passent par le même pool de connexions"""
+    seen = []
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.method, request.url.path))
+        return httpx.Response(200, json={"success": True, "content": "data"})
+    
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(api_client, "_http_client", shared)
+    monkeypatch.setattr(api_client, "_http_client_loop", asyncio.get_running_loop())
+    
+    assert await AntigravityClient(api_url="http://ide").write_file("a.py", "x") is True
+    assert await AntigravityClient(api_url="http://ide").read_file("a.py") == "data"
+    
+    assert seen == [("POST", "/files/write"), ("GET", "/files/read")]
+    assert get_http_client() is shared
+    await close_http_client()
+
+
+async def test_batch_operations_fall_back_to_parallel_requests(monkeypatch):
+    """Sans endpoint batch, les opérations groupées passent par des requêtes unitaires parallèles"""
+    seen = []
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        if request.url.path.startswith("/files/batch"):
+            return httpx.Response(404)
+        if request.url.path == "/files/read":
+            path = request.url.params["path"]
+            return httpx.Response(200, json={"content": f"<{path}>" if path != "missing.py" else ""})
+        return httpx.Response(200, json={"success": True})
+    
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(api_client, "_http_client", shared)
+    monkeypatch.setattr(api_client, "_http_client_loop", asyncio.get_running_loop())
+    client = AntigravityClient(api_url="http://ide")
+    
+    assert await client.write_files({"a.py": "x", "b.py": "y"}) == {"a.py": True, "b.py": True}
+    assert client.batch_supported is False
+    assert await client.read_files(["a.py", "missing.py"]) == {"a.py": "<a.py>"}
+    
+    # L'endpoint batch n'est sondé qu'une fois
+    assert seen.count("/files/batch/write") == 1
+    assert "/files/batch/read" not in seen
+    await close_http_client()
+
+
+async def test_batch_endpoint_is_used_when_supported(monkeypatch):
+    """Avec un endpoint batch, plusieurs fichiers coûtent un seul aller-retour"""
+    seen = []
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        return httpx.Response(200, json={"files": {"a.py": "1", "b.py": "2"}})
+    
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(api_client, "_http_client", shared)
+    monkeypatch.setattr(api_client, "_http_client_loop", asyncio.get_running_loop())
+    client = AntigravityClient(api_url="http://ide")
+    
+    assert await client.read_files(["a.py", "b.py"]) == {"a.py": "1", "b.py": "2"}
+    assert seen == ["/files/batch/read"]
+    assert client.batch_supported is True
+    await close_http_client()
+
+
+async def test_retries_then_circuit_breaker_short_circuits(monkeypatch):
+    """Les appels idempotents sont rejoués, puis le disjoncteur coupe les appels suivants"""
+    from auto_antigravity.config import settings
+    from auto_antigravity.core.api_client import AntigravityUnavailableError
+    
+    attempts = []
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request.url.path)
+        raise httpx.ConnectError("connexion refusée", request=request)
+    
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(api_client, "_http_client", shared)
+    monkeypatch.setattr(api_client, "_http_client_loop", asyncio.get_running_loop())
+    monkeypatch.setattr(api_client, "_breakers", {})
+    monkeypatch.setattr(settings, "max_retries", 2)
+    monkeypatch.setattr(settings, "retry_backoff_base", 0.0)
+    monkeypatch.setattr(settings, "circuit_breaker_threshold", 4)
+    monkeypatch.setattr(settings, "circuit_breaker_cooldown", 60.0)
+    client = AntigravityClient(api_url="http://offline")
+    
+    with pytest.raises(api_client.AntigravityAPIError):
+        await client.read_file("a.py")
+    assert len(attempts) == 3
+    
+    # Non idempotent: une seule tentative
+    with pytest.raises(api_client.AntigravityAPIError):
+        await client.execute_command("ls")
+    assert len(attempts) == 4
+    assert client.breaker.state == "open"
+    
+    with pytest.raises(AntigravityUnavailableError):
+        await client.write_file("a.py", "x")
+    assert len(attempts) == 4
+    assert client.breaker.get_statistics()["short_circuited"] == 1
+    await close_http_client()
+
+
+async def test_non_json_probe_does_not_wedge_the_breaker(monkeypatch):
+    """Une réponse non JSON pendant la sonde referme le disjoncteur au lieu de le bloquer"""
+    from auto_antigravity.config import settings
+    
+    responses = iter([
+        httpx.ConnectError("connexion refusée"),
+        httpx.Response(200, text="OK"),
+        httpx.Response(200, json={"content": "x"}),
+    ])
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+    
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(api_client, "_http_client", shared)
+    monkeypatch.setattr(api_client, "_http_client_loop", asyncio.get_running_loop())
+    monkeypatch.setattr(api_client, "_breakers", {})
+    monkeypatch.setattr(settings, "max_retries", 0)
+    monkeypatch.setattr(settings, "circuit_breaker_threshold", 1)
+    monkeypatch.setattr(settings, "circuit_breaker_cooldown", 0.0)
+    client = AntigravityClient(api_url="http://probe")
+    
+    with pytest.raises(api_client.AntigravityAPIError):
+        await client.read_file("a.py")
+    with pytest.raises(api_client.AntigravityAPIError) as error:
+        await client.read_file("a.py")
+    assert error.value.status_code == 200
+    assert client.breaker.state == "closed"
+    assert await client.read_file("a.py") == "x"
+    await close_http_client()
+
+
+async def test_identical_concurrent_reads_share_one_request(monkeypatch):
+    """Des lectures identiques simultanées partagent une seule requête HTTP"""
+    calls = []
+    
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"content": request.url.params["path"]})
+    
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(api_client, "_http_client", shared)
+    monkeypatch.setattr(api_client, "_http_client_loop", asyncio.get_running_loop())
+    client = AntigravityClient(api_url="http://ide")
+    
+    cancelled = asyncio.ensure_future(client.read_file("a.py"))
+    readers = [client.read_file("a.py") for _ in range(3)] + [client.read_file("b.py")]
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    
+    results = await asyncio.gather(*readers)
+    
+    assert results == ["a.py", "a.py", "a.py", "b.py"]
+    assert len(calls) == 2
+    assert client.get_statistics()["coalesced_requests"] == 3
+    assert client.get_statistics()["in_flight"] == 0
+    await close_http_client()
+
+
+async def test_coalesced_callers_keep_their_own_deadline(monkeypatch):
+    """L'échéance courte du premier appelant ne fait pas échouer un appelant plus patient"""
+    from auto_antigravity.core.deadline import deadline_scope
+    calls = []
+    
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, json={"content": "ok"})
+    
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(api_client, "_http_client", shared)
+    monkeypatch.setattr(api_client, "_http_client_loop", asyncio.get_running_loop())
+    monkeypatch.setattr(api_client, "_breakers", {})
+    client = AntigravityClient(api_url="http://ide-deadlines")
+    
+    async def hurried():
+        with deadline_scope(0.05):
+            return await client.read_file("a.py")
+    
+    first = asyncio.ensure_future(hurried())
+    await asyncio.sleep(0)
+    patient = asyncio.ensure_future(client.read_file("a.py"))
+    
+    with pytest.raises(api_client.AntigravityAPIError):
+        await first
+    assert await patient == "ok"
+    assert len(calls) == 1
+    await close_http_client()
+
+
+async def test_command_stream_uses_the_ide_then_falls_back_locally(monkeypatch, tmp_path):
+    """Le flux terminal de l'IDE est lu ligne par ligne; sans support, la commande s'exécute localement"""
+    supported = True
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/terminal/execute/stream"
+        if not supported:
+            return httpx.Response(404)
+        lines = [
+            '{"stream": "stdout", "data": "compilation\\n"}',
+            '{"stream": "stderr", "data": "avertissement\\n"}',
+            '{"exit_code": 1}'
+        ]
+        return httpx.Response(200, content="\n".join(lines).encode())
+    
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(api_client, "_http_client", shared)
+    monkeypatch.setattr(api_client, "_http_client_loop", asyncio.get_running_loop())
+    monkeypatch.setattr(api_client, "_breakers", {})
+    client = AntigravityClient(api_url="http://ide-stream")
+    
+    chunks = [chunk async for chunk in client.execute_command_stream("make")]
+    assert [(c.stream, c.data) for c in chunks[:-1]] == [("stdout", "compilation\n"), ("stderr", "avertissement\n")]
+    assert chunks[-1].is_exit and chunks[-1].exit_code == 1
+    assert client.stream_supported is True
+    
+    supported = False
+    client = AntigravityClient(api_url="http://ide-stream")
+    chunks = [chunk async for chunk in client.execute_command_stream("pwd", cwd=str(tmp_path))]
+    assert chunks[0].data == f"{tmp_path}\n"
+    assert chunks[-1].exit_code == 0
+    assert client.stream_supported is False
+    
+    # Sans répertoire de projet, pas d'exécution dans le répertoire du serveur
+    with pytest.raises(api_client.AntigravityUnavailableError):
+        async for _ in client.execute_command_stream("pwd"):
+            pass
+    await close_http_client()
@@ -120,3 +120,137 @@ def test_get_tasks_for_agent():
     
     assert len(coder_tasks) == 1
     assert coder_tasks[0].assigned_agent == AgentType.CODER
+
+
+def test_task_store_indexes_follow_changes():
+    """Les index par statut et par agent suivent les changements des tâches"""
+    context = Context(
+        project_path="/test/path",
+        project_name="TestProject",
+        project_description="A test project"
+    )
+    context.tasks["1"] = Task(id="1", description="a", assigned_agent=AgentType.CODER)
+    context.tasks["2"] = Task(id="2", description="b", assigned_agent=AgentType.TESTER)
+    
+    context.update_task_status("1", TaskStatus.IN_PROGRESS)
+    context.tasks["2"].assigned_agent = AgentType.CODER
+    
+    assert [t.id for t in context.get_tasks_for_agent(AgentType.CODER)] == ["2"]
+    assert context.get_tasks_for_agent(AgentType.TESTER) == []
+    assert [t.id for t in context.tasks.by_status(TaskStatus.IN_PROGRESS)] == ["1"]
+    assert len(context.tasks.by_agent(AgentType.CODER)) == 2
+    
+    del context.tasks["1"]
+    context.tasks["2"] = Task(id="2", description="c", status=TaskStatus.COMPLETED)
+    
+    assert context.tasks.count_by_status() == {"completed": 1}
+    assert context.get_pending_tasks() == []
+
+
+def test_task_round_trip():
+    """Une tâche compacte se sérialise et se reconstruit à l'identique"""
+    task = Task(id="t", description="d", dependencies=["a"], priority=2, assigned_agent=AgentType.CODER)
+    task.subtasks.append("s")
+    task.metadata["k"] = "v"
+    
+    restored = Task.from_dict(task.to_dict())
+    
+    assert restored == task
+    assert isinstance(restored.created_at, datetime)
+    assert not hasattr(task, "__dict__")
+
+
+def test_context_delta_since_version():
+    """to_delta ne renvoie que les tâches et l'historique modifiés depuis une version"""
+    context = Context(
+        project_path="/test/path",
+        project_name="TestProject",
+        project_description="A test project"
+    )
+    context.tasks["1"] = Task(id="1", description="a")
+    context.tasks["2"] = Task(id="2", description="b")
+    context.add_message("user", "hello")
+    since = context.version
+    
+    context.update_task_status("2", TaskStatus.COMPLETED, "ok")
+    context.add_message("assistant", "done")
+    context.add_action("write", {"file": "x.py"})
+    context.record_file_created("x.py")
+    del context.tasks["1"]
+    
+    delta = context.to_delta(since)
+    
+    assert delta["version"] == context.version > since
+    assert list(delta["tasks"]) == ["2"]
+    assert delta["tasks"]["2"]["result"] == "ok"
+    assert delta["removed_tasks"] == ["1"]
+    assert [m["content"] for m in delta["messages"]] == ["done"]
+    assert delta["messages_offset"] == 1
+    assert len(delta["action_history"]) == 1
+    assert delta["files_created"] == ["x.py"]
+    
+    unchanged = context.to_delta(context.version)
+    assert unchanged["tasks"] == {} and unchanged["messages"] == [] and unchanged["files_created"] == []
+    assert len(context.to_delta(0)["tasks"]) == 1
+
+
+def test_context_snapshot_is_immutable_and_shared():
+    """Les instantanés publiés sont figés et partagent les tâches inchangées"""
+    context = Context(
+        project_path="/test/path",
+        project_name="TestProject",
+        project_description="A test project"
+    )
+    context.tasks["1"] = Task(id="1", description="a", dependencies=["0"])
+    context.tasks["2"] = Task(id="2", description="b")
+    first = context.publish_snapshot()
+    
+    context.update_task_status("2", TaskStatus.COMPLETED, "ok")
+    context.tasks["3"] = Task(id="3", description="c")
+    
+    # Le lecteur garde une vue cohérente tant qu'aucun nouvel instantané n'est publié
+    assert context.snapshot is first
+    assert list(first.tasks) == ["1", "2"]
+    
+    second = context.publish_snapshot()
+    assert list(second.tasks) == ["1", "2", "3"]
+    assert second.tasks["2"]["status"] == "completed"
+    assert first.tasks["2"]["status"] == "pending"
+    assert second.tasks["1"] is first.tasks["1"]
+    assert context.publish_snapshot() is second
+    
+    with pytest.raises(TypeError):
+        second.tasks["1"]["status"] = "failed"
+    with pytest.raises(AttributeError):
+        second.version = 0
+    assert second.to_dict()["tasks"]["1"]["dependencies"] == ["0"]
+
+
+def test_snapshot_tasks_share_a_base_between_publishes(monkeypatch):
+    """Publier ne recopie que les tâches modifiées; la surcouche est fusionnée périodiquement"""
+    from auto_antigravity.core import context as context_module
+    monkeypatch.setattr(context_module, "SNAPSHOT_COLLAPSE_EVERY", 4)
+    context = Context(project_path="/p", project_name="p", project_description="")
+    for i in range(20):
+        context.tasks[str(i)] = Task(id=str(i), description=f"t{i}")
+    context.record_file_created("a.py")
+    first = context.publish_snapshot()
+    
+    context.update_task_status("3", TaskStatus.COMPLETED, "ok")
+    del context.tasks["5"]
+    context.tasks["20"] = Task(id="20", description="t20")
+    second = context.publish_snapshot()
+    assert second.tasks._base is first.tasks._base
+    assert len(second.tasks) == 20 and "5" not in second.tasks
+    assert list(second.tasks)[-1] == "20"
+    assert second.tasks["3"]["status"] == "completed" and first.tasks["3"]["status"] == "pending"
+    assert second.files_created is first.files_created
+    
+    context.record_file_created("b.py")
+    for status_round in range(3):
+        context.tasks["0"].metadata["round"] = status_round
+        context.tasks["0"].touch()
+        latest = context.publish_snapshot()
+    assert latest.tasks._base is not first.tasks._base and not latest.tasks._overlay
+    assert list(latest.tasks) == list(context.tasks)
+    assert list(latest.files_created) == ["a.py", "b.py"] and list(first.files_created) == ["a.py"]
@@ -0,0 +1,80 @@
+"""
+Tests pour le bus d'événements
+"""
+import asyncio
+import pytest
+
+from auto_antigravity.core.context import Context, Task, TaskStatus, AgentType
+from auto_antigravity.core.events import EventBus, EventType, run_scope
+from auto_antigravity.core.scheduler import TaskScheduler
+from auto_antigravity.monitoring.dashboard import MonitoringDashboard
+
+
+async def test_publish_filters_and_isolates_subscribers():
+    """Les abonnés filtrent par type; un abonné défaillant n'affecte pas les autres"""
+    bus = EventBus()
+    received, async_received = [], []
+
+    async def async_handler(event):
+        async_received.append(event.type)
+
+    bus.subscribe(lambda event: received.append(event.type), [EventType.TASK_STARTED])
+    bus.subscribe(lambda event: 1 / 0)
+    bus.subscribe(async_handler)
+
+    with run_scope("run1"):
+        event = bus.publish(EventType.TASK_STARTED, task_id="a")
+    bus.publish(EventType.MODEL_CALL, model="m")
+    await asyncio.sleep(0)
+
+    assert event.run_id == "run1"
+    assert received == [EventType.TASK_STARTED]
+    assert async_received == [EventType.TASK_STARTED, EventType.MODEL_CALL]
+    assert bus.handler_errors == 2
+
+
+async def test_stream_yields_published_events():
+    """Un flux reçoit les événements publiés après son démarrage"""
+    bus = EventBus()
+    stream = bus.stream([EventType.FILE_WRITTEN])
+    reader = asyncio.create_task(stream.__anext__())
+    await asyncio.sleep(0)
+
+    bus.publish(EventType.MODEL_CALL, model="m")
+    bus.publish(EventType.FILE_WRITTEN, file_path="a.py")
+
+    event = await asyncio.wait_for(reader, timeout=1)
+    assert event.data == {"file_path": "a.py"}
+    await stream.aclose()
+    assert bus.get_statistics()["subscribers"] == 0
+
+
+class NamedAgent:
+    name = "Coder"
+
+    async def execute(self, task, context):
+        if task.id == "bad":
+            raise RuntimeError("échec")
+        return "ok"
+
+
+async def test_dashboard_follows_task_events():
+    """Le dashboard met à jour les agents à partir des événements du scheduler"""
+    bus = EventBus()
+    dashboard = MonitoringDashboard()
+    dashboard.register_agent("Coder", "coder")
+    dashboard.attach_event_bus(bus)
+    context = Context(project_path="/p", project_name="P", project_description="d")
+    for task_id in ("good", "bad"):
+        context.tasks[task_id] = Task(id=task_id, description="t", assigned_agent=AgentType.CODER)
+
+    await TaskScheduler(context, {AgentType.CODER: NamedAgent()}, events=bus).run()
+
+    status = dashboard.agents_status["Coder"]
+    assert (status.total_tasks, status.tasks_completed, status.tasks_failed) == (2, 1, 1)
+    assert status.current_task is None
+
+    dashboard.detach_event_bus()
+    context.tasks["late"] = Task(id="late", description="t", assigned_agent=AgentType.CODER)
+    await TaskScheduler(context, {AgentType.CODER: NamedAgent()}, events=bus).run()
+    assert status.total_tasks == 2
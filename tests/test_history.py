@@ -0,0 +1,83 @@
+"""
+Tests pour les historiques bornés avec débordement sur disque
+"""
+from auto_antigravity.core import context as context_module
+from auto_antigravity.core.checkpoint import CheckpointStore
+from auto_antigravity.core.context import Context
+from auto_antigravity.core.history import SpillableLog
+
+
+def test_spilled_entries_are_read_back_by_offset(tmp_path):
+    """Les entrées anciennes partent sur disque et se relisent par offset"""
+    log = SpillableLog("messages", max_in_memory=10, segment_size=7, spill_dir=tmp_path)
+    log.extend({"n": i} for i in range(95))
+
+    stats = log.get_statistics()
+    assert stats["total"] == 95
+    assert stats["in_memory"] <= 10
+    assert stats["spilled"] + stats["in_memory"] == 95
+
+    assert log[0] == {"n": 0}
+    assert log[-1] == {"n": 94}
+    assert log.read(40, 5) == [{"n": i} for i in range(40, 45)]
+    assert log[80:] == [{"n": i} for i in range(80, 95)]
+    assert [entry["n"] for entry in log] == list(range(95))
+
+
+def test_without_spill_dir_entries_are_kept_in_memory(tmp_path):
+    """Sans répertoire de débordement, aucune entrée n'est perdue; elles débordent une fois configuré"""
+    log = SpillableLog("actions", max_in_memory=4)
+    for i in range(10):
+        log.append({"n": i})
+
+    assert len(log) == 10
+    assert log[0] == {"n": 0}
+    assert log[0:] == [{"n": i} for i in range(10)]
+
+    log.configure(tmp_path)
+    assert log.get_statistics()["in_memory"] <= 4
+    assert list(log) == [{"n": i} for i in range(10)]
+
+
+def test_context_payload_stays_small(tmp_path):
+    """to_dict n'inclut que les actions récentes"""
+    context = Context(project_path="/p", project_name="P", project_description="d")
+    context.configure_history(tmp_path, max_in_memory=50)
+    for i in range(500):
+        context.add_action("step", {"n": i})
+
+    data = context.to_dict()
+
+    assert data["action_history_size"] == 500
+    assert len(data["action_history"]) == 20
+    assert data["action_history"][-1]["details"] == {"n": 499}
+    assert context.action_history[0]["details"] == {"n": 0}
+
+
+def test_checkpoint_replay_keeps_every_message(tmp_path):
+    """Une longue exécution reprise depuis son checkpoint conserve tous ses messages"""
+    store = CheckpointStore(tmp_path / "checkpoints")
+    context = Context(project_path="/tmp/p", project_name="p", project_description="", run_id="long")
+    store.attach(context, "longue tâche")
+    for i in range(1200):
+        context.add_message("assistant", f"message {i}")
+    store.detach(context, "failed")
+
+    restored, _, _ = store.load("long", tmp_path / "history" / "long", history_max_in_memory=100)
+    assert len(restored.messages) == 1200
+    assert restored.messages[0:] == context.messages[0:]
+    assert restored.messages.get_statistics()["in_memory"] <= 100
+
+
+def test_version_marks_are_capped(monkeypatch):
+    """Les relevés de versions restent bornés et les deltas restent complets"""
+    monkeypatch.setattr(context_module, "MAX_VERSION_MARKS", 16)
+    context = Context(project_path="/tmp/p", project_name="p", project_description="")
+    for i in range(100):
+        context.add_message("user", f"m{i}")
+
+    assert len(context._marks["version"]) <= 16
+    delta = context.to_delta(10)
+    assert delta["messages_offset"] <= 10
+    assert delta["messages"][-1]["content"] == "m99"
+    assert delta["messages_offset"] + len(delta["messages"]) == 100
@@ -2,6 +2,12 @@
 Tests pour les modèles d'IA
 """
 import pytest
+from auto_antigravity.agents.coder import CoderAgent
+from auto_antigravity.agents.planner import PlannerAgent
+from auto_antigravity.config import settings
+from auto_antigravity.core.context import Context
+from auto_antigravity.models.base import BaseModel
+from auto_antigravity.models.cache import CachedModel, ResponseCache
 from auto_antigravity.models.factory import ModelFactory
 
 
@@ -65,3 +71,112 @@ def test_available_models():
     assert "gemini" in models
     assert "claude" in models
     assert "openai" in models
+
+
+class _CountingModel(BaseModel):
+    def __init__(self):
+        super().__init__(api_key="test_key", model_name="fake-1")
+        self.calls = 0
+    
+    async def generate(self, prompt, temperature=0.7, max_tokens=2000, **kwargs):
+        self.calls += 1
+        return f"réponse {self.calls}"
+    
+    async def generate_with_history(self, messages, temperature=0.7, max_tokens=2000, **kwargs):
+        return await self.generate(str(messages), temperature, max_tokens)
+
+
+async def test_response_cache_replays_deterministic_calls(tmp_path, monkeypatch):
+    """Les appels déterministes sont rejoués depuis le disque; les appels échantillonnés contournent le cache"""
+    monkeypatch.setattr(settings, "model_cache_sampled", False)
+    inner = _CountingModel()
+    model = CachedModel(inner, ResponseCache(tmp_path / "responses.sqlite3", max_bytes=1024), provider="fake")
+    
+    assert await model.generate("bonjour", temperature=0) == "réponse 1"
+    assert await model.generate("bonjour", temperature=0) == "réponse 1"
+    assert await model.generate("bonjour", temperature=0, max_tokens=10) == "réponse 2"
+    assert await model.generate("bonjour", temperature=0.7) == "réponse 3"
+    assert await model.generate("bonjour", temperature=0.7, use_cache=True) == "réponse 4"
+    assert await model.generate("bonjour", temperature=0.7, use_cache=True) == "réponse 4"
+    assert inner.calls == 4
+    
+    # Persistant: une nouvelle instance (reprise après un crash) relit les réponses
+    reopened = CachedModel(inner, ResponseCache(tmp_path / "responses.sqlite3", max_bytes=1024), provider="fake")
+    assert await reopened.generate("bonjour", temperature=0) == "réponse 1"
+    stats = reopened.cache.get_statistics()
+    assert stats["hits"] == 1 and stats["hit_rate"] == 1.0 and stats["entries"] == 3
+    
+    # Expiration par entrée
+    assert await model.generate("éphémère", temperature=0, cache_ttl=-1) == "réponse 5"
+    assert await model.generate("éphémère", temperature=0) == "réponse 6"
+    assert model.cache.expired == 1
+
+
+def test_response_cache_evicts_least_recently_used(tmp_path):
+    """Au-delà de la taille maximale, les réponses les moins récemment lues sont évincées"""
+    cache = ResponseCache(tmp_path / "responses.sqlite3", max_bytes=25)
+    cache.put("a", "fake", "fake-1", "x" * 10)
+    cache.put("b", "fake", "fake-1", "y" * 10)
+    assert cache.get("a") == "x" * 10
+    cache.put("c", "fake", "fake-1", "z" * 10)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 10 and cache.get("c") == "z" * 10
+    assert cache.get_statistics()["evictions"] == 1
+
+
+async def test_similarity_cache_reuses_near_duplicate_prompts(tmp_path, monkeypatch):
+    """Un prompt quasi identique réutilise la réponse si le type d'agent a un seuil de similarité"""
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(settings, "model_similarity_cache", True)
+    monkeypatch.setattr(settings, "model_similarity_thresholds", {"planner": 0.8})
+    inner = _CountingModel()
+    model = CachedModel(inner, ResponseCache(tmp_path / "responses.sqlite3", max_bytes=1 << 20), provider="fake")
+    
+    files = [f"src/module_{i}.py" for i in range(40)]
+    base = "Planifie la tâche: ajouter une API REST pour les utilisateurs. Fichiers du projet: "
+    first = base + " ".join(files) + " Généré le 2026-10-17 10:00:00"
+    second = base + " ".join(files[20:] + files[:20]) + " Généré le 2026-10-18 09:30:12"
+    unrelated = "Écris les tests unitaires du module de facturation et vérifie les arrondis des montants."
+    
+    assert await model.generate(first, cache_scope="planner") == "réponse 1"
+    assert await model.generate(second, cache_scope="planner") == "réponse 1"
+    assert await model.generate(unrelated, cache_scope="planner") == "réponse 2"
+    # Type d'agent sans seuil: appel échantillonné, pas de réutilisation
+    assert await model.generate(second, cache_scope="reviewer") == "réponse 3"
+    assert model.cache.get_statistics()["similar_hits"] == 1
+
+
+async def test_similarity_cache_ignores_the_planner_template(tmp_path, monkeypatch):
+    """Deux demandes différentes sur le même projet n'échangent pas leur plan malgré le gabarit commun"""
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(settings, "model_similarity_cache", True)
+    monkeypatch.setattr(settings, "model_similarity_thresholds", {"planner": 0.9})
+    inner = _CountingModel()
+    cache = ResponseCache(tmp_path / "responses.sqlite3", max_bytes=1 << 20)
+    planner = PlannerAgent(CachedModel(inner, cache, provider="fake"))
+    context = Context(project_path=str(tmp_path), project_name="p", project_description="API de facturation")
+    
+    await planner._generate_plan("Fix bug", context)
+    await planner._generate_plan("Add tests", context)
+    await planner._generate_plan("Fix bug", context)
+    
+    assert inner.calls == 2
+    assert cache.get_statistics()["similar_hits"] == 0
+
+
+async def test_agent_calls_are_replayed_from_cache_on_rerun(tmp_path, monkeypatch):
+    """Relancer une tâche de code ne renvoie pas le même prompt au fournisseur"""
+    monkeypatch.setattr(settings, "model_cache_sampled", False)
+    inner = _CountingModel()
+    cache = ResponseCache(tmp_path / "responses.sqlite3", max_bytes=1 << 20)
+    coder = CoderAgent(CachedModel(inner, cache, provider="fake"))
+    
+    for _ in range(2):
+        context = Context(project_path=str(tmp_path), project_name="p", project_description="")
+        await coder._generate_code("Créer le module de facturation", context)
+    
+    assert inner.calls == 1
+    stats = cache.get_statistics()
+    assert stats["hits"] == 1 and stats["bypassed"] == 0
+    assert stats["entries"] == 1 and stats["size_bytes"] == len("réponse 1".encode("utf-8"))
@@ -0,0 +1,242 @@
+"""
+Tests pour l'orchestrateur
+"""
+import asyncio
+import threading
+import pytest
+
+from auto_antigravity.core.context import Context, Task, TaskStatus, AgentType
+from auto_antigravity.core.orchestrator import Orchestrator
+from auto_antigravity.core.runs import RunStatus
+from auto_antigravity.core.pipeline import StreamingPipeline
+from auto_antigravity.core.checkpoint import CheckpointStore
+from auto_antigravity.monitoring.cache_manager import CacheManager
+
+
+class FakePlanner:
+    """Planificateur factice qui crée deux sous-tâches de code"""
+
+    name = "Planner"
+
+    async def plan(self, task_description, context):
+        ids = []
+        for i in range(2):
+            task = Task(
+                id=f"main_subtask_{i+1}",
+                description=f"{task_description} #{i+1}",
+                assigned_agent=AgentType.CODER
+            )
+            context.tasks[task.id] = task
+            ids.append(task.id)
+        return ids
+
+
+class FakeCoder:
+    """Agent de code factice"""
+
+    name = "Coder"
+
+    def __init__(self, hang_on=None):
+        self.hang_on = hang_on
+        self.executed = []
+
+    async def execute(self, task, context):
+        self.executed.append(task.id)
+        await asyncio.sleep(3600 if task.id == self.hang_on else 0.01)
+        context.files_created.append(f"{task.description}.py")
+        return "ok"
+
+
+def make_orchestrator(checkpoint_dir, coder=None):
+    orchestrator = Orchestrator(enable_monitoring=False, checkpoint_store=CheckpointStore(checkpoint_dir))
+    orchestrator.register_agent(AgentType.PLANNER, FakePlanner())
+    orchestrator.register_agent(AgentType.CODER, coder or FakeCoder())
+    orchestrator.context = Context(
+        project_path="/test/path",
+        project_name="TestProject",
+        project_description="A test project"
+    )
+    return orchestrator
+
+
+async def test_concurrent_runs_have_isolated_contexts(tmp_path):
+    """Deux tâches soumises simultanément ne partagent pas leur contexte"""
+    orchestrator = make_orchestrator(tmp_path)
+
+    run_a = orchestrator.submit_task("A")
+    run_b = orchestrator.submit_task("B")
+    await asyncio.gather(run_a.handle, run_b.handle)
+
+    assert run_a.run_id != run_b.run_id
+    assert run_a.context is not run_b.context
+    assert run_a.status == run_b.status == RunStatus.COMPLETED
+    assert run_a.context.tasks["main"].description == "A"
+    assert run_b.context.tasks["main"].description == "B"
+    assert run_a.context.files_created == ["A #1.py", "A #2.py"]
+    assert orchestrator.get_run(run_b.run_id) is run_b
+
+
+async def test_context_lookup_is_per_run(tmp_path):
+    """Une exécution terminée ne remplace pas le contexte d'une exécution encore active"""
+    orchestrator = make_orchestrator(tmp_path, FakeCoder(hang_on="main_subtask_1"))
+    template = orchestrator.context
+
+    live = orchestrator.submit_task("A")
+    finished = orchestrator.submit_task("B")
+    while "main_subtask_1" not in finished.context.tasks:
+        await asyncio.sleep(0.01)
+    assert orchestrator.cancel_run(finished.run_id)
+    await finished.handle
+
+    assert orchestrator.context is template
+    assert orchestrator.get_context() is live.context
+    assert orchestrator.get_context(finished.run_id) is finished.context
+    assert orchestrator.get_context("inconnu") is None
+    assert orchestrator.cancel_run(live.run_id)
+    await live.handle
+
+
+async def test_execute_task_registers_run(tmp_path):
+    """execute_task reste synchrone et enregistre son exécution"""
+    orchestrator = make_orchestrator(tmp_path)
+
+    result = await orchestrator.execute_task("C")
+
+    assert result["success"]
+    run = orchestrator.get_run(result["run_id"])
+    assert run.status == RunStatus.COMPLETED
+    assert result["context"]["run_id"] == run.run_id
+
+
+async def test_resume_skips_completed_subtasks(tmp_path):
+    """Une exécution interrompue reprend sans rejouer les sous-tâches complétées"""
+    orchestrator = make_orchestrator(tmp_path, FakeCoder(hang_on="main_subtask_2"))
+    orchestrator.max_concurrent_tasks = 1
+
+    run = orchestrator.submit_task("D")
+    while run.context.tasks.get("main_subtask_1") is None or \
+            run.context.tasks["main_subtask_1"].status != TaskStatus.COMPLETED:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.01)
+    run.handle.cancel()  # Simule l'arrêt brutal du serveur
+
+    coder = FakeCoder()
+    restarted = make_orchestrator(tmp_path, coder)
+    result = await restarted.resume(run.run_id)
+
+    assert result["success"]
+    assert coder.executed == ["main_subtask_2"]
+    restored = restarted.get_run(run.run_id).context
+    assert restored.tasks["main_subtask_1"].status == TaskStatus.COMPLETED
+    assert restored.files_created == ["D #1.py", "D #2.py"]
+    assert restored.messages[0]["content"] == "D"
+
+
+class FakeReviewer:
+    """Relecteur factice qui journalise les lots reçus"""
+
+    name = "Reviewer"
+
+    def __init__(self, events):
+        self.events = events
+
+    async def review_files(self, file_paths, context):
+        self.events.append(("review", list(file_paths)))
+        return {"summary": "", "issues": [{"file": p} for p in file_paths], "suggestions": []}
+
+
+class FakeTester:
+    """Testeur factice"""
+
+    name = "Tester"
+
+    def __init__(self, events):
+        self.events = events
+
+    async def test(self, context):
+        self.events.append(("test", len(context.files_created)))
+        return {"summary": "ok"}
+
+
+async def test_streaming_pipeline_overlaps_stages():
+    """La revue et les tests démarrent avant la fin de la génération"""
+    events = []
+    context = Context(project_path="/test/path", project_name="P", project_description="")
+
+    async def produce():
+        for name in ("a.py", "b.py", "c.py"):
+            context.record_file_created(name)
+            events.append(("write", name))
+            await asyncio.sleep(0.01)
+
+    pipeline = StreamingPipeline(context, FakeReviewer(events), FakeTester(events), batch_size=2)
+    outcome = await pipeline.run(produce())
+
+    assert events.index(("review", ["a.py"])) < events.index(("write", "c.py"))
+    assert events.index(("test", 1)) < events.index(("write", "c.py"))
+    assert len(outcome["review"]["issues"]) == 3
+    assert events[-1] == ("test", 3)
+
+
+async def test_cancel_run_marks_run_cancelled(tmp_path):
+    """L'annulation d'une exécution arrête ses sous-tâches et la marque annulée"""
+    orchestrator = make_orchestrator(tmp_path, FakeCoder(hang_on="main_subtask_1"))
+
+    run = orchestrator.submit_task("E")
+    while run.context.tasks.get("main_subtask_1") is None or \
+            run.context.tasks["main_subtask_1"].status != TaskStatus.IN_PROGRESS:
+        await asyncio.sleep(0.01)
+    assert orchestrator.cancel_run(run.run_id)
+    result = await run.handle
+
+    assert not result["success"]
+    assert run.status == RunStatus.CANCELLED
+    assert run.context.tasks["main_subtask_1"].status == TaskStatus.CANCELLED
+    assert not orchestrator.cancel_run(run.run_id)
+
+
+def test_monitoring_is_built_lazily(tmp_path, monkeypatch):
+    """Le monitoring n'est construit (ni ./cache créé) qu'à la première utilisation"""
+    monkeypatch.chdir(tmp_path)
+    orchestrator = Orchestrator(enable_monitoring=True, checkpoint_store=CheckpointStore(tmp_path / "cp"))
+    orchestrator.register_agent(AgentType.CODER, FakeCoder())
+
+    assert orchestrator._dashboard is None and orchestrator._cache_manager is None
+    assert not (tmp_path / "cache").exists()
+
+    assert "Coder" in orchestrator.dashboard.agents_status
+    assert orchestrator.get_cache_entries() == []
+    assert (tmp_path / "cache").exists()
+
+
+async def test_cache_index_is_awaited_off_the_event_loop(tmp_path, monkeypatch):
+    """L'index du cache se charge en arrière-plan et s'attend sans bloquer la boucle"""
+    monkeypatch.chdir(tmp_path)
+    orchestrator = Orchestrator(enable_monitoring=True, checkpoint_store=CheckpointStore(tmp_path / "cp"))
+    release = threading.Event()
+    monkeypatch.setattr(CacheManager, "_load_index", lambda self: release.wait(5))
+
+    orchestrator.start_background_loads()
+    waiter = asyncio.ensure_future(orchestrator.wait_for_cache())
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+
+    release.set()
+    await asyncio.wait_for(waiter, timeout=5)
+    assert orchestrator.get_cache_entries() == []
+
+
+async def test_external_cancellation_is_recorded_then_propagated(tmp_path):
+    """Un arrêt extérieur enregistre l'annulation puis la propage à l'appelant"""
+    orchestrator = make_orchestrator(tmp_path, FakeCoder(hang_on="main_subtask_1"))
+
+    run = orchestrator.submit_task("F")
+    while run.context.tasks.get("main_subtask_1") is None or \
+            run.context.tasks["main_subtask_1"].status != TaskStatus.IN_PROGRESS:
+        await asyncio.sleep(0.01)
+    run.handle.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await run.handle
+
+    assert run.status == RunStatus.CANCELLED
+    assert run.finished_at is not None
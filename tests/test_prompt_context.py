@@ -0,0 +1,42 @@
+"""
+Tests pour la construction du contexte des prompts
+"""
+from auto_antigravity.core.context import Context, Task, TaskStatus
+from auto_antigravity.core.prompt_context import PromptContextBuilder, estimate_tokens, budget_for_model, rank_by_relevance
+
+
+def test_builder_keeps_relevant_items_within_budget():
+    """Les éléments pertinents sont retenus en priorité et le budget est respecté"""
+    builder = PromptContextBuilder(budget_tokens=20, query="ajouter l'authentification utilisateur")
+    builder.add_files([f"src/module_{i}.py" for i in range(40)] + ["src/authentification.py"])
+    
+    files = builder.texts("files")
+    
+    assert "src/authentification.py" in files
+    assert builder.used_tokens <= 20
+    assert builder.omitted("files") == 41 - len(files)
+    assert builder.render("files", separator=", ").endswith("non inclus)")
+
+
+def test_builder_truncates_large_items_and_reads_context():
+    """Un contenu trop long est tronqué au budget restant; le contexte fournit les résultats"""
+    context = Context(project_path="/p", project_name="P", project_description="d")
+    context.tasks["1"] = Task(id="1", description="Créer le parseur")
+    context.update_task_status("1", TaskStatus.COMPLETED, "parser.py créé")
+    
+    builder = PromptContextBuilder(budget_tokens=200, query="parseur")
+    builder.add("file", "x = 1\n" * 1000, weight=10.0, truncatable=True)
+    builder.add_context(context, files=False)
+    
+    assert builder.texts("file")[0].endswith("[... tronqué]")
+    assert builder.used_tokens == 200
+    assert estimate_tokens("x = 1\n" * 1000) > 200
+    assert budget_for_model("modele-inconnu") == budget_for_model("default")
+
+
+def test_relevance_matches_accented_words():
+    """Les mots accentués comptent entiers comme mots-clés"""
+    texts = ["Tests d'intégration du module", "Intégrer le cache", "Documentation"]
+    
+    assert rank_by_relevance("écrire les tests d'intégration", texts, limit=5) == ["Tests d'intégration du module"]
+    assert rank_by_relevance("intégration", ["intégrer", "gration"], limit=5) == []
@@ -0,0 +1,249 @@
+"""
+Tests pour l'ordonnanceur de sous-tâches
+"""
+import asyncio
+import pytest
+
+from auto_antigravity.core.context import Context, Task, TaskStatus, AgentType
+from auto_antigravity.core.scheduler import TaskScheduler, AgentPool, compute_critical_paths
+
+
+class FakeAgent:
+    """Agent factice qui enregistre l'ordre et le parallélisme d'exécution"""
+
+    def __init__(self, delay: float = 0.01, fail_on=()):
+        self.delay = delay
+        self.fail_on = set(fail_on)
+        self.started = []
+        self.running = 0
+        self.max_running = 0
+
+    async def execute(self, task, context):
+        self.started.append(task.id)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            if task.id in self.fail_on:
+                raise RuntimeError(f"échec {task.id}")
+            return f"ok {task.id}"
+        finally:
+            self.running -= 1
+
+
+def make_context(*tasks):
+    context = Context(
+        project_path="/test/path",
+        project_name="TestProject",
+        project_description="A test project"
+    )
+    for task in tasks:
+        context.tasks[task.id] = task
+    return context
+
+
+async def test_independent_tasks_run_concurrently():
+    """Les tâches sans dépendances démarrent ensemble"""
+    agent = FakeAgent()
+    context = make_context(*[
+        Task(id=str(i), description="t", assigned_agent=AgentType.CODER) for i in range(6)
+    ])
+
+    await TaskScheduler(context, {AgentType.CODER: agent}, max_concurrent_tasks=4).run()
+
+    assert agent.max_running == 4
+    assert all(t.status == TaskStatus.COMPLETED for t in context.tasks.values())
+
+
+async def test_dependencies_are_respected():
+    """Une tâche ne démarre qu'après ses dépendances"""
+    agent = FakeAgent()
+    context = make_context(
+        Task(id="c", description="t", assigned_agent=AgentType.CODER, dependencies=["a", "b"]),
+        Task(id="a", description="t", assigned_agent=AgentType.CODER),
+        Task(id="b", description="t", assigned_agent=AgentType.CODER, dependencies=["a"]),
+    )
+
+    await TaskScheduler(context, {AgentType.CODER: agent}, max_concurrent_tasks=5).run()
+
+    assert agent.started == ["a", "b", "c"]
+
+
+async def test_failed_dependency_blocks_dependents():
+    """Les dépendants d'une tâche en échec sont bloqués"""
+    agent = FakeAgent(fail_on={"a"})
+    context = make_context(
+        Task(id="a", description="t", assigned_agent=AgentType.CODER),
+        Task(id="b", description="t", assigned_agent=AgentType.CODER, dependencies=["a"]),
+    )
+
+    await TaskScheduler(context, {AgentType.CODER: agent}).run()
+
+    assert context.tasks["a"].status == TaskStatus.FAILED
+    assert context.tasks["b"].status == TaskStatus.BLOCKED
+    assert agent.started == ["a"]
+
+
+async def test_missing_agent_and_cycles_do_not_hang():
+    """Les tâches sans agent ou en cycle sont bloquées au lieu de boucler"""
+    context = make_context(
+        Task(id="x", description="t", assigned_agent=AgentType.TESTER),
+        Task(id="y", description="t", assigned_agent=AgentType.CODER, dependencies=["z"]),
+        Task(id="z", description="t", assigned_agent=AgentType.CODER, dependencies=["y"]),
+    )
+
+    await asyncio.wait_for(TaskScheduler(context, {AgentType.CODER: FakeAgent()}).run(), timeout=1)
+
+    assert {t.status for t in context.tasks.values()} == {TaskStatus.BLOCKED}
+
+
+async def test_agent_pools_isolate_agent_types():
+    """Un pool saturé ne bloque pas les autres types d'agents"""
+    coder = FakeAgent(delay=0.05)
+    tester = FakeAgent(delay=0.01)
+    pools = {
+        AgentType.CODER: AgentPool(AgentType.CODER, max_workers=1, max_queue=1),
+        AgentType.TESTER: AgentPool(AgentType.TESTER, max_workers=1, max_queue=0),
+    }
+    context = make_context(
+        *[Task(id=f"c{i}", description="t", assigned_agent=AgentType.CODER) for i in range(3)],
+        Task(id="t0", description="t", assigned_agent=AgentType.TESTER),
+    )
+
+    await TaskScheduler(
+        context, {AgentType.CODER: coder, AgentType.TESTER: tester}, max_concurrent_tasks=5, pools=pools
+    ).run()
+
+    assert coder.max_running == 1
+    assert tester.started == ["t0"]
+    assert all(t.status == TaskStatus.COMPLETED for t in context.tasks.values())
+
+    stats = pools[AgentType.CODER].get_statistics()
+    assert stats["total_acquired"] == 3
+    assert stats["queue_length"] == 0
+    assert stats["max_wait_seconds"] > 0
+
+
+def test_compute_critical_paths():
+    """La longueur de chemin critique compte la plus longue chaîne de dépendants"""
+    tasks = [
+        Task(id="a", description="t"),
+        Task(id="b", description="t", dependencies=["a"]),
+        Task(id="c", description="t", dependencies=["b"]),
+        Task(id="d", description="t", dependencies=["a"]),
+        Task(id="x", description="t"),
+    ]
+
+    lengths = compute_critical_paths(tasks)
+
+    assert lengths == {"a": 3, "b": 2, "c": 1, "d": 1, "x": 1}
+
+
+async def test_longest_chain_then_priority_first():
+    """Avec un seul worker, le chemin critique puis la priorité déterminent l'ordre"""
+    agent = FakeAgent()
+    context = make_context(
+        Task(id="low", description="t", assigned_agent=AgentType.CODER, priority=2),
+        Task(id="high", description="t", assigned_agent=AgentType.CODER, priority=1),
+        Task(id="head", description="t", assigned_agent=AgentType.CODER, priority=3),
+        Task(id="tail", description="t", assigned_agent=AgentType.CODER, priority=4, dependencies=["head"]),
+    )
+
+    await TaskScheduler(context, {AgentType.CODER: agent}, max_concurrent_tasks=1).run()
+
+    assert agent.started == ["head", "high", "low", "tail"]
+
+
+async def test_timeout_fails_task_and_frees_pool():
+    """Une sous-tâche trop lente échoue et rend son worker aux suivantes"""
+    agent = FakeAgent(delay=5)
+    pool = AgentPool(AgentType.CODER, max_workers=1, max_queue=1)
+    context = make_context(
+        Task(id="slow", description="t", assigned_agent=AgentType.CODER),
+    )
+
+    await TaskScheduler(context, {AgentType.CODER: agent}, pools={AgentType.CODER: pool}, task_timeout=0.05).run()
+
+    assert context.tasks["slow"].status == TaskStatus.FAILED
+    assert pool.active == 0 and pool.queued == 0
+
+
+async def test_cancel_task_releases_worker():
+    """L'annulation d'une sous-tâche libère son worker et bloque ses dépendants"""
+    agent = FakeAgent(delay=5)
+    pool = AgentPool(AgentType.CODER, max_workers=1, max_queue=1)
+    context = make_context(
+        Task(id="a", description="t", assigned_agent=AgentType.CODER),
+        Task(id="b", description="t", assigned_agent=AgentType.CODER, dependencies=["a"]),
+    )
+    scheduler = TaskScheduler(context, {AgentType.CODER: agent}, pools={AgentType.CODER: pool})
+
+    runner = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0.05)
+    assert scheduler.cancel_task("a")
+    await asyncio.wait_for(runner, timeout=1)
+
+    assert context.tasks["a"].status == TaskStatus.CANCELLED
+    assert context.tasks["b"].status == TaskStatus.BLOCKED
+    assert pool.active == 0 and pool.queued == 0
+
+
+async def test_large_plan_schedules_without_rescans():
+    """Un plan de plusieurs milliers de sous-tâches s'exécute sans rescan quadratique"""
+    agent = FakeAgent(delay=0)
+    tasks = [Task(id="0", description="t", assigned_agent=AgentType.CODER)]
+    for i in range(1, 3000):
+        tasks.append(Task(id=str(i), description="t", assigned_agent=AgentType.CODER, dependencies=[str((i - 1) // 2)]))
+    context = make_context(*tasks)
+    scheduler = TaskScheduler(context, {AgentType.CODER: agent}, max_concurrent_tasks=50)
+
+    pending_scans = 0
+    get_pending_tasks = context.get_pending_tasks
+
+    def counting_get_pending_tasks():
+        nonlocal pending_scans
+        pending_scans += 1
+        return get_pending_tasks()
+
+    context.get_pending_tasks = counting_get_pending_tasks
+    await asyncio.wait_for(scheduler.run(), timeout=30)
+
+    assert context.tasks_completed == 3000
+    assert pending_scans == 1
+    assert agent.started.index("1") < agent.started.index("3")
+
+
+async def test_runs_sharing_a_saturated_pool_wait_for_capacity():
+    """Une exécution dont le pool partagé est saturé attend une place au lieu de se terminer"""
+    pool = AgentPool(AgentType.CODER, max_workers=1, max_queue=0)
+    first = make_context(Task(id="a", description="t", assigned_agent=AgentType.CODER))
+    second = make_context(Task(id="b", description="t", assigned_agent=AgentType.CODER))
+    agent = FakeAgent(delay=0.05)
+
+    runner = asyncio.create_task(TaskScheduler(first, {AgentType.CODER: agent}, pools={AgentType.CODER: pool}).run())
+    await asyncio.sleep(0)
+    await asyncio.wait_for(TaskScheduler(second, {AgentType.CODER: agent}, pools={AgentType.CODER: pool}).run(), 1)
+    await runner
+
+    assert agent.started == ["a", "b"]
+    assert first.tasks["a"].status == second.tasks["b"].status == TaskStatus.COMPLETED
+    assert agent.max_running == 1
+    assert pool.active == 0 and pool.queued == 0 and not pool._capacity_waiters
+
+
+async def test_queued_tasks_stay_in_priority_order():
+    """Une tâche du chemin critique prête plus tard passe devant les tâches en attente d'un worker"""
+    agent = FakeAgent()
+    pool = AgentPool(AgentType.CODER, max_workers=1, max_queue=10)
+    context = make_context(
+        Task(id="X", description="t", assigned_agent=AgentType.CODER),
+        *[Task(id=f"L{i}", description="t", assigned_agent=AgentType.CODER, priority=5) for i in range(5)],
+        Task(id="Y", description="t", assigned_agent=AgentType.CODER, dependencies=["X"]),
+        Task(id="Z", description="t", assigned_agent=AgentType.CODER, dependencies=["Y"]),
+        Task(id="W", description="t", assigned_agent=AgentType.CODER, dependencies=["Z"]),
+    )
+
+    await TaskScheduler(context, {AgentType.CODER: agent}, pools={AgentType.CODER: pool}).run()
+
+    assert agent.started[:4] == ["X", "Y", "Z", "W"]
+    assert pool.active == 0 and pool.queued == 0
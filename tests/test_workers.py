@@ -0,0 +1,111 @@
+"""
+Tests pour le mode coordinateur/workers
+"""
+import asyncio
+import pytest
+
+from auto_antigravity.config import settings
+from auto_antigravity.core.checkpoint import CheckpointStore
+from auto_antigravity.core.context import Context, Task, TaskStatus, AgentType
+from auto_antigravity.core.orchestrator import Orchestrator
+from auto_antigravity.core.scheduler import TaskScheduler
+from auto_antigravity.core.workers import JobQueue, RemoteAgentProxy, Worker, JOB_RUNNING
+
+
+class FileWritingAgent:
+    """Agent factice exécuté côté worker"""
+
+    async def execute(self, task, context):
+        if task.id == "boom":
+            raise RuntimeError("échec worker")
+        context.record_file_created(f"{task.id}.py")
+        context.add_message("assistant", f"fait {task.id}")
+        return f"ok {task.id}"
+
+
+def make_context(*tasks):
+    context = Context(project_path="/p", project_name="P", project_description="d", run_id="run1")
+    for task in tasks:
+        context.tasks[task.id] = task
+    return context
+
+
+async def test_subtasks_run_on_workers(tmp_path):
+    """Les sous-tâches passent par la file et leurs effets reviennent dans le contexte"""
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    workers = [
+        asyncio.create_task(Worker(queue, {AgentType.CODER: FileWritingAgent()}, f"w{i}", poll_interval=0.01).run())
+        for i in range(2)
+    ]
+    context = make_context(
+        Task(id="a", description="t", assigned_agent=AgentType.CODER),
+        Task(id="b", description="t", assigned_agent=AgentType.CODER, dependencies=["a"]),
+        Task(id="boom", description="t", assigned_agent=AgentType.CODER),
+    )
+    proxy = RemoteAgentProxy(AgentType.CODER, queue, poll_interval=0.01)
+
+    try:
+        await asyncio.wait_for(TaskScheduler(context, {AgentType.CODER: proxy}).run(), timeout=5)
+    finally:
+        for worker in workers:
+            worker.cancel()
+
+    assert context.tasks["b"].status == TaskStatus.COMPLETED
+    assert context.tasks["b"].result == "ok b"
+    assert context.tasks["boom"].status == TaskStatus.FAILED
+    assert context.tasks["boom"].result == "échec worker"
+    assert sorted(context.files_created) == ["a.py", "b.py"]
+    assert queue.get_statistics() == {}
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    """Un job dont le worker a disparu est repris par un autre worker"""
+    queue = JobQueue(tmp_path / "jobs.sqlite3", lease_seconds=0)
+    job_id = queue.enqueue("coder", {"x": 1})
+
+    assert queue.claim("w1", ["tester"]) is None
+    assert queue.claim("w1", ["coder"])["id"] == job_id
+    assert queue.claim("w2", ["coder"])["id"] == job_id
+    assert not queue.heartbeat(job_id, "w1")
+    assert queue.get(job_id) == {"status": JOB_RUNNING, "outcome": None, "worker_id": "w2"}
+
+
+class SlowAgent:
+    """Agent factice côté worker qui mesure le nombre de jobs simultanés"""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    async def execute(self, task, context):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0.3)
+            return "ok"
+        finally:
+            self.running -= 1
+
+
+async def test_worker_mode_scales_with_worker_count(tmp_path, monkeypatch):
+    """En mode workers, les jobs en vol suivent le nombre de workers et non le pool local"""
+    monkeypatch.setattr(settings, "worker_queue_path", tmp_path / "jobs.sqlite3")
+    orchestrator = Orchestrator(enable_monitoring=False, checkpoint_store=CheckpointStore(tmp_path / "cp"))
+    orchestrator.start_workers(6, spawn=False)
+    agent = SlowAgent()
+    workers = [
+        asyncio.create_task(Worker(orchestrator.job_queue, {AgentType.CODER: agent}, f"w{i}", poll_interval=0.01).run())
+        for i in range(6)
+    ]
+    context = make_context(*[Task(id=str(i), description="t", assigned_agent=AgentType.CODER) for i in range(6)])
+
+    try:
+        await asyncio.wait_for(orchestrator._execute_subtasks(context), timeout=10)
+    finally:
+        for worker in workers:
+            worker.cancel()
+        orchestrator.stop_workers()
+
+    assert orchestrator.agent_pools[AgentType.CODER].max_workers < 6
+    assert agent.max_running == 6
+    assert all(task.status == TaskStatus.COMPLETED for task in context.tasks.values())
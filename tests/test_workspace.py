@@ -0,0 +1,158 @@
+"""
+Tests pour les backends de l'espace de travail
+"""
+import asyncio
+import sys
+import threading
+import httpx
+import pytest
+
+from auto_antigravity.core import api_client, commands, workspace
+from auto_antigravity.core.api_client import AntigravityClient
+from auto_antigravity.core.workspace import (
+    FileContentCache, LocalWorkspaceBackend, get_workspace_backend, probe_workspace_backend,
+    reset_workspace_backend
+)
+
+
+async def test_local_backend_file_operations(tmp_path):
+    """Le backend local offre les opérations de fichiers, de recherche et de terminal"""
+    backend = LocalWorkspaceBackend(tmp_path)
+    
+    assert await backend.write_files({"src/a.py": "def login():\n    pass\n", "b.txt": "x"}) == {
+        "src/a.py": True, "b.txt": True
+    }
+    assert await backend.read_files(["src/a.py", "absent.py"]) == {"src/a.py": "def login():\n    pass\n"}
+    assert await backend.list_files("src") == ["src/a.py"]
+    assert (await backend.search_in_files(r"def \w+"))[0] == {"path": "src/a.py", "line": 1, "text": "def login():"}
+    (tmp_path / "node_modules" / "lib").mkdir(parents=True)
+    (tmp_path / "node_modules" / "lib" / "index.js").write_text("def login():")
+    assert [match["path"] for match in await backend.search_in_files("login")] == ["src/a.py"]
+    assert (await backend.execute_command("ls src"))["stdout"].strip() == "a.py"
+    assert await backend.delete_files(["b.txt", "absent.txt"]) == {"b.txt": True, "absent.txt": False}
+    
+    with pytest.raises(ValueError):
+        await backend.write_file("../evil.py", "x")
+
+
+async def test_local_only_runs_make_no_network_calls(tmp_path, monkeypatch):
+    """Sans clé API, la sonde et les E/S des agents n'utilisent jamais le réseau"""
+    def no_network():
+        raise AssertionError("appel réseau inattendu")
+    
+    monkeypatch.setattr(api_client, "get_http_client", no_network)
+    monkeypatch.setattr(workspace, "_local_backends", {})
+    reset_workspace_backend()
+    
+    assert await probe_workspace_backend(AntigravityClient(api_url="http://ide", api_key="")) == "local"
+    backend = get_workspace_backend(tmp_path)
+    
+    assert backend.name == "local"
+    assert await backend.write_file("a.py", "x") is True
+    assert (tmp_path / "a.py").read_text() == "x"
+    reset_workspace_backend()
+
+
+async def test_file_cache_revalidates_local_files(tmp_path, monkeypatch):
+    """Les fichiers inchangés sont servis par le cache; une modification force la relecture"""
+    backend = LocalWorkspaceBackend(tmp_path)
+    cache = FileContentCache(max_bytes=10)
+    await backend.write_files({"a.py": "aaaa", "b.py": "bbbb"})
+    
+    reads = []
+    original = backend._read_sync
+    
+    def counting_read(path):
+        reads.append(path)
+        return original(path)
+    
+    monkeypatch.setattr(backend, "_read_sync", counting_read)
+    
+    assert await cache.read_many(backend, ["a.py", "b.py"]) == {"a.py": "aaaa", "b.py": "bbbb"}
+    assert await cache.read(backend, "a.py") == "aaaa"
+    assert reads == ["a.py", "b.py"]
+    
+    (tmp_path / "a.py").write_text("changed")
+    assert await cache.read(backend, "a.py") == "changed"
+    assert reads[-1] == "a.py"
+    
+    # Budget de 10 caractères: b.py (le moins récemment utilisé) est évincé
+    stats = cache.get_statistics()
+    assert stats["size_bytes"] <= 10 and stats["evictions"] == 1
+    assert stats["hits"] == 1
+
+
+async def test_file_cache_stats_files_off_the_event_loop(tmp_path, monkeypatch):
+    """Les validateurs (stat) sont relevés hors de la boucle d'événements, en lecture comme en écriture"""
+    backend = LocalWorkspaceBackend(tmp_path)
+    cache = FileContentCache(max_bytes=1000)
+    await backend.write_files({"a.py": "aaaa"})
+    
+    threads = []
+    original = backend.validator
+    
+    def recording_validator(path):
+        threads.append(threading.get_ident())
+        return original(path)
+    
+    monkeypatch.setattr(backend, "validator", recording_validator)
+    
+    await cache.written(backend, {"a.py": "aaaa"})
+    assert await cache.read(backend, "a.py") == "aaaa"
+    
+    assert cache.get_statistics()["hits"] == 1
+    assert len(threads) == 2 and threading.get_ident() not in threads
+
+
+async def test_file_cache_uses_etags_for_the_api(monkeypatch):
+    """Avec l'API, un ETag inchangé (304) évite de retransférer le contenu"""
+    requests = []
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.headers.get("if-none-match"))
+        if request.url.path.startswith("/files/batch"):
+            return httpx.Response(404)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"etag": '"v1"'})
+        return httpx.Response(200, json={"content": "data"}, headers={"etag": '"v1"'})
+    
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(api_client, "_http_client", shared)
+    monkeypatch.setattr(api_client, "_http_client_loop", asyncio.get_running_loop())
+    client = AntigravityClient(api_url="http://etag-ide")
+    cache = FileContentCache(max_bytes=1000)
+    
+    assert await cache.read(client, "a.py") == "data"
+    assert await cache.read(client, "a.py") == "data"
+    
+    assert requests == [None, None, '"v1"']
+    assert cache.get_statistics()["hits"] == 1
+    await api_client.close_http_client()
+
+
+async def test_local_command_stream_can_stop_early(tmp_path):
+    """La sortie arrive au fil de l'eau et interrompre le flux tue la commande"""
+    backend = LocalWorkspaceBackend(tmp_path)
+    chunks = [chunk async for chunk in backend.execute_command_stream("echo un; echo deux >&2; exit 3")]
+    assert {(c.stream, c.data.strip()) for c in chunks[:-1]} == {("stdout", "un"), ("stderr", "deux")}
+    assert chunks[-1].is_exit and chunks[-1].exit_code == 3
+    
+    stream = backend.execute_command_stream("echo ERREUR; sleep 30; touch fini")
+    async for chunk in stream:
+        if "ERREUR" in chunk.data:
+            break
+    await asyncio.wait_for(stream.aclose(), timeout=5)
+    assert not (tmp_path / "fini").exists()
+
+
+async def test_local_command_stream_passes_long_lines_through(tmp_path, monkeypatch):
+    """Une ligne plus longue que la limite de lecture est transmise entière, par blocs"""
+    monkeypatch.setattr(commands, "MAX_LINE_BYTES", 64 * 1024)
+    backend = LocalWorkspaceBackend(tmp_path)
+    script = "import sys; sys.stdout.write('é' * 300000 + '\\nfin\\n')"
+    chunks = [chunk async for chunk in backend.execute_command_stream(f'{sys.executable} -c "{script}"')]
+    
+    stdout = "".join(chunk.data for chunk in chunks if chunk.stream == "stdout")
+    assert stdout == "é" * 300000 + "\nfin\n"
+    assert len(chunks) > 3
+    assert chunks[-1].exit_code == 0